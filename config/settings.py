@@ -72,6 +72,9 @@ CONTRACTOR_FIELDS = [
     "zip_code",
 ]
 
+# Service taxonomy used to extract services from descriptions (optional, JSON of service -> synonyms)
+SERVICE_TAXONOMY_PATH = os.getenv("SERVICE_TAXONOMY_PATH", None)
+
 # Define processors for specific fields (optional)
 FIELD_PROCESSORS = {
     "rating": lambda x: float(x) if x and x != "N/A" else None,
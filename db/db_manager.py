@@ -159,6 +159,70 @@ class DBManager:
             logger.error(f"Error importing contractors: {str(e)}")
             raise
     
+    def apply_changes_from_json(self, changes_path: str) -> Tuple[int, int]:
+        """
+        Apply the changes file written by an incremental ETL run.
+        Upserted contractors replace their stored certifications and services;
+        tombstoned contractors are deleted with the rows the schema would
+        cascade to, since foreign keys are not enforced on this connection.
+        
+        Args:
+            changes_path: Path to the changes JSON, e.g. data/processed_contractors.changes.json
+            
+        Returns:
+            Tuple of (contractors upserted, contractors deleted)
+        """
+        try:
+            if not self.conn:
+                self.connect()
+            
+            with open(changes_path, 'r', encoding='utf-8') as f:
+                changes = json.load(f)
+            
+            self.conn.execute("BEGIN TRANSACTION")
+            
+            upserted = 0
+            for contractor in changes.get("upserts", []):
+                contractor_id = contractor.get("id")
+                if not contractor_id:
+                    logger.warning("Skipping contractor without ID")
+                    continue
+                
+                # Replace links even when empty, they may have been removed since the last run
+                self._upsert_contractor(contractor)
+                # Present but null when the raw record had none
+                self._add_contractor_certifications(contractor_id, contractor.get("certifications") or [])
+                self._add_contractor_services(contractor_id, contractor.get("services") or [])
+                upserted += 1
+            
+            deleted = 0
+            for tombstone in changes.get("tombstones", []):
+                contractor_id = tombstone.get("id")
+                if not contractor_id:
+                    continue
+                
+                insight_ids = "SELECT id FROM insights WHERE contractor_id = ?"
+                self.cursor.execute(f"DELETE FROM selling_points WHERE insight_id IN ({insight_ids})", (contractor_id,))
+                self.cursor.execute(f"DELETE FROM recommended_products WHERE insight_id IN ({insight_ids})", (contractor_id,))
+                self.cursor.execute("DELETE FROM insights WHERE contractor_id = ?", (contractor_id,))
+                self.cursor.execute("DELETE FROM contractor_certifications WHERE contractor_id = ?", (contractor_id,))
+                self.cursor.execute("DELETE FROM contractor_services WHERE contractor_id = ?", (contractor_id,))
+                self.cursor.execute("DELETE FROM contractors WHERE id = ?", (contractor_id,))
+                deleted += self.cursor.rowcount
+            
+            self.conn.commit()
+            
+            logger.info(f"Applied changes: {upserted} contractors upserted, {deleted} deleted")
+            return upserted, deleted
+        
+        except Exception as e:
+            # Rollback on error
+            if self.conn:
+                self.conn.rollback()
+            
+            logger.error(f"Error applying changes: {str(e)}")
+            raise
+    
     def _upsert_contractor(self, contractor: Dict[str, Any]) -> None:
         """
         Insert or update a contractor record.
@@ -482,6 +546,7 @@ def main():
     parser = argparse.ArgumentParser(description="Instalily Case Study Database Manager")
     parser.add_argument("--init", action="store_true", help="Initialize the database schema")
     parser.add_argument("--import", action="store_true", help="Import contractors from JSON")
+    parser.add_argument("--apply-changes", type=str, metavar="PATH", help="Apply a changes file written by the incremental ETL")
     parser.add_argument("--stats", action="store_true", help="Show database statistics")
     parser.add_argument("--json-path", type=str, default=PROCESSED_DATA_PATH, help="Path to JSON file with contractor data")
     parser.add_argument("--db-path", type=str, default=DB_PATH, help="Path to SQLite database")
@@ -507,6 +572,12 @@ def main():
             count = db_manager.import_contractors_from_json(args.json_path)
             print(f"Imported {count} contractors")
         
+        # Apply incremental changes if requested
+        if args.apply_changes:
+            print(f"Applying changes from {args.apply_changes}...")
+            upserted, deleted = db_manager.apply_changes_from_json(args.apply_changes)
+            print(f"Upserted {upserted} contractors, deleted {deleted}")
+        
         # Show statistics if requested
         if args.stats:
             print("\n=== Database Statistics ===")
@@ -528,7 +599,7 @@ def main():
                 print(f"  Priority {priority}: {count}")
         
         # If no actions specified, show help
-        if not (args.init or getattr(args, 'import') or args.stats):
+        if not (args.init or getattr(args, 'import') or args.apply_changes or args.stats):
             parser.print_help()
     
     finally:
@@ -0,0 +1,252 @@
+"""
+Columnar engine for the ETL processor.
+Holds the contractors of a run in a pandas DataFrame and computes address
+splitting, data quality scores, deduplication, company size and high-value
+flags as column operations instead of per-record Python code. Every stage
+mirrors the matching ContractorDataProcessor method, so the records
+produced are the same as the dict-based path, key order included.
+"""
+
+import hashlib
+import logging
+from typing import Dict, List, Any, Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("etl_columnar")
+
+# Values normalized to None, as in ContractorDataProcessor._clean_record
+EMPTY_VALUES = ("", "N/A", "Unknown")
+
+# Columns added by enrichment, in the order ContractorDataProcessor._enrich_record sets them
+ENRICHED_COLUMNS = ["years_in_business", "estimated_size", "services", "high_value_prospect"]
+
+# Marks rows whose address was split into city and state
+_LOCATED = "_located"
+
+def _object_column(values: List[Any], index: pd.Index) -> pd.Series:
+    """Wrap values in an object column, so None stays None and nothing is cast."""
+    return pd.Series(values, index=index, dtype=object)
+
+def _types(column: pd.Series) -> pd.Series:
+    """Python type of every value of a column."""
+    return column.map(type)
+
+def load_frame(raw_contractors: List[Any], fields: List[str]) -> pd.DataFrame:
+    """
+    Load raw contractor records into a DataFrame with one object column per field.
+    
+    Args:
+        raw_contractors: Raw contractor records
+        fields: Fields to keep, see CONTRACTOR_FIELDS
+    
+    Returns:
+        DataFrame indexed by each record's position in the raw data
+    """
+    positions = [i for i, contractor in enumerate(raw_contractors) if isinstance(contractor, dict)]
+    if len(positions) < len(raw_contractors):
+        logger.error(f"Skipping {len(raw_contractors) - len(positions)} raw records that are not objects")
+    
+    records = [raw_contractors[i] for i in positions]
+    index = pd.Index(positions)
+    return pd.DataFrame({field: _object_column([record.get(field) for record in records], index) for field in fields})
+
+def _apply_processor(column: pd.Series, field: str, processor: Callable[[Any], Any]) -> pd.Series:
+    """Apply a field processor to the values that are not None, keeping a value it fails on."""
+    try:
+        return _object_column([None if value is None else processor(value) for value in column], column.index)
+    except Exception:
+        # Redo value by value to keep and report the ones the processor fails on
+        pass
+    
+    values = []
+    for i, value in column.items():
+        if value is not None:
+            try:
+                value = processor(value)
+            except Exception as e:
+                logger.warning(f"Error processing field '{field}' for contractor {i}: {str(e)}")
+        values.append(value)
+    return _object_column(values, column.index)
+
+def _split_addresses(frame: pd.DataFrame) -> None:
+    """Add city and state columns from "street, city, state zip" addresses."""
+    address = frame["address"]
+    is_str = _types(address).eq(str)
+    
+    unparsable = ~is_str & address.map(bool)
+    for i in frame.index[unparsable]:
+        logger.warning(f"Error parsing address for contractor {i}: address is not a string")
+    
+    # Each distinct address is split once, contractors repeat across ZIP code searches
+    splittable = address[is_str & ~address.isin(["", "N/A"])]
+    codes, distinct = pd.factorize(splittable)
+    
+    # At most the last two commas matter: [..., city, state zip] or [..., state zip]
+    parts = pd.Series(distinct, dtype=object).str.rsplit(",", n=2, expand=True).reindex(columns=range(3)).astype(object)
+    has_city = parts[2].notna()
+    
+    def per_row(values: pd.Series) -> pd.Series:
+        return pd.Series(values.to_numpy()[codes], index=splittable.index)
+    
+    located = per_row(parts[1].notna())
+    city = per_row(parts[1].where(has_city, "").str.strip())
+    state = per_row(parts[2].where(has_city, parts[1]).str.strip().str.split(n=1).str[0].fillna(""))
+    
+    frame["city"] = _object_column([None] * len(frame), frame.index)
+    frame["state"] = _object_column([None] * len(frame), frame.index)
+    frame.loc[located.index[located], "city"] = city[located]
+    frame.loc[located.index[located], "state"] = state[located]
+    frame[_LOCATED] = located.reindex(frame.index, fill_value=False)
+
+def _present(column: pd.Series) -> np.ndarray:
+    """
+    Flag the values that count towards the data quality score.
+    Runs after normalization, so blank strings are already None and only
+    None and empty lists are left to rule out.
+    """
+    present = column.to_numpy() != None  # noqa: E711, element-wise comparison
+    try:
+        lengths = column.str.len()
+    except AttributeError:
+        # No strings or lists in the column, so nothing can be an empty list
+        return present
+    
+    # Only lists count as empty, other sized values such as {} are present
+    empty = lengths.eq(0).to_numpy(copy=True)
+    if empty.any():
+        empty[empty] = column[empty].map(type).eq(list).to_numpy()
+        present &= ~empty
+    return present
+
+def _quality_scores(frame: pd.DataFrame, weights: Dict[str, float]) -> np.ndarray:
+    """Weighted share of meaningful fields, summed in the order of the dict-based path."""
+    total_weight = 0.0
+    total_score = np.zeros(len(frame))
+    for field, weight in weights.items():
+        total_weight += weight
+        total_score = total_score + weight * _present(frame[field]).astype(np.float64)
+    
+    return total_score / total_weight if total_weight > 0 else np.zeros(len(frame))
+
+def clean_frame(
+    frame: pd.DataFrame,
+    field_processors: Dict[str, Callable[[Any], Any]],
+    processed_date: str,
+    quality_weights: Dict[str, float]
+) -> pd.DataFrame:
+    """
+    Clean and normalize contractors, see ContractorDataProcessor.clean_and_normalize.
+    
+    Args:
+        frame: DataFrame returned by load_frame
+        field_processors: Functions applied to single fields, see FIELD_PROCESSORS
+        processed_date: Timestamp stamped on every record
+        quality_weights: Field weights of the data quality score
+    
+    Returns:
+        The same DataFrame with processed_date, city, state, id and data_quality_score columns
+    """
+    for field, processor in field_processors.items():
+        if field in frame:
+            frame[field] = _apply_processor(frame[field], field, processor)
+    
+    frame["processed_date"] = processed_date
+    _split_addresses(frame)
+    
+    # Normalize empty or missing values
+    for column in frame.columns.drop(_LOCATED):
+        empty = frame[column].isin(EMPTY_VALUES)
+        if empty.any():
+            frame.loc[empty, column] = None
+    
+    # Ids from name and address, or from the position of the raw record
+    name, address = frame["name"], frame["address"]
+    keyed = name.map(bool) & address.map(bool)
+    id_strings = (name[keyed].astype(str) + "|" + address[keyed].astype(str)).str.lower()
+    ids = _object_column([f"contractor_{i}" for i in frame.index], frame.index)
+    ids[keyed] = [hashlib.md5(id_string.encode('utf-8')).hexdigest() for id_string in id_strings]
+    frame["id"] = ids
+    
+    frame["data_quality_score"] = _quality_scores(frame, quality_weights)
+    return frame
+
+def deduplicate_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Keep one row per id, see ContractorDataProcessor.deduplicate.
+    The kept row is the first with the highest data quality score, and ids
+    keep the order in which they first appear.
+    
+    Args:
+        frame: DataFrame returned by clean_frame
+    
+    Returns:
+        Deduplicated DataFrame
+    """
+    # Codes number the ids in order of first appearance
+    codes, _ = pd.factorize(frame["id"])
+    scores = frame["data_quality_score"].to_numpy()
+    
+    # Sort by id, best score first and earliest row first, then take each id's first row
+    order = np.lexsort((np.arange(len(frame)), -scores, codes))
+    first_rows = np.flatnonzero(np.r_[True, codes[order][1:] != codes[order][:-1]])
+    return frame.iloc[order[first_rows]]
+
+def enrich_frame(frame: pd.DataFrame, extract_services: Callable[[Optional[str]], List[str]]) -> pd.DataFrame:
+    """
+    Enrich contractors, see ContractorDataProcessor.enrich_data.
+    
+    Args:
+        frame: DataFrame returned by deduplicate_frame
+        extract_services: Function returning the services mentioned in a description
+    
+    Returns:
+        The same DataFrame with the ENRICHED_COLUMNS added
+    """
+    frame["years_in_business"] = _object_column([None] * len(frame), frame.index)
+    
+    # Company size from the number of certifications
+    cert_count = frame["certifications"].map(len, na_action="ignore").fillna(0).to_numpy()
+    frame["estimated_size"] = np.select([cert_count >= 3, cert_count >= 1], ["Large", "Medium"], default="Small")
+    
+    # Each distinct description is scanned once
+    description_codes, descriptions = pd.factorize(frame["description"])
+    services = [extract_services(description) for description in descriptions]
+    services.append(extract_services(None))  # Code -1, a missing description
+    frame["services"] = _object_column([list(services[code]) for code in description_codes], frame.index)
+    
+    # High-value points, as in ContractorDataProcessor._is_high_value_prospect
+    rating = frame["rating"].astype(np.float64).to_numpy()
+    points = (
+        np.select([rating >= 4.5, rating >= 4.0], [2, 1], default=0)
+        + np.select([cert_count >= 3, cert_count >= 1], [2, 1], default=0)
+        + (frame["data_quality_score"].to_numpy() >= 0.8)
+        + np.select([frame["estimated_size"].eq("Large"), frame["estimated_size"].eq("Medium")], [2, 1], default=0)
+    )
+    frame["high_value_prospect"] = points >= 4
+    return frame
+
+def frame_to_records(frame: pd.DataFrame, fields: List[str]) -> List[Dict[str, Any]]:
+    """
+    Convert contractors back to dictionaries laid out like the dict-based path's.
+    City and state are only present when the address could be split.
+    
+    Args:
+        frame: DataFrame after clean_frame and optionally deduplicate_frame and enrich_frame
+        fields: Fields kept from the raw data, see CONTRACTOR_FIELDS
+    
+    Returns:
+        List of contractor data dictionaries
+    """
+    head = [*fields, "processed_date"]
+    tail = ["id", "data_quality_score", *(column for column in ENRICHED_COLUMNS if column in frame)]
+    with_location = (*head, "city", "state", *tail)
+    without_location = (*head, *tail)
+    
+    # Plain lists give Python floats and bools, and building dicts from them is far faster than to_dict
+    columns = [frame[column].tolist() for column in with_location]
+    return [
+        dict(zip(with_location, row)) if located else dict(zip(without_location, row[:len(head)] + row[len(head) + 2:]))
+        for located, row in zip(frame[_LOCATED].tolist(), zip(*columns))
+    ]
@@ -0,0 +1,371 @@
+"""
+Entity resolution for the ETL processor.
+Finds contractors that are the same business under different spellings
+("ABC Roofing LLC" and "ABC Roofing" at one phone number, or one address
+formatted two ways by overlapping ZIP searches). Records are normalized,
+grouped by blocking keys so only records sharing a key are compared,
+scored by trigram similarity, clustered and merged into golden records.
+"""
+
+import re
+import logging
+from typing import Dict, List, Any, Callable, FrozenSet, Iterator, Optional, Tuple
+
+logger = logging.getLogger("etl_entity_resolution")
+
+# Name endings that don't distinguish one business from another
+LEGAL_SUFFIXES = {
+    "llc", "l l c", "inc", "incorporated", "co", "corp", "corporation",
+    "company", "ltd", "limited", "lp", "llp", "pllc", "pc",
+}
+
+# Address words reduced to the abbreviation the USPS uses
+ADDRESS_ABBREVIATIONS = {
+    "street": "st", "avenue": "ave", "road": "rd", "boulevard": "blvd",
+    "drive": "dr", "lane": "ln", "court": "ct", "place": "pl",
+    "parkway": "pkwy", "highway": "hwy", "route": "rte", "terrace": "ter",
+    "suite": "ste", "apartment": "apt", "building": "bldg", "floor": "fl",
+    "north": "n", "south": "s", "east": "e", "west": "w",
+    "northeast": "ne", "northwest": "nw", "southeast": "se", "southwest": "sw",
+}
+
+# Weights of the fields compared; a field missing on either side is left out
+FIELD_WEIGHTS = {"name": 0.5, "phone": 0.3, "address": 0.2}
+
+# Pairs scoring at least this much are the same contractor
+MATCH_THRESHOLD = 0.75
+
+# Names less similar than this never match, whatever else agrees
+NAME_FLOOR = 0.6
+
+# Blocks larger than this are skipped to keep comparisons sub-quadratic
+MAX_BLOCK_SIZE = 100
+
+# Fields whose list values are combined when records are merged
+LIST_FIELDS = ("certifications",)
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_INITIALS = re.compile(r"\b(?:[a-z] )+[a-z]\b")
+_NUMBER = re.compile(r"\d+")
+_ZIP = re.compile(r"\b(\d{5})(?:-\d{4})?\b")
+
+def normalize_name(name: Optional[str]) -> str:
+    """
+    Normalize a business name for comparison.
+    
+    Args:
+        name: Contractor name
+    
+    Returns:
+        Lowercase words without punctuation or trailing legal suffixes
+    """
+    if not name:
+        return ""
+    
+    text = _NON_ALNUM.sub(" ", name.lower().replace("&", " and ")).strip()
+    
+    # "A.B.C. Roofing" and "ABC Roofing" are the same name
+    text = _INITIALS.sub(lambda match: match.group().replace(" ", ""), text)
+    words = text.split()
+    while len(words) > 1:
+        # Also catches a split suffix such as "L.L.C."
+        for size in (3, 1):
+            if len(words) > size and " ".join(words[-size:]) in LEGAL_SUFFIXES:
+                del words[-size:]
+                # "Smith & Co" leaves a dangling "and"
+                if len(words) > 1 and words[-1] == "and":
+                    words.pop()
+                break
+        else:
+            break
+    return " ".join(words)
+
+def normalize_phone(phone: Optional[str]) -> str:
+    """
+    Normalize a US phone number to its ten digits.
+    
+    Args:
+        phone: Phone number in any format
+    
+    Returns:
+        Ten digits, or "" if the number is incomplete
+    """
+    if not phone:
+        return ""
+    
+    digits = re.sub(r"\D", "", phone)
+    if len(digits) == 11 and digits.startswith("1"):
+        digits = digits[1:]
+    return digits if len(digits) == 10 else ""
+
+def normalize_address(address: Optional[str]) -> str:
+    """
+    Normalize a street address for comparison.
+    
+    Args:
+        address: Address as scraped
+    
+    Returns:
+        Lowercase words without punctuation, with common words abbreviated
+    """
+    if not address:
+        return ""
+    
+    words = _NON_ALNUM.sub(" ", address.lower()).split()
+    return " ".join(ADDRESS_ABBREVIATIONS.get(word, word) for word in words)
+
+def trigrams(text: str) -> FrozenSet[str]:
+    """
+    Character trigrams of a normalized string, with its ends marked.
+    
+    Args:
+        text: Normalized name or address
+    
+    Returns:
+        Set of trigrams, empty for an empty string
+    """
+    if not text:
+        return frozenset()
+    padded = f" {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+def similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """
+    Dice coefficient of two trigram sets; insensitive to word order and cheap
+    enough to run on every candidate pair.
+    
+    Args:
+        a: Trigrams of the first string
+        b: Trigrams of the second string
+    
+    Returns:
+        Score between 0.0 and 1.0
+    """
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+def numbers_agree(a: FrozenSet[str], b: FrozenSet[str]) -> bool:
+    """
+    Check that the numbers of two strings don't contradict each other.
+    "Roofer 28" and "Roofer 288" or 28 and 288 Main St are similar strings
+    but different contractors; a number missing on one side is no conflict.
+    
+    Args:
+        a: Numbers in the first string
+        b: Numbers in the second string
+    
+    Returns:
+        True if one set of numbers contains the other
+    """
+    return a <= b or b <= a
+
+class _Profile:
+    """Normalized fields of one record."""
+    
+    __slots__ = ("name", "phone", "address", "zip", "name_grams", "address_grams", "name_numbers", "address_numbers")
+    
+    def __init__(self, record: Dict[str, Any]):
+        self.name = normalize_name(record.get("name"))
+        self.phone = normalize_phone(record.get("phone"))
+        self.address = normalize_address(record.get("address"))
+        self.name_grams = trigrams(self.name)
+        self.address_grams = trigrams(self.address)
+        self.name_numbers = frozenset(_NUMBER.findall(self.name))
+        self.address_numbers = frozenset(_NUMBER.findall(self.address))
+        
+        # ZIP of the address itself; the record's zip_code is the ZIP that was searched
+        match = _ZIP.search(record.get("address") or "")
+        self.zip = match.group(1) if match else ""
+    
+    def blocking_keys(self) -> Iterator[Tuple[str, ...]]:
+        """Keys shared by records that may be the same contractor."""
+        if self.phone:
+            yield ("phone", self.phone)
+        if self.name and self.zip:
+            yield ("name", self.name.split()[0], self.zip)
+        if self.address and self.zip:
+            # House number and first street word, e.g. ("123", "main")
+            words = self.address.split()
+            yield ("address", *words[:2], self.zip)
+
+class _UnionFind:
+    """Disjoint sets of record positions."""
+    
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+    
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+    
+    def union(self, i: int, j: int) -> None:
+        # The lower position stays the root, so a cluster sorts by its first record
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i != root_j:
+            self.parent[max(root_i, root_j)] = min(root_i, root_j)
+
+class EntityResolver:
+    """
+    Merges records that describe the same contractor.
+    Two records are compared only if they share a blocking key (phone
+    number, first name word and ZIP, or house number, street and ZIP). A
+    pair matches if the names are at least NAME_FLOOR similar, the phone or
+    address is known on both sides, and the weighted similarity of name,
+    phone and address reaches the threshold. Matches are clustered
+    transitively and each cluster becomes one golden record.
+    """
+    
+    def __init__(
+        self,
+        threshold: float = MATCH_THRESHOLD,
+        max_block_size: int = MAX_BLOCK_SIZE,
+        score: Optional[Callable[[Dict[str, Any]], float]] = None
+    ):
+        """
+        Initialize the resolver.
+        
+        Args:
+            threshold: Weighted similarity at which two records match (default: 0.75)
+            max_block_size: Largest block compared pairwise; larger ones are skipped (default: 100)
+            score: Data quality function applied to golden records (default: keep the best member's score)
+        """
+        self.threshold = threshold
+        self.max_block_size = max(2, max_block_size)
+        self.score = score
+        
+        # Statistics of the last run
+        self.comparisons = 0
+        self.matches = 0
+        self.skipped_blocks = 0
+    
+    def match_score(self, a: _Profile, b: _Profile) -> float:
+        """
+        Weighted similarity of two normalized records.
+        
+        Args:
+            a: First record's profile
+            b: Second record's profile
+        
+        Returns:
+            Score between 0.0 and 1.0, or 0.0 if the pair can't match
+        """
+        if not numbers_agree(a.name_numbers, b.name_numbers):
+            return 0.0
+        name = similarity(a.name_grams, b.name_grams)
+        if name < NAME_FLOOR:
+            return 0.0
+        
+        total = FIELD_WEIGHTS["name"] * name
+        weight = FIELD_WEIGHTS["name"]
+        if a.phone and b.phone:
+            total += FIELD_WEIGHTS["phone"] * (1.0 if a.phone == b.phone else 0.0)
+            weight += FIELD_WEIGHTS["phone"]
+        if a.address and b.address:
+            address = similarity(a.address_grams, b.address_grams) if numbers_agree(a.address_numbers, b.address_numbers) else 0.0
+            total += FIELD_WEIGHTS["address"] * address
+            weight += FIELD_WEIGHTS["address"]
+        
+        # A similar name alone is not evidence ("Roofer 28" and "Roofer 288")
+        if weight == FIELD_WEIGHTS["name"]:
+            return 0.0
+        return total / weight
+    
+    def cluster(self, records: List[Dict[str, Any]]) -> List[List[int]]:
+        """
+        Group the positions of records that describe the same contractor.
+        
+        Args:
+            records: Cleaned contractor records
+        
+        Returns:
+            Clusters of positions, each sorted, in order of their first position
+        """
+        profiles = [_Profile(record) for record in records]
+        
+        blocks: Dict[Tuple[str, ...], List[int]] = {}
+        for i, profile in enumerate(profiles):
+            for key in profile.blocking_keys():
+                blocks.setdefault(key, []).append(i)
+        
+        self.comparisons = self.matches = self.skipped_blocks = 0
+        sets = _UnionFind(len(records))
+        for key, members in blocks.items():
+            if len(members) < 2:
+                continue
+            if len(members) > self.max_block_size:
+                self.skipped_blocks += 1
+                logger.debug(f"Skipping block {key} of {len(members)} records")
+                continue
+            
+            for x, i in enumerate(members):
+                for j in members[x + 1:]:
+                    # Pairs already joined, through this block or another, need no comparison
+                    if sets.find(i) == sets.find(j):
+                        continue
+                    self.comparisons += 1
+                    if self.match_score(profiles[i], profiles[j]) >= self.threshold:
+                        self.matches += 1
+                        sets.union(i, j)
+        
+        clusters: Dict[int, List[int]] = {}
+        for i in range(len(records)):
+            clusters.setdefault(sets.find(i), []).append(i)
+        return list(clusters.values())
+    
+    def merge(self, members: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Build the golden record of a cluster.
+        The member with the best data quality (the first one on a tie) is the
+        base; its missing fields are filled from the other members in order
+        of quality, and certifications are combined.
+        
+        Args:
+            members: Records of one contractor, in input order
+        
+        Returns:
+            Golden record keeping the base member's id, with the other ids in merged_ids
+        """
+        ranked = sorted(members, key=lambda record: -(record.get("data_quality_score") or 0))
+        golden = dict(ranked[0])
+        
+        for record in ranked[1:]:
+            for field, value in record.items():
+                if golden.get(field) is None and value is not None:
+                    golden[field] = value
+        
+        for field in LIST_FIELDS:
+            combined = []
+            for record in ranked:
+                for value in record.get(field) or []:
+                    if value not in combined:
+                        combined.append(value)
+            if combined:
+                golden[field] = combined
+        
+        golden["merged_ids"] = [record["id"] for record in ranked[1:]]
+        if self.score:
+            golden["data_quality_score"] = self.score(golden)
+        return golden
+    
+    def resolve(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Merge the records that describe the same contractor.
+        
+        Args:
+            records: Cleaned, exactly deduplicated contractor records
+        
+        Returns:
+            One record per contractor, in order of each contractor's first record
+        """
+        clusters = self.cluster(records)
+        resolved = [
+            self.merge([records[i] for i in members]) if len(members) > 1 else records[members[0]]
+            for members in clusters
+        ]
+        
+        logger.info(f"Entity resolution: {len(records)} -> {len(resolved)} contractors "
+                    f"({self.comparisons} comparisons, {self.skipped_blocks} oversized blocks skipped)")
+        return resolved
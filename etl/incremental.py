@@ -0,0 +1,159 @@
+"""
+Incremental processing state for the ETL processor.
+Fingerprints the fields of each raw record that processing reads and keeps,
+next to the processed output, the contractor id each fingerprint produced,
+a fingerprint of every contractor's raw records, a watermark of the last
+processed input and the fingerprint of the service taxonomy it was enriched
+with. Later runs compare against it to find the contractors that are new,
+changed or gone.
+"""
+
+import os
+import json
+import hashlib
+import logging
+from typing import Dict, List, Any, Iterable, Optional
+
+logger = logging.getLogger("etl_incremental")
+
+# Bump when cleaning or enrichment changes, so stored results are rebuilt
+STATE_VERSION = 1
+
+def fingerprint_record(record: Dict[str, Any], fields: Iterable[str]) -> str:
+    """
+    Fingerprint the fields of a raw record that processing reads.
+    
+    Args:
+        record: Raw contractor record
+        fields: Fields read by the processor
+    
+    Returns:
+        Hex digest of the fields' canonical JSON
+    """
+    relevant = {field: record.get(field) for field in fields}
+    encoded = json.dumps(relevant, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(encoded.encode('utf-8'), digest_size=16).hexdigest()
+
+def group_fingerprint(fingerprints: List[str]) -> str:
+    """
+    Fingerprint the raw records of one contractor, in input order.
+    Order matters because deduplication keeps the first of equally good records.
+    
+    Args:
+        fingerprints: Fingerprints of the contractor's raw records
+    
+    Returns:
+        Hex digest
+    """
+    return hashlib.blake2b("\n".join(fingerprints).encode('utf-8'), digest_size=16).hexdigest()
+
+def sidecar_path(output_path: str, kind: str) -> str:
+    """
+    Path of a file kept next to the processed output.
+    
+    Args:
+        output_path: Processed output path, e.g. data/processed_contractors.json
+        kind: "state" or "changes"
+    
+    Returns:
+        Path such as data/processed_contractors.state.json
+    """
+    root, ext = os.path.splitext(output_path)
+    return f"{root}.{kind}{ext or '.json'}"
+
+def input_watermark(input_path: str) -> Dict[str, Any]:
+    """
+    Describe the raw input well enough to tell whether it changed since the last run.
+    
+    Args:
+        input_path: Raw data path
+    
+    Returns:
+        Dictionary with the absolute path, size and modification time of the input
+    """
+    stat = os.stat(input_path)
+    return {"path": os.path.abspath(input_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+class IncrementalState:
+    """Fingerprints and watermark of the last processed run, stored as JSON."""
+    
+    def __init__(self, path: str):
+        """
+        Initialize an empty state.
+        
+        Args:
+            path: Path of the state file
+        """
+        self.path = path
+        self.watermark: Optional[Dict[str, Any]] = None
+        self.processed_date: Optional[str] = None
+        
+        # Fingerprint of the service taxonomy the stored records were enriched with
+        self.taxonomy: Optional[str] = None
+        
+        # Raw record fingerprint -> contractor id it produced
+        self.record_ids: Dict[str, str] = {}
+        
+        # Contractor id -> fingerprint of its raw records
+        self.groups: Dict[str, str] = {}
+    
+    @classmethod
+    def load(cls, path: str) -> "IncrementalState":
+        """
+        Load the state of the last run.
+        
+        Args:
+            path: Path of the state file
+        
+        Returns:
+            Stored state, or an empty one if there is none or it was written by another STATE_VERSION
+        """
+        state = cls(path)
+        if not os.path.exists(path):
+            return state
+        
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable ETL state {path}: {str(e)}")
+            return state
+        
+        if stored.get("version") != STATE_VERSION:
+            logger.info(f"ETL state {path} is from another version, rebuilding")
+            return state
+        
+        state.watermark = stored.get("watermark")
+        state.processed_date = stored.get("processed_date")
+        state.taxonomy = stored.get("taxonomy")
+        state.record_ids = stored.get("record_ids", {})
+        state.groups = stored.get("groups", {})
+        return state
+    
+    def save(self) -> None:
+        """Write the state atomically."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "version": STATE_VERSION,
+                "watermark": self.watermark,
+                "processed_date": self.processed_date,
+                "taxonomy": self.taxonomy,
+                "record_ids": self.record_ids,
+                "groups": self.groups,
+            }, f)
+        os.replace(temp_path, self.path)
+
+def tombstone(contractor_id: str, processed_date: str) -> Dict[str, Any]:
+    """
+    Build the record announcing that a contractor is no longer in the raw data.
+    
+    Args:
+        contractor_id: Id of the removed contractor
+        processed_date: Timestamp of the run that noticed the removal
+    
+    Returns:
+        Tombstone record
+    """
+    return {"id": contractor_id, "deleted": True, "processed_date": processed_date}
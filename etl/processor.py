@@ -3,9 +3,14 @@ ETL processor for cleaning and transforming contractor data.
 """
 
 import json
+import heapq
 import logging
 import os
-from typing import Dict, List, Any, Optional
+import zlib
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
 from datetime import datetime
 
 # Import config settings
@@ -15,8 +20,13 @@ from config.settings import (
     RAW_DATA_PATH,
     PROCESSED_DATA_PATH,
     CONTRACTOR_FIELDS,
-    FIELD_PROCESSORS
+    FIELD_PROCESSORS,
+    SERVICE_TAXONOMY_PATH
 )
+from etl.streaming import DiskDeduplicator, StreamingWriter, iter_raw_records
+from etl.service_taxonomy import get_service_extractor
+from etl.entity_resolution import EntityResolver
+from etl.incremental import IncrementalState, fingerprint_record, group_fingerprint, input_watermark, sidecar_path, tombstone
 
 # Configure logging
 logging.basicConfig(
@@ -25,6 +35,20 @@ logging.basicConfig(
 )
 logger = logging.getLogger("etl_processor")
 
+# Importance of each field in the data quality score
+QUALITY_FIELD_WEIGHTS = {
+    "name": 1.0,
+    "rating": 0.7,
+    "address": 0.8,
+    "phone": 0.6,
+    "certifications": 0.5,
+    "description": 0.4,
+    "website": 0.5,
+}
+
+# Raw records handed to a worker process at a time in parallel mode
+DEFAULT_SHARD_SIZE = 10000
+
 class ContractorDataProcessor:
     """
     Processes raw contractor data to clean, normalize, and transform it.
@@ -33,7 +57,8 @@ class ContractorDataProcessor:
     def __init__(
         self,
         input_path: str = RAW_DATA_PATH,
-        output_path: str = PROCESSED_DATA_PATH
+        output_path: str = PROCESSED_DATA_PATH,
+        resolve_entities: bool = False
     ):
         """
         Initialize the contractor data processor.
@@ -41,9 +66,15 @@ class ContractorDataProcessor:
         Args:
             input_path: Path to the raw contractor data
             output_path: Path to save the processed data
+            resolve_entities: Also merge near-duplicate contractors after exact deduplication,
+                see resolve_entities_in (default: False; used by process and process_parallel)
         """
         self.input_path = input_path
         self.output_path = output_path
+        self.resolve_entities = resolve_entities
+        
+        # Timestamp stamped on every record of a run (default: the time each record is cleaned)
+        self.processed_date: Optional[str] = None
     
     def load_raw_data(self) -> List[Dict[str, Any]]:
         """
@@ -88,66 +119,96 @@ class ContractorDataProcessor:
         processed_contractors = []
         
         for i, contractor in enumerate(contractors):
-            try:
-                # Create a new dictionary with only the fields we want
-                processed = {}
-                
-                # Process each field
-                for field in CONTRACTOR_FIELDS:
-                    # Get the field value (or None if not present)
-                    value = contractor.get(field)
-                    
-                    # Apply field-specific processing if defined
-                    if field in FIELD_PROCESSORS and value is not None:
-                        try:
-                            value = FIELD_PROCESSORS[field](value)
-                        except Exception as e:
-                            logger.warning(f"Error processing field '{field}' for contractor {i}: {str(e)}")
-                    
-                    processed[field] = value
+            processed = self._clean_record(contractor, i)
+            if processed is not None:
+                processed_contractors.append(processed)
                 
-                # Add derived fields
-                processed["processed_date"] = datetime.now().isoformat()
+        return processed_contractors
+        
+    def iter_clean(self, contractors: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Clean and normalize contractor data one record at a time.
+        
+        Args:
+            contractors: Raw contractor data dictionaries
+            
+        Yields:
+            Cleaned and normalized contractor data dictionaries
+        """
+        for i, contractor in enumerate(contractors):
+            processed = self._clean_record(contractor, i)
+            if processed is not None:
+                yield processed
+    
+    def _clean_record(self, contractor: Dict[str, Any], i: int) -> Optional[Dict[str, Any]]:
+        """
+        Clean and normalize a single contractor.
+        
+        Args:
+            contractor: Raw contractor data dictionary
+            i: Position of the contractor in the raw data
+            
+        Returns:
+            Cleaned contractor data dictionary, or None if it could not be processed
+        """
+        try:
+            # Create a new dictionary with only the fields we want
+            processed = {}
+            
+            # Process each field
+            for field in CONTRACTOR_FIELDS:
+                # Get the field value (or None if not present)
+                value = contractor.get(field)
                 
-                # Extract city and state from address
-                address = processed.get("address", "")
-                if address and address != "N/A":
+                # Apply field-specific processing if defined
+                if field in FIELD_PROCESSORS and value is not None:
                     try:
-                        # Simple parsing - in real world would use a proper address parser
-                        parts = address.split(',')
-                        if len(parts) >= 2:
-                            processed["city"] = parts[-2].strip() if len(parts) > 2 else ""
-                            state_zip = parts[-1].strip().split()
-                            processed["state"] = state_zip[0] if state_zip else ""
+                        value = FIELD_PROCESSORS[field](value)
                     except Exception as e:
-                        logger.warning(f"Error parsing address for contractor {i}: {str(e)}")
-                
-                # Normalize empty or missing values
-                for key, value in processed.items():
-                    if value in (None, "", "N/A", "Unknown"):
-                        processed[key] = None
-                
-                # Add unique ID if not present
-                if "id" not in processed:
-                    # Create a simple ID based on name and address to avoid duplicates
-                    name = processed.get("name", "")
-                    address = processed.get("address", "")
-                    if name and address:
-                        import hashlib
-                        id_string = f"{name}|{address}".lower()
-                        processed["id"] = hashlib.md5(id_string.encode('utf-8')).hexdigest()
-                    else:
-                        processed["id"] = f"contractor_{i}"
-                
-                # Add data quality score
-                processed["data_quality_score"] = self._calculate_data_quality_score(processed)
+                        logger.warning(f"Error processing field '{field}' for contractor {i}: {str(e)}")
                 
-                processed_contractors.append(processed)
-                
-            except Exception as e:
-                logger.error(f"Error processing contractor {i}: {str(e)}")
-        
-        return processed_contractors
+                processed[field] = value
+            
+            # Add derived fields
+            processed["processed_date"] = self.processed_date or datetime.now().isoformat()
+            
+            # Extract city and state from address
+            address = processed.get("address", "")
+            if address and address != "N/A":
+                try:
+                    # Simple parsing - in real world would use a proper address parser
+                    parts = address.split(',')
+                    if len(parts) >= 2:
+                        processed["city"] = parts[-2].strip() if len(parts) > 2 else ""
+                        state_zip = parts[-1].strip().split()
+                        processed["state"] = state_zip[0] if state_zip else ""
+                except Exception as e:
+                    logger.warning(f"Error parsing address for contractor {i}: {str(e)}")
+            
+            # Normalize empty or missing values
+            for key, value in processed.items():
+                if value in (None, "", "N/A", "Unknown"):
+                    processed[key] = None
+            
+            # Add unique ID if not present
+            if "id" not in processed:
+                # Create a simple ID based on name and address to avoid duplicates
+                name = processed.get("name", "")
+                address = processed.get("address", "")
+                if name and address:
+                    id_string = f"{name}|{address}".lower()
+                    processed["id"] = hashlib.md5(id_string.encode('utf-8')).hexdigest()
+                else:
+                    processed["id"] = f"contractor_{i}"
+            
+            # Add data quality score
+            processed["data_quality_score"] = self._calculate_data_quality_score(processed)
+            
+            return processed
+            
+        except Exception as e:
+            logger.error(f"Error processing contractor {i}: {str(e)}")
+            return None
     
     def _calculate_data_quality_score(self, contractor: Dict[str, Any]) -> float:
         """
@@ -160,15 +221,7 @@ class ContractorDataProcessor:
             Quality score between 0.0 and 1.0
         """
         # Define importance of each field (weights)
-        field_weights = {
-            "name": 1.0,
-            "rating": 0.7,
-            "address": 0.8,
-            "phone": 0.6,
-            "certifications": 0.5,
-            "description": 0.4,
-            "website": 0.5,
-        }
+        field_weights = QUALITY_FIELD_WEIGHTS
         
         # Calculate weighted score
         total_weight = 0.0
@@ -224,6 +277,21 @@ class ContractorDataProcessor:
         logger.info(f"Deduplication: {len(contractors)} -> {len(deduplicated)} contractors")
         return deduplicated
     
+    def resolve_entities_in(self, contractors: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Merge contractors that are the same business under different spellings.
+        Catches what exact deduplication misses, such as "ABC Roofing LLC" and
+        "ABC Roofing" at one phone number; see EntityResolver.
+        
+        Args:
+            contractors: List of deduplicated contractor data dictionaries
+            
+        Returns:
+            List with one golden record per contractor
+        """
+        resolver = EntityResolver(score=self._calculate_data_quality_score)
+        return resolver.resolve(contractors)
+    
     def enrich_data(self, contractors: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Enrich the contractor data with additional information.
@@ -235,20 +303,47 @@ class ContractorDataProcessor:
             List of enriched contractor data dictionaries
         """
         for contractor in contractors:
-            # Calculate years in business (placeholder - in real implementation
-            # this would be based on real data like registration date)
-            contractor["years_in_business"] = None
-            
-            # Estimate company size (placeholder)
-            contractor["estimated_size"] = self._estimate_company_size(contractor)
+            self._enrich_record(contractor)
+        
+        return contractors
+    
+    def iter_enrich(self, contractors: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Enrich contractor data one record at a time.
+        
+        Args:
+            contractors: Contractor data dictionaries
             
-            # Extract services offered from description
-            contractor["services"] = self._extract_services(contractor.get("description", ""))
+        Yields:
+            Enriched contractor data dictionaries
+        """
+        for contractor in contractors:
+            yield self._enrich_record(contractor)
+    
+    def _enrich_record(self, contractor: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Enrich a single contractor in place.
+        
+        Args:
+            contractor: Contractor data dictionary
             
-            # Flag high-value prospects based on certifications, rating, etc.
-            contractor["high_value_prospect"] = self._is_high_value_prospect(contractor)
+        Returns:
+            The same dictionary, enriched
+        """
+        # Calculate years in business (placeholder - in real implementation
+        # this would be based on real data like registration date)
+        contractor["years_in_business"] = None
         
-        return contractors
+        # Estimate company size (placeholder)
+        contractor["estimated_size"] = self._estimate_company_size(contractor)
+        
+        # Extract services offered from description
+        contractor["services"] = self._extract_services(contractor.get("description", ""))
+        
+        # Flag high-value prospects based on certifications, rating, etc.
+        contractor["high_value_prospect"] = self._is_high_value_prospect(contractor)
+        
+        return contractor
     
     def _estimate_company_size(self, contractor: Dict[str, Any]) -> Optional[str]:
         """
@@ -282,7 +377,8 @@ class ContractorDataProcessor:
     def _extract_services(self, description: str) -> List[str]:
         """
         Extract services offered from the contractor description.
-        This is a placeholder implementation that would be more sophisticated in production.
+        Uses the service taxonomy (SERVICE_TAXONOMY_PATH, or the built-in one),
+        compiled once per process into a single pattern.
         
         Args:
             description: Contractor description text
@@ -290,39 +386,7 @@ class ContractorDataProcessor:
         Returns:
             List of identified services
         """
-        if not description:
-            return []
-        
-        # List of common roofing services to search for
-        services = [
-            "residential roofing",
-            "commercial roofing",
-            "roof replacement",
-            "roof repair",
-            "roof inspection",
-            "roof maintenance",
-            "emergency roof repair",
-            "storm damage",
-            "shingle roofing",
-            "metal roofing",
-            "flat roofing",
-            "tile roofing",
-            "slate roofing",
-            "gutter installation",
-            "skylight installation",
-            "insulation",
-            "ventilation",
-        ]
-        
-        # Check which services are mentioned in the description
-        found_services = []
-        description_lower = description.lower()
-        
-        for service in services:
-            if service in description_lower:
-                found_services.append(service)
-        
-        return found_services
+        return get_service_extractor(SERVICE_TAXONOMY_PATH).extract(description)
     
     def _is_high_value_prospect(self, contractor: Dict[str, Any]) -> bool:
         """
@@ -410,6 +474,7 @@ class ContractorDataProcessor:
         """
         try:
             logger.info(f"Starting ETL process for {self.input_path}")
+            self.processed_date = datetime.now().isoformat()
             
             # Load raw data
             raw_contractors = self.load_raw_data()
@@ -427,6 +492,11 @@ class ContractorDataProcessor:
             logger.info("Deduplicating records")
             unique_contractors = self.deduplicate(cleaned_contractors)
             
+            # Merge near duplicates
+            if self.resolve_entities:
+                logger.info("Resolving entities")
+                unique_contractors = self.resolve_entities_in(unique_contractors)
+            
             # Enrich
             logger.info("Enriching data with additional information")
             enriched_contractors = self.enrich_data(unique_contractors)
@@ -440,6 +510,414 @@ class ContractorDataProcessor:
         except Exception as e:
             logger.error(f"Error during ETL process: {str(e)}")
             return []
+    
+    def process_columnar(self) -> List[Dict[str, Any]]:
+        """
+        Execute the ETL process on columns instead of records.
+        Contractors are held in a pandas DataFrame and cleaned, scored,
+        deduplicated and enriched with column operations, see etl.columnar.
+        Produces the same output as process().
+        
+        Returns:
+            List of processed contractor data dictionaries
+        """
+        from etl.columnar import load_frame, clean_frame, deduplicate_frame, enrich_frame, frame_to_records
+        
+        try:
+            logger.info(f"Starting columnar ETL process for {self.input_path}")
+            self.processed_date = datetime.now().isoformat()
+            
+            raw_contractors = self.load_raw_data()
+            logger.info(f"Loaded {len(raw_contractors)} raw contractor records")
+            
+            if not raw_contractors:
+                logger.warning("No raw data found to process")
+                return []
+            
+            # Clean and normalize
+            logger.info("Cleaning and normalizing data")
+            frame = clean_frame(
+                load_frame(raw_contractors, CONTRACTOR_FIELDS),
+                FIELD_PROCESSORS,
+                self.processed_date,
+                QUALITY_FIELD_WEIGHTS
+            )
+            
+            # Deduplicate
+            logger.info("Deduplicating records")
+            unique = deduplicate_frame(frame)
+            logger.info(f"Deduplication: {len(frame)} -> {len(unique)} contractors")
+            
+            # Entity resolution works on records, so golden records are enriched one by one
+            logger.info("Enriching data with additional information")
+            if self.resolve_entities:
+                logger.info("Resolving entities")
+                contractors = self.resolve_entities_in(frame_to_records(unique, CONTRACTOR_FIELDS))
+                enriched_contractors = self.enrich_data(contractors)
+            else:
+                enriched_contractors = frame_to_records(enrich_frame(unique, self._extract_services), CONTRACTOR_FIELDS)
+            
+            # Save
+            self.save_processed_data(enriched_contractors)
+            
+            logger.info(f"ETL process complete: {len(enriched_contractors)} processed records")
+            return enriched_contractors
+            
+        except Exception as e:
+            logger.error(f"Error during columnar ETL process: {str(e)}")
+            return []
+    
+    def process_parallel(self, workers: Optional[int] = None, shard_size: int = DEFAULT_SHARD_SIZE) -> List[Dict[str, Any]]:
+        """
+        Execute the ETL process on a pool of worker processes.
+        Raw records are cleaned in shards and deduplicated locally, then
+        partitioned by contractor id so each partition is deduplicated across
+        shards and enriched by one worker. Produces the same output as process().
+        
+        Args:
+            workers: Number of worker processes (default: number of CPUs)
+            shard_size: Raw records per cleaning task (default: 10000)
+        
+        Returns:
+            List of processed contractor data dictionaries
+        """
+        workers = workers or os.cpu_count() or 1
+        if workers == 1:
+            return self.process()
+        
+        try:
+            logger.info(f"Starting ETL process for {self.input_path} with {workers} workers")
+            self.processed_date = datetime.now().isoformat()
+            
+            raw_contractors = self.load_raw_data()
+            logger.info(f"Loaded {len(raw_contractors)} raw contractor records")
+            
+            if not raw_contractors:
+                logger.warning("No raw data found to process")
+                return []
+            
+            shard_size = max(1, shard_size)
+            tasks = [
+                (start, raw_contractors[start:start + shard_size], workers)
+                for start in range(0, len(raw_contractors), shard_size)
+            ]
+            
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self.processed_date,)) as executor:
+                # Clean and deduplicate each shard
+                logger.info(f"Cleaning and normalizing data in {len(tasks)} shards")
+                shard_results = list(executor.map(_clean_shard, tasks))
+                cleaned = sum(count for count, _ in shard_results)
+                
+                # Deduplicate each id partition across shards and enrich it
+                logger.info("Deduplicating and enriching records")
+                partitions = [[partitions[bucket] for _, partitions in shard_results] for bucket in range(workers)]
+                merged = list(executor.map(_merge_partition, partitions))
+            
+            # Restore the serial order: first occurrence of each id
+            enriched_contractors = [contractor for _, contractor in heapq.merge(*merged, key=itemgetter(0))]
+            logger.info(f"Deduplication: {cleaned} -> {len(enriched_contractors)} contractors")
+            
+            # Merge near duplicates; golden records are enriched again from their merged fields
+            if self.resolve_entities:
+                logger.info("Resolving entities")
+                enriched_contractors = [
+                    self._enrich_record(contractor) if contractor.get("merged_ids") else contractor
+                    for contractor in self.resolve_entities_in(enriched_contractors)
+                ]
+            
+            self.save_processed_data(enriched_contractors)
+            
+            logger.info(f"ETL process complete: {len(enriched_contractors)} processed records")
+            return enriched_contractors
+            
+        except Exception as e:
+            logger.error(f"Error during parallel ETL process: {str(e)}")
+            return []
+    
+    def process_stream(self, work_dir: Optional[str] = None) -> int:
+        """
+        Execute the ETL process with bounded memory.
+        Raw records are read incrementally (NDJSON or the {"data": [...]} wrapper)
+        and piped through generator stages; duplicates are resolved in a
+        temporary on-disk table and output is written as it is produced.
+        Produces the same records as process().
+        
+        Args:
+            work_dir: Directory of the temporary deduplication table (default: the system temp directory)
+        
+        Returns:
+            Number of processed records written
+        """
+        if not os.path.exists(self.input_path):
+            logger.error(f"Input file not found: {self.input_path}")
+            return 0
+        
+        writer = StreamingWriter(self.output_path)
+        try:
+            logger.info(f"Starting streaming ETL process for {self.input_path}")
+            self.processed_date = datetime.now().isoformat()
+            
+            with DiskDeduplicator(directory=work_dir) as deduplicator:
+                # Clean and normalize while reading; deduplication has to see every record
+                deduplicator.add_all(self.iter_clean(iter_raw_records(self.input_path)))
+                logger.info(f"Deduplication: {deduplicator.seen} -> {deduplicator.unique} contractors")
+                
+                if not deduplicator.seen:
+                    logger.warning("No raw data found to process")
+                    return 0
+                
+                # Enrich and write the kept records one at a time
+                writer.open()
+                for contractor in self.iter_enrich(deduplicator):
+                    writer.write(contractor)
+            
+            writer.close({
+                "process_date": datetime.now().isoformat(),
+                "record_count": writer.count,
+                "source_file": self.input_path,
+            })
+            
+            logger.info(f"Saved processed data to {self.output_path}")
+            logger.info(f"ETL process complete: {writer.count} processed records")
+            return writer.count
+            
+        except Exception as e:
+            logger.error(f"Error during streaming ETL process: {str(e)}")
+            writer.abort()
+            return 0
+
+    def _load_previous_output(self) -> Dict[str, Dict[str, Any]]:
+        """Load the records of the last processed output by contractor id."""
+        if not os.path.exists(self.output_path):
+            return {}
+        try:
+            with open(self.output_path, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read previous output {self.output_path}: {str(e)}")
+            return {}
+        
+        records = previous.get("data", []) if isinstance(previous, dict) else previous
+        return {record["id"]: record for record in records if isinstance(record, dict) and record.get("id")}
+    
+    def _save_changes(self, upserts: List[Dict[str, Any]], tombstones: List[Dict[str, Any]]) -> str:
+        """Write the records changed by an incremental run next to the processed output."""
+        path = sidecar_path(self.output_path, "changes")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "upserts": upserts,
+                "tombstones": tombstones,
+                "metadata": {
+                    "process_date": datetime.now().isoformat(),
+                    "upsert_count": len(upserts),
+                    "tombstone_count": len(tombstones),
+                    "source_file": self.input_path,
+                },
+            }, f, indent=2)
+        os.replace(temp_path, path)
+        return path
+    
+    def process_incremental(self, full: bool = False) -> Dict[str, Any]:
+        """
+        Execute the ETL process for new and changed records only.
+        Each raw record is fingerprinted on the fields processing reads. Raw
+        records seen before are mapped to their contractor without cleaning
+        them, contractors whose raw records are unchanged are carried forward
+        from the previous output with their original processed_date, and
+        contractors no longer in the raw data become tombstones. Every
+        contractor is re-enriched when the service taxonomy changed. The full
+        output is written as usual; the upserts and tombstones are also
+        written to <output>.changes.json for DBManager.apply_changes_from_json.
+        
+        Args:
+            full: Ignore the stored state and reprocess everything (default: False)
+        
+        Returns:
+            Dictionary with the record, changed, unchanged and tombstone counts
+        """
+        summary = {"record_count": 0, "changed": 0, "unchanged": 0, "tombstones": 0, "up_to_date": False}
+        
+        try:
+            if not os.path.exists(self.input_path):
+                logger.error(f"Input file not found: {self.input_path}")
+                return summary
+            
+            state_path = sidecar_path(self.output_path, "state")
+            state = IncrementalState(state_path) if full else IncrementalState.load(state_path)
+            previous = self._load_previous_output() if state.groups else {}
+            if state.groups and not previous:
+                logger.warning("Previous output is missing, reprocessing everything")
+                state = IncrementalState(state_path)
+            
+            # Services depend on the taxonomy, so a changed taxonomy re-enriches every contractor
+            taxonomy = get_service_extractor(SERVICE_TAXONOMY_PATH).fingerprint
+            same_taxonomy = state.taxonomy == taxonomy
+            if previous and not same_taxonomy:
+                logger.info("Service taxonomy changed since the last run, re-enriching every contractor")
+            
+            # Nothing to do if the input is the one processed last time
+            watermark = input_watermark(self.input_path)
+            if previous and same_taxonomy and state.watermark == watermark:
+                logger.info(f"{self.input_path} has not changed since {state.processed_date}, nothing to process")
+                self._save_changes([], [])
+                summary.update(record_count=len(previous), unchanged=len(previous), up_to_date=True)
+                return summary
+            
+            logger.info(f"Starting incremental ETL process for {self.input_path}")
+            self.processed_date = datetime.now().isoformat()
+            
+            raw_contractors = self.load_raw_data()
+            logger.info(f"Loaded {len(raw_contractors)} raw contractor records")
+            
+            # Map every raw record to its contractor, cleaning only records not seen before
+            record_ids: Dict[str, str] = {}
+            cleaned: Dict[int, Dict[str, Any]] = {}
+            members: Dict[str, List[int]] = {}
+            member_fingerprints: Dict[str, List[str]] = {}
+            for i, contractor in enumerate(raw_contractors):
+                # Fingerprints read fields, so a record that is not an object cannot be tracked
+                if not isinstance(contractor, dict):
+                    logger.error(f"Error processing contractor {i}: record is not an object")
+                    continue
+                
+                fingerprint = fingerprint_record(contractor, CONTRACTOR_FIELDS)
+                contractor_id = state.record_ids.get(fingerprint)
+                if contractor_id is None:
+                    processed = self._clean_record(contractor, i)
+                    if processed is None:
+                        continue
+                    contractor_id = processed["id"]
+                    cleaned[i] = processed
+                
+                # Fallback ids depend on the record's position, so they are never reused
+                if not contractor_id.startswith("contractor_"):
+                    record_ids[fingerprint] = contractor_id
+                members.setdefault(contractor_id, []).append(i)
+                member_fingerprints.setdefault(contractor_id, []).append(fingerprint)
+            
+            groups = {contractor_id: group_fingerprint(fingerprints) for contractor_id, fingerprints in member_fingerprints.items()}
+            
+            # Rebuild contractors whose raw records changed, carry the others forward
+            records = []
+            upserts = []
+            for contractor_id, positions in members.items():
+                if same_taxonomy and contractor_id in previous and state.groups.get(contractor_id) == groups[contractor_id]:
+                    records.append(previous[contractor_id])
+                    continue
+                
+                best: Dict[Any, Tuple[int, Dict[str, Any]]] = {}
+                for i in positions:
+                    processed = cleaned.pop(i, None) or self._clean_record(raw_contractors[i], i)
+                    if processed is not None:
+                        _keep_best(best, i, processed)
+                if contractor_id not in best:
+                    continue
+                
+                contractor = self._enrich_record(best[contractor_id][1])
+                records.append(contractor)
+                upserts.append(contractor)
+            
+            tombstones = [
+                tombstone(contractor_id, self.processed_date)
+                for contractor_id in previous
+                if contractor_id not in members
+            ]
+            
+            logger.info(f"Incremental ETL: {len(upserts)} new or changed, {len(records) - len(upserts)} unchanged, "
+                        f"{len(tombstones)} removed contractors")
+            
+            self.save_processed_data(records)
+            changes_path = self._save_changes(upserts, tombstones)
+            logger.info(f"Saved changes to {changes_path}")
+            
+            state.record_ids = record_ids
+            state.groups = groups
+            state.watermark = watermark
+            state.processed_date = self.processed_date
+            state.taxonomy = taxonomy
+            state.save()
+            
+            summary.update(
+                record_count=len(records),
+                changed=len(upserts),
+                unchanged=len(records) - len(upserts),
+                tombstones=len(tombstones)
+            )
+            return summary
+            
+        except Exception as e:
+            logger.error(f"Error during incremental ETL process: {str(e)}")
+            return summary
+
+# Processor of each worker process, created once by _init_worker
+_worker_processor: Optional[ContractorDataProcessor] = None
+
+def _init_worker(processed_date: str) -> None:
+    """Create the processor of a worker process, sharing the run timestamp."""
+    global _worker_processor
+    _worker_processor = ContractorDataProcessor()
+    _worker_processor.processed_date = processed_date
+
+def _bucket_of(contractor_id: Any, buckets: int) -> int:
+    """Dedup partition of a contractor id, stable across processes unlike hash()."""
+    return zlib.crc32(json.dumps(contractor_id).encode('utf-8')) % buckets
+
+def _keep_best(best: Dict[Any, Tuple[int, Dict[str, Any]]], position: int, contractor: Dict[str, Any]) -> None:
+    """
+    Apply the rule of ContractorDataProcessor.deduplicate to one record: the first
+    record of an id keeps its position, a later one replaces it only if its
+    data quality score is strictly higher.
+    """
+    contractor_id = contractor.get("id")
+    kept = best.get(contractor_id)
+    if kept is None:
+        best[contractor_id] = (position, contractor)
+    elif contractor.get("data_quality_score", 0) > kept[1].get("data_quality_score", 0):
+        best[contractor_id] = (kept[0], contractor)
+
+def _clean_shard(task: Tuple[int, List[Dict[str, Any]], int]) -> Tuple[int, List[List[Tuple[int, Dict[str, Any]]]]]:
+    """
+    Clean a shard of raw records and deduplicate it locally.
+    
+    Args:
+        task: Position of the shard's first record, its raw records and the number of dedup partitions
+        
+    Returns:
+        Number of cleaned records, and the locally kept (position, record) pairs of
+        each partition in first-seen order
+    """
+    start, contractors, buckets = task
+    best: Dict[Any, Tuple[int, Dict[str, Any]]] = {}
+    cleaned = 0
+    for offset, contractor in enumerate(contractors):
+        processed = _worker_processor._clean_record(contractor, start + offset)
+        if processed is not None:
+            cleaned += 1
+            _keep_best(best, start + offset, processed)
+    
+    partitions: List[List[Tuple[int, Dict[str, Any]]]] = [[] for _ in range(buckets)]
+    for contractor_id, entry in best.items():
+        partitions[_bucket_of(contractor_id, buckets)].append(entry)
+    return cleaned, partitions
+
+def _merge_partition(shards: List[List[Tuple[int, Dict[str, Any]]]]) -> List[Tuple[int, Dict[str, Any]]]:
+    """
+    Deduplicate one partition across shards and enrich the records kept.
+    
+    Args:
+        shards: Locally kept (position, record) pairs of the partition, in shard order
+        
+    Returns:
+        Enriched (position, record) pairs ordered by first-seen position
+    """
+    best: Dict[Any, Tuple[int, Dict[str, Any]]] = {}
+    for entries in shards:
+        for position, contractor in entries:
+            _keep_best(best, position, contractor)
+    
+    return [(position, _worker_processor._enrich_record(contractor)) for position, contractor in sorted(best.values(), key=itemgetter(0))]
 
 def main():
     """Main function to run the ETL processor."""
@@ -449,6 +927,13 @@ def main():
     parser = argparse.ArgumentParser(description="Contractor Data ETL Processor")
     parser.add_argument("--input", type=str, default=RAW_DATA_PATH, help=f"Input data file path (default: {RAW_DATA_PATH})")
     parser.add_argument("--output", type=str, default=PROCESSED_DATA_PATH, help=f"Output data file path (default: {PROCESSED_DATA_PATH})")
+    parser.add_argument("--workers", type=int, help="Process with this many worker processes, 0 for one per CPU (default: single process)")
+    parser.add_argument("--columnar", action="store_true", help="Process with vectorized pandas column operations")
+    parser.add_argument("--stream", action="store_true", help="Read NDJSON or JSON input record by record with bounded memory")
+    parser.add_argument("--incremental", action="store_true", help="Only process new or changed records and write tombstones for removed ones")
+    parser.add_argument("--full", action="store_true", help="With --incremental, ignore the stored fingerprints and reprocess everything")
+    parser.add_argument("--resolve-entities", action="store_true", help="Also merge near-duplicate contractors (not with --stream or --incremental)")
+    parser.add_argument("--work-dir", type=str, help="Directory of temporary files in streaming mode (default: system temp directory)")
     parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
     
     args = parser.parse_args()
@@ -458,10 +943,24 @@ def main():
     logging.basicConfig(level=log_level)
     
     # Run the processor
-    processor = ContractorDataProcessor(input_path=args.input, output_path=args.output)
-    processed_data = processor.process()
+    if args.resolve_entities and (args.stream or args.incremental):
+        parser.error("--resolve-entities needs all records in memory and can't be combined with --stream or --incremental")
+    
+    processor = ContractorDataProcessor(input_path=args.input, output_path=args.output, resolve_entities=args.resolve_entities)
+    if args.incremental:
+        summary = processor.process_incremental(full=args.full)
+        processed_count = summary["record_count"]
+        print(f"{summary['changed']} new or changed, {summary['unchanged']} unchanged, {summary['tombstones']} removed")
+    elif args.stream:
+        processed_count = processor.process_stream(work_dir=args.work_dir)
+    elif args.columnar:
+        processed_count = len(processor.process_columnar())
+    elif args.workers is not None:
+        processed_count = len(processor.process_parallel(workers=args.workers or None))
+    else:
+        processed_count = len(processor.process())
     
-    print(f"Processed {len(processed_data)} contractor records")
+    print(f"Processed {processed_count} contractor records")
     print(f"Output saved to {args.output}")
 
 if __name__ == "__main__":
@@ -0,0 +1,203 @@
+"""
+Service extraction for the ETL processor.
+Compiles a taxonomy of canonical roofing services and their synonyms into a
+single prefix-factored regular expression, so a description is scanned once
+however many terms the taxonomy holds, and maps every match back to its
+canonical service names.
+"""
+
+import re
+import json
+import hashlib
+import logging
+import functools
+from typing import Dict, List, Any, Optional, Tuple
+
+logger = logging.getLogger("etl_service_taxonomy")
+
+# Canonical service -> phrases that mention it; the canonical name always matches too
+DEFAULT_TAXONOMY: Dict[str, List[str]] = {
+    "residential roofing": ["residential roofer", "home roofing", "house roofing"],
+    "commercial roofing": ["commercial roofer", "commercial roof", "industrial roofing"],
+    "roof replacement": ["replace your roof", "new roof", "reroofing", "re-roofing", "reroof", "re-roof", "roof installation"],
+    "roof repair": ["roof leak", "leak repair", "roof fix"],
+    "roof inspection": ["roof assessment", "roof evaluation", "roof certification"],
+    "roof maintenance": ["roof tune-up", "roof cleaning", "preventive maintenance"],
+    "emergency roof repair": ["emergency repair", "emergency roofing", "emergency service", "24/7 service"],
+    "storm damage": ["hail damage", "wind damage", "storm restoration", "insurance claim"],
+    "shingle roofing": ["shingle roof", "asphalt shingle", "architectural shingle", "shingle"],
+    "metal roofing": ["metal roof", "standing seam"],
+    "flat roofing": ["flat roof", "low slope roofing", "low-slope roof", "tpo", "epdm", "modified bitumen"],
+    "tile roofing": ["tile roof", "clay tile", "concrete tile"],
+    "slate roofing": ["slate roof"],
+    "gutter installation": ["gutter replacement", "seamless gutter", "gutter guard", "gutter"],
+    "skylight installation": ["skylight"],
+    "insulation": ["attic insulation"],
+    "ventilation": ["attic ventilation", "ridge vent"],
+}
+
+# Separator of the words of a phrase, so "re-roofing" and "re  roofing" match the same term
+WORD_SEPARATOR = r"[\s\-]+"
+
+# Plural endings accepted after any phrase
+PLURAL_SUFFIXES = ("es", "s")
+
+def normalize_phrase(phrase: str) -> str:
+    """
+    Lowercase a phrase and collapse separators between its words to single spaces.
+    
+    Args:
+        phrase: Service name, synonym or matched text
+    
+    Returns:
+        Normalized phrase
+    """
+    return re.sub(WORD_SEPARATOR, " ", phrase.strip().lower())
+
+def _trie_pattern(node: Dict[str, Any]) -> str:
+    """Build the regex of a character trie; the "" key marks the end of a phrase."""
+    branches = []
+    for char in sorted(key for key in node if key):
+        atom = WORD_SEPARATOR if char == " " else re.escape(char)
+        branches.append(atom + _trie_pattern(node[char]))
+    
+    if not branches:
+        return ""
+    if len(branches) == 1 and "" not in node:
+        return branches[0]
+    
+    group = "(?:" + "|".join(branches) + ")"
+    return group + "?" if "" in node else group
+
+class ServiceExtractor:
+    """
+    Finds the services of a taxonomy mentioned in free text.
+    Matches are case-insensitive, bounded by word edges, tolerate hyphens and
+    extra whitespace between words and accept a plural ending. Phrases may
+    overlap: "metal roof repair" yields both "metal roofing" and "roof repair".
+    The longest phrase starting at a word also reports the services of the
+    shorter phrases it contains, so "emergency roof repair" yields both it
+    and "roof repair".
+    """
+    
+    def __init__(self, taxonomy: Optional[Dict[str, List[str]]] = None):
+        """
+        Compile a taxonomy.
+        
+        Args:
+            taxonomy: Canonical service -> synonyms (default: DEFAULT_TAXONOMY)
+        """
+        taxonomy = DEFAULT_TAXONOMY if taxonomy is None else taxonomy
+        
+        # Canonical names in taxonomy order, which is the order of extracted services
+        self.services = list(taxonomy)
+        
+        # Identifies the taxonomy, e.g. so incremental runs notice it changed; order matters
+        encoded = json.dumps(taxonomy, separators=(",", ":"), ensure_ascii=False)
+        self.fingerprint = hashlib.blake2b(encoded.encode('utf-8'), digest_size=16).hexdigest()
+        self._rank = {service: i for i, service in enumerate(self.services)}
+        
+        # Normalized phrase -> canonical services it names
+        phrases: Dict[str, List[str]] = {}
+        for service, synonyms in taxonomy.items():
+            for phrase in [service, *synonyms]:
+                normalized = normalize_phrase(phrase)
+                if normalized and service not in phrases.setdefault(normalized, []):
+                    phrases[normalized].append(service)
+        
+        # A phrase also names every service whose phrase it contains as whole words
+        self._phrase_services: Dict[str, Tuple[str, ...]] = {}
+        for phrase in phrases:
+            padded = f" {phrase} "
+            services = {
+                service
+                for other, other_services in phrases.items()
+                if f" {other} " in padded
+                for service in other_services
+            }
+            self._phrase_services[phrase] = tuple(sorted(services, key=self._rank.__getitem__))
+        
+        trie: Dict[str, Any] = {}
+        for phrase in phrases:
+            node = trie
+            for char in phrase:
+                node = node.setdefault(char, {})
+            node[""] = {}
+        
+        # A lookahead matches nothing, so the scan tries every word start and
+        # overlapping phrases ("metal roof" in "metal roof repair") are all found
+        suffix = "|".join(PLURAL_SUFFIXES)
+        self.pattern = re.compile(
+            rf"(?<!\w)(?=((?:{_trie_pattern(trie)})(?:{suffix})?)(?!\w))",
+            re.IGNORECASE
+        ) if phrases else None
+        
+        logger.debug(f"Compiled {len(phrases)} phrases of {len(self.services)} services")
+    
+    def _services_of(self, matched: str) -> Tuple[str, ...]:
+        """Map matched text to its services, removing a plural ending if needed."""
+        phrase = normalize_phrase(matched)
+        services = self._phrase_services.get(phrase)
+        if services is not None:
+            return services
+        for plural in PLURAL_SUFFIXES:
+            if phrase.endswith(plural):
+                services = self._phrase_services.get(phrase[:-len(plural)])
+                if services is not None:
+                    return services
+        return ()
+    
+    def extract(self, text: Optional[str]) -> List[str]:
+        """
+        Find the services mentioned in a text.
+        
+        Args:
+            text: Description or other free text
+        
+        Returns:
+            Canonical service names in taxonomy order, without duplicates
+        """
+        if not text or self.pattern is None:
+            return []
+        
+        found = set()
+        for match in self.pattern.finditer(text):
+            found.update(self._services_of(match.group(1)))
+        return sorted(found, key=self._rank.__getitem__)
+
+def load_taxonomy(path: str) -> Dict[str, List[str]]:
+    """
+    Load a taxonomy from a JSON object of canonical service -> list of synonyms.
+    
+    Args:
+        path: Path to the taxonomy JSON file
+    
+    Returns:
+        Taxonomy dictionary
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        taxonomy = json.load(f)
+    
+    if not isinstance(taxonomy, dict) or not all(
+        isinstance(synonyms, list) and all(isinstance(synonym, str) for synonym in synonyms)
+        for synonyms in taxonomy.values()
+    ):
+        raise ValueError(f"{path} must map each service name to a list of synonyms")
+    return taxonomy
+
+@functools.lru_cache(maxsize=None)
+def get_service_extractor(taxonomy_path: Optional[str] = None) -> ServiceExtractor:
+    """
+    Get the extractor of a taxonomy, compiling it on first use in this process.
+    
+    Args:
+        taxonomy_path: Taxonomy JSON file (default: DEFAULT_TAXONOMY)
+    
+    Returns:
+        Shared ServiceExtractor
+    """
+    taxonomy = load_taxonomy(taxonomy_path) if taxonomy_path else None
+    extractor = ServiceExtractor(taxonomy)
+    logger.info(f"Loaded service taxonomy of {len(extractor.services)} services"
+                + (f" from {taxonomy_path}" if taxonomy_path else ""))
+    return extractor
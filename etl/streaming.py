@@ -0,0 +1,353 @@
+"""
+Streaming building blocks for the ETL processor.
+Reads raw contractor records one at a time from NDJSON files or from the
+{"data": [...]} JSON written by the scraper, deduplicates them through an
+on-disk table and writes output as records arrive, so memory use stays
+flat however large the raw file is.
+"""
+
+import os
+import json
+import sqlite3
+import logging
+import tempfile
+from typing import Dict, List, Any, Iterable, Iterator, Optional, TextIO
+
+logger = logging.getLogger("etl_streaming")
+
+# Characters read from the input at a time
+CHUNK_SIZE = 1 << 20
+
+# Output paths with these extensions are written as one record per line
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+
+# Characters of a file inspected when its format is not given by the extension
+SNIFF_SIZE = 1 << 16
+
+class _JsonReader:
+    """Incremental JSON tokenizer that decodes one value at a time from a file."""
+    
+    def __init__(self, f: TextIO, chunk_size: int = CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+    
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer, dropping what was consumed."""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+    
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ("" at the end)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+    
+    def take(self, expected: str) -> str:
+        """Consume the next non-whitespace character, which must be one of `expected`."""
+        char = self.peek()
+        if not char or char not in expected:
+            raise ValueError(f"Expected one of {expected!r} but found {char or 'end of file'!r}")
+        self.pos += 1
+        return char
+    
+    def value(self) -> Any:
+        """Decode the next JSON value, reading more of the file until it is complete."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+    
+    def array_items(self) -> Iterator[Any]:
+        """Yield the items of the array whose "[" was just consumed."""
+        if self.peek() == "]":
+            self.take("]")
+            return
+        while True:
+            yield self.value()
+            if self.take(",]") == "]":
+                return
+
+def iter_json_records(path: str, key: str = "data", chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Yield the records of a JSON file without loading it whole.
+    Accepts a top-level list or an object holding the list under `key`;
+    other keys (such as metadata) are skipped.
+    
+    Args:
+        path: Path to the JSON file
+        key: Key of the record list in a wrapper object (default: "data")
+        chunk_size: Characters read at a time (default: 1 MiB)
+    
+    Yields:
+        Records in file order
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        reader = _JsonReader(f, chunk_size)
+        if reader.take("[{") == "[":
+            yield from reader.array_items()
+            return
+        
+        if reader.peek() == "}":
+            return
+        while True:
+            name = reader.value()
+            reader.take(":")
+            if name == key and reader.peek() == "[":
+                reader.take("[")
+                yield from reader.array_items()
+            else:
+                reader.value()
+            if reader.take(",}") == "}":
+                return
+
+def iter_ndjson_records(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the records of an NDJSON file, skipping blank and malformed lines.
+    
+    Args:
+        path: Path to the NDJSON file
+    
+    Yields:
+        Records in file order
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"Skipping malformed line {line_number} of {path}: {str(e)}")
+
+def is_ndjson(path: str) -> bool:
+    """
+    Check whether a file holds one JSON record per line.
+    Decided by the extension, or from a bounded prefix of the file: a list
+    is a single document, and an object is a record only if its first line
+    fits in the prefix and is a complete record rather than the start of a
+    wrapper. The whole first line is never read, so a compact single-line
+    document keeps memory bounded.
+    
+    Args:
+        path: Path to the file
+    
+    Returns:
+        True for NDJSON, False for a single JSON document
+    """
+    if path.endswith(NDJSON_EXTENSIONS):
+        return True
+    
+    with open(path, 'r', encoding='utf-8') as f:
+        prefix = f.read(SNIFF_SIZE).lstrip()
+    if not prefix.startswith("{"):
+        return False
+    
+    # A first line longer than the prefix is not a single record
+    first_line, newline, _ = prefix.partition("\n")
+    if not newline:
+        return False
+    try:
+        first = json.loads(first_line)
+    except json.JSONDecodeError:
+        return False
+    return isinstance(first, dict) and "data" not in first
+
+def iter_raw_records(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield raw contractor records from NDJSON or from the scraper's JSON output.
+    
+    Args:
+        path: Path to the raw data file
+    
+    Yields:
+        Raw contractor records
+    """
+    records = iter_ndjson_records(path) if is_ndjson(path) else iter_json_records(path)
+    for record in records:
+        if isinstance(record, dict):
+            yield record
+        else:
+            logger.warning(f"Skipping non-object record in {path}")
+
+class DiskDeduplicator:
+    """
+    Keeps the best record per key in a temporary SQLite table instead of a dict.
+    Matches ContractorDataProcessor.deduplicate: a later record replaces the
+    kept one only if its score is strictly higher, and records come out in
+    the order their key was first seen.
+    """
+    
+    def __init__(
+        self,
+        key: str = "id",
+        score: str = "data_quality_score",
+        directory: Optional[str] = None,
+        batch_size: int = 1000
+    ):
+        """
+        Initialize the deduplicator.
+        
+        Args:
+            key: Field identifying duplicates (default: "id")
+            score: Field compared to pick the record kept (default: "data_quality_score")
+            directory: Directory of the temporary table (default: the system temp directory)
+            batch_size: Records inserted per transaction (default: 1000)
+        """
+        self.key = key
+        self.score = score
+        self.batch_size = max(1, batch_size)
+        self.seen = 0
+        
+        fd, self.path = tempfile.mkstemp(prefix="etl_dedup_", suffix=".db", dir=directory)
+        os.close(fd)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode = OFF")
+        self.conn.execute("PRAGMA synchronous = OFF")
+        self.conn.execute("""
+            CREATE TABLE records (
+                first_seen INTEGER PRIMARY KEY,
+                key TEXT NOT NULL UNIQUE,
+                score REAL NOT NULL,
+                record TEXT NOT NULL
+            )
+        """)
+    
+    def _insert(self, batch: List[tuple]) -> None:
+        """Upsert a batch of (position, key, score, record) rows."""
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO records (first_seen, key, score, record) VALUES (?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET score = excluded.score, record = excluded.record
+                WHERE excluded.score > records.score
+                """,
+                batch
+            )
+    
+    def add_all(self, records: Iterable[Dict[str, Any]]) -> None:
+        """
+        Add records, keeping the best one per key.
+        
+        Args:
+            records: Records to deduplicate
+        """
+        batch = []
+        for record in records:
+            # JSON-encode the key so a missing key still groups like a dict key of None
+            batch.append((self.seen, json.dumps(record.get(self.key)), record.get(self.score, 0) or 0, json.dumps(record)))
+            self.seen += 1
+            if len(batch) >= self.batch_size:
+                self._insert(batch)
+                batch = []
+        if batch:
+            self._insert(batch)
+    
+    @property
+    def unique(self) -> int:
+        """Number of distinct keys added."""
+        return self.conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Yield the kept records in first-seen order (the rowid order, so nothing is sorted)."""
+        for (record,) in self.conn.execute("SELECT record FROM records ORDER BY first_seen"):
+            yield json.loads(record)
+    
+    def close(self) -> None:
+        """Drop the temporary table."""
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
+    
+    def __enter__(self) -> "DiskDeduplicator":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+class StreamingWriter:
+    """
+    Writes processed records as they are produced.
+    NDJSON paths get one record per line; other paths get the processor's
+    {"data": [...], "metadata": {...}} layout with one record per line, the
+    metadata following the records since the count is only known at the end.
+    The file is written under a temporary name and renamed when complete.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Initialize the writer.
+        
+        Args:
+            path: Output path
+        """
+        self.path = path
+        self.ndjson = path.endswith(NDJSON_EXTENSIONS)
+        self.temp_path = f"{path}.tmp"
+        self.count = 0
+        self.f: Optional[TextIO] = None
+    
+    def open(self) -> "StreamingWriter":
+        """Create the output file."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.f = open(self.temp_path, 'w', encoding='utf-8')
+        if not self.ndjson:
+            self.f.write('{"data": [')
+        return self
+    
+    def write(self, record: Dict[str, Any]) -> None:
+        """
+        Append a record.
+        
+        Args:
+            record: Processed record
+        """
+        if self.ndjson:
+            self.f.write(json.dumps(record) + "\n")
+        else:
+            self.f.write(("\n" if self.count == 0 else ",\n") + json.dumps(record))
+        self.count += 1
+    
+    def close(self, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Finish the output and move it into place.
+        
+        Args:
+            metadata: Metadata stored after the records (ignored for NDJSON)
+        """
+        if not self.ndjson:
+            self.f.write(f'\n], "metadata": {json.dumps(metadata or {}, indent=2)}}}\n')
+        self.f.close()
+        os.replace(self.temp_path, self.path)
+    
+    def abort(self) -> None:
+        """Discard a partially written output."""
+        if self.f and not self.f.closed:
+            self.f.close()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
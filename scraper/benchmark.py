@@ -0,0 +1,277 @@
+"""
+Offline throughput benchmark of the GAF scraper.
+Starts the local mock site and scrapes it with MultiZipScraper at several
+concurrency levels, reporting pages and records per second, p50/p95 page
+load latency and the peak resident memory of the scraper and its browser.
+Nothing leaves the machine, so runs are comparable across changes.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import tempfile
+from typing import Any, Dict, List, Optional, Sequence
+
+from .metrics import ScrapeMetrics
+from .debug_artifacts import DebugArtifactSink
+from .browser_worker import process_tree_rss_mb
+from .mock_site import MockSite, add_site_arguments, site_from_arguments
+
+logger = logging.getLogger("gaf_scraper.benchmark")
+
+DEFAULT_LEVELS = (1, 2, 4, 8)
+
+# Geometric buckets from 5 ms to about 30 s, fine enough for latency percentiles
+LATENCY_BUCKETS = tuple(round(0.005 * 1.25 ** i, 4) for i in range(40))
+
+# Request budget high enough that the rate limiter is never the bottleneck
+UNLIMITED_REQUESTS_PER_MINUTE = 1_000_000
+
+async def _sample_peak_rss(stop: asyncio.Event, interval: float) -> Optional[float]:
+    """Sample the memory of this process and its browser until stopped, returning the peak in MB."""
+    peak = None
+    while True:
+        rss = process_tree_rss_mb(os.getpid())
+        if rss is not None:
+            peak = max(peak or 0.0, rss)
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+            return peak
+        except asyncio.TimeoutError:
+            pass
+
+async def run_level(
+    base_url: str,
+    zip_codes: List[str],
+    concurrency: int,
+    work_dir: str,
+    page_concurrency: int = 4,
+    extraction_mode: str = "dom",
+    headless: bool = True,
+    timeout: int = 30000
+) -> Dict[str, Any]:
+    """
+    Scrape every ZIP code from the mock site with a given number of concurrent searches.
+    
+    Args:
+        base_url: Search page URL of the mock site
+        zip_codes: ZIP codes to search
+        concurrency: Searches (and browser contexts) running at once
+        work_dir: Directory the raw data and error snapshots of the run are written to
+        page_concurrency: Result pages of one search loaded at once (default: 4)
+        extraction_mode: "dom" or "network", see GAFScraper (default: "dom")
+        headless: Whether to run browser in headless mode (default: True)
+        timeout: Timeout for operations in milliseconds (default: 30000)
+    
+    Returns:
+        Dictionary of throughput, latency and memory results; status is "failed"
+        when every ZIP code failed or no page was scraped
+    """
+    from .multi_zip import MultiZipScraper
+    
+    metrics = ScrapeMetrics(buckets=LATENCY_BUCKETS)
+    scraper = MultiZipScraper(
+        zip_codes=zip_codes,
+        headless=headless,
+        requests_per_minute=UNLIMITED_REQUESTS_PER_MINUTE,
+        timeout=timeout,
+        pool_size=concurrency,
+        max_concurrency=concurrency,
+        extraction_mode=extraction_mode,
+        artifact_sink=DebugArtifactSink(
+            directory=os.path.join(work_dir, "artifacts"),
+            sample_every=0,
+            screenshots=False,
+            metrics=metrics
+        ),
+        metrics=metrics,
+        page_concurrency=page_concurrency,
+        base_url=base_url
+    )
+    scraper.raw_data_path = os.path.join(work_dir, f"raw_contractors_c{concurrency}.json")
+    
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(_sample_peak_rss(stop, 0.1))
+    started = time.monotonic()
+    try:
+        results = await scraper.scrape()
+    finally:
+        elapsed = time.monotonic() - started
+        stop.set()
+        peak_rss = await sampler
+    
+    statistics = scraper.get_statistics()
+    pages = sum(result["pages_scraped"] for result in results.values())
+    records = sum(result["total_results"] for result in results.values())
+    
+    # A ZIP code without a result was never searched, e.g. because the browser did not start
+    zip_codes_failed = sum(1 for zip_code in zip_codes if results.get(zip_code, {}).get("status", "error") == "error")
+    failed = pages == 0 or zip_codes_failed == len(zip_codes)
+    if failed:
+        logger.error(f"Concurrency {concurrency} failed: {zip_codes_failed} of {len(zip_codes)} ZIP codes failed, "
+                     f"{pages} pages scraped")
+    
+    # Throughput is measured after the browser is up, launch time is reported on its own
+    launch = metrics.histograms.get("browser_launch")
+    launch_seconds = launch.sum if launch else 0.0
+    scrape_seconds = max(elapsed - launch_seconds, 1e-9)
+    
+    navigation = metrics.histograms.get("navigation")
+    p50 = navigation.quantile(0.5) if navigation else None
+    p95 = navigation.quantile(0.95) if navigation else None
+    
+    return {
+        "concurrency": concurrency,
+        "status": "failed" if failed else "ok",
+        "zip_codes": len(zip_codes),
+        "zip_codes_failed": zip_codes_failed,
+        "pages": pages,
+        "records": records,
+        "requests": statistics["request_count"],
+        "errors": statistics["error_count"],
+        "captchas": statistics["captcha_count"],
+        "launch_seconds": round(launch_seconds, 3),
+        "scrape_seconds": round(scrape_seconds, 3),
+        "pages_per_second": round(pages / scrape_seconds, 2),
+        "records_per_second": round(records / scrape_seconds, 2),
+        "p50_page_seconds": round(p50, 3) if p50 is not None else None,
+        "p95_page_seconds": round(p95, 3) if p95 is not None else None,
+        "peak_rss_mb": round(peak_rss, 1) if peak_rss is not None else None,
+    }
+
+async def run_benchmark(
+    site: MockSite,
+    zip_codes: List[str],
+    levels: Sequence[int] = DEFAULT_LEVELS,
+    page_concurrency: int = 4,
+    extraction_mode: str = "dom",
+    headless: bool = True,
+    timeout: int = 30000
+) -> List[Dict[str, Any]]:
+    """
+    Serve the mock site and benchmark the scraper against it at each concurrency level.
+    
+    Args:
+        site: Mock site to serve for the duration of the benchmark
+        zip_codes: ZIP codes searched at every level
+        levels: Numbers of concurrent searches to measure (default: 1, 2, 4 and 8)
+        page_concurrency: Result pages of one search loaded at once (default: 4)
+        extraction_mode: "dom" or "network", see GAFScraper (default: "dom")
+        headless: Whether to run browser in headless mode (default: True)
+        timeout: Timeout for operations in milliseconds (default: 30000)
+    
+    Returns:
+        One result dictionary per level, see run_level
+    """
+    base_url = await site.start()
+    results = []
+    try:
+        with tempfile.TemporaryDirectory(prefix="gaf_benchmark_") as work_dir:
+            for concurrency in levels:
+                logger.info(f"Benchmarking {len(zip_codes)} ZIP codes at concurrency {concurrency}")
+                result = await run_level(
+                    base_url,
+                    zip_codes,
+                    concurrency,
+                    work_dir,
+                    page_concurrency=page_concurrency,
+                    extraction_mode=extraction_mode,
+                    headless=headless,
+                    timeout=timeout
+                )
+                results.append(result)
+                logger.info(f"Concurrency {concurrency}: {result['pages_per_second']} pages/s, "
+                            f"{result['records_per_second']} records/s")
+    finally:
+        await site.stop()
+    
+    return results
+
+def format_results(results: List[Dict[str, Any]]) -> str:
+    """
+    Format benchmark results as a text table.
+    
+    Args:
+        results: Result dictionaries returned by run_benchmark
+    
+    Returns:
+        Table with one row per concurrency level
+    """
+    columns = [
+        ("concurrency", "conc"),
+        ("status", "status"),
+        ("pages", "pages"),
+        ("records", "records"),
+        ("zip_codes_failed", "failed ZIPs"),
+        ("errors", "errors"),
+        ("scrape_seconds", "seconds"),
+        ("pages_per_second", "pages/s"),
+        ("records_per_second", "records/s"),
+        ("p50_page_seconds", "p50 s"),
+        ("p95_page_seconds", "p95 s"),
+        ("peak_rss_mb", "peak RSS MB"),
+    ]
+    rows = [[label for _, label in columns]]
+    for result in results:
+        rows.append(["-" if result[key] is None else str(result[key]) for key, _ in columns])
+    
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    return "\n".join("  ".join(value.rjust(width) for value, width in zip(row, widths)) for row in rows)
+
+async def main():
+    """Main function to run the benchmark."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Offline throughput benchmark of the GAF scraper against a local mock site")
+    parser.add_argument("--levels", type=int, nargs="+", default=list(DEFAULT_LEVELS), help="Concurrent searches to measure (default: 1 2 4 8)")
+    parser.add_argument("--zip-count", type=int, default=8, help="ZIP codes searched at each level (default: 8)")
+    parser.add_argument("--page-concurrency", type=int, default=4, help="Result pages of one search loaded at once (default: 4)")
+    parser.add_argument("--extraction-mode", choices=("dom", "network"), default="dom", help="Extraction mode of the scraper (default: dom)")
+    parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    parser.add_argument("--timeout", type=int, default=30000, help="Timeout in milliseconds (default: 30000)")
+    parser.add_argument("--output", type=str, help="Also write the results as JSON to this file")
+    add_site_arguments(parser)
+    parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
+    
+    args = parser.parse_args()
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    # Per-page scraper logs would dominate the timings and the output
+    logging.getLogger("gaf_scraper").setLevel(logging.DEBUG if args.verbose else logging.WARNING)
+    logger.setLevel(logging.DEBUG if args.verbose else logging.INFO)
+    
+    site = site_from_arguments(args)
+    zip_codes = [f"{10001 + i:05d}" for i in range(args.zip_count)]
+    
+    results = await run_benchmark(
+        site,
+        zip_codes,
+        levels=args.levels,
+        page_concurrency=args.page_concurrency,
+        extraction_mode=args.extraction_mode,
+        headless=not args.headed,
+        timeout=args.timeout
+    )
+    
+    print(f"\nScraped {len(zip_codes)} ZIP codes x {args.results} results from the mock site "
+          f"({args.latency}s + up to {args.latency_jitter}s latency) at each level\n")
+    print(format_results(results))
+    
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"site": site.get_statistics(), "results": results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    
+    failed_levels = [result["concurrency"] for result in results if result["status"] == "failed"]
+    if failed_levels:
+        print(f"\nFailed at concurrency {', '.join(map(str, failed_levels))}: every ZIP code failed or no page was scraped")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
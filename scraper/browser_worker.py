@@ -0,0 +1,440 @@
+"""
+Persistent warm Chromium worker for the GAF scraper.
+Keeps one Chromium running with the DevTools protocol enabled so scraper
+runs can attach over CDP instead of launching a browser each time. The
+worker is health-checked and recycled after a number of pages or when it
+grows past a memory ceiling. It is launched without a proxy, so runs that
+rotate proxies launch their own browser instead of attaching.
+"""
+import os
+import json
+import time
+import shutil
+import signal
+import asyncio
+import logging
+import tempfile
+import subprocess
+import urllib.request
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+logger = logging.getLogger("gaf_scraper.browser_worker")
+
+DEFAULT_STATE_PATH = os.path.join("data", "browser_worker.json")
+
+def _usage_path(state_path: str) -> str:
+    """Path of the append-only file where scraper runs report pages served."""
+    return os.path.splitext(state_path)[0] + ".usage"
+
+def read_worker_state(state_path: str = DEFAULT_STATE_PATH) -> Optional[Dict[str, Any]]:
+    """
+    Read the state file written by a running worker.
+    
+    Args:
+        state_path: Path to the worker state file
+    
+    Returns:
+        Worker state dictionary or None if no worker is running
+    """
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _fetch_json(url: str, timeout: float) -> Any:
+    """Fetch and decode a JSON document from the DevTools HTTP endpoint."""
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+async def find_worker_endpoint(state_path: str = DEFAULT_STATE_PATH, timeout: float = 1.0) -> Optional[str]:
+    """
+    Find the CDP endpoint of a healthy running worker.
+    
+    Args:
+        state_path: Path to the worker state file
+        timeout: Health check timeout in seconds
+    
+    Returns:
+        HTTP endpoint to pass to connect_over_cdp, or None if no healthy worker is running
+    """
+    state = read_worker_state(state_path)
+    if not state or state.get("status") != "ready":
+        return None
+    
+    try:
+        await asyncio.to_thread(_fetch_json, f"{state['http_endpoint']}/json/version", timeout)
+        return state["http_endpoint"]
+    except Exception as e:
+        logger.debug(f"Browser worker at {state.get('http_endpoint')} is not responding: {str(e)}")
+        return None
+
+def record_pages_served(pages: int, state_path: str = DEFAULT_STATE_PATH) -> None:
+    """
+    Report the number of pages a scraper run loaded in the worker.
+    Lines are appended atomically, so concurrent runs do not need a lock.
+    
+    Args:
+        pages: Number of pages loaded
+        state_path: Path to the worker state file
+    """
+    state = read_worker_state(state_path)
+    if not state or pages <= 0:
+        return
+    
+    line = f"{state['generation']} {pages}\n".encode("utf-8")
+    fd = os.open(_usage_path(state_path), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+def process_tree_rss_mb(root_pid: int) -> Optional[float]:
+    """
+    Sum the resident memory of a process and all its descendants.
+    Uses /proc, so it returns None on platforms without it.
+    """
+    if not os.path.isdir("/proc"):
+        return None
+    
+    parents: Dict[int, int] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", 'r') as f:
+                # The command name may contain spaces, so split after the closing parenthesis
+                fields = f.read().rsplit(")", 1)[1].split()
+            parents[int(entry)] = int(fields[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    
+    tree = {root_pid}
+    changed = True
+    while changed:
+        changed = False
+        for pid, ppid in parents.items():
+            if ppid in tree and pid not in tree:
+                tree.add(pid)
+                changed = True
+    
+    total_kb = 0
+    for pid in tree:
+        try:
+            with open(f"/proc/{pid}/status", 'r') as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+        except (OSError, ValueError):
+            continue
+    
+    return total_kb / 1024.0
+
+class BrowserWorker:
+    """
+    Supervises a long-lived Chromium process that scraper runs attach to over CDP.
+    """
+    
+    def __init__(
+        self,
+        port: int = 9222,
+        headless: bool = True,
+        max_pages: int = 500,
+        max_memory_mb: int = 1500,
+        health_interval: float = 10.0,
+        max_health_failures: int = 3,
+        state_path: str = DEFAULT_STATE_PATH,
+        executable_path: Optional[str] = None,
+        extra_args: Optional[List[str]] = None
+    ):
+        """
+        Initialize the browser worker.
+        
+        Args:
+            port: DevTools port to listen on (default: 9222)
+            headless: Whether to run Chromium headless (default: True)
+            max_pages: Recycle the browser after this many pages (default: 500)
+            max_memory_mb: Recycle the browser when its processes use more memory (default: 1500)
+            health_interval: Seconds between health checks (default: 10)
+            max_health_failures: Restart after this many consecutive failed checks (default: 3)
+            state_path: Where to publish the endpoint for scraper runs
+            executable_path: Chromium binary (default: the one installed by Playwright)
+            extra_args: Additional Chromium command line arguments
+        """
+        self.port = port
+        self.headless = headless
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.health_interval = health_interval
+        self.max_health_failures = max_health_failures
+        self.state_path = state_path
+        self.executable_path = executable_path
+        self.extra_args = extra_args or []
+        
+        self.process: Optional[subprocess.Popen] = None
+        self.user_data_dir: Optional[str] = None
+        self.generation = 0
+        self.started_at: Optional[float] = None
+        self.health_failures = 0
+        self._stopping = False
+    
+    @property
+    def http_endpoint(self) -> str:
+        """DevTools HTTP endpoint of the browser."""
+        return f"http://127.0.0.1:{self.port}"
+    
+    async def _resolve_executable(self) -> str:
+        """Find the Chromium binary installed by Playwright."""
+        if self.executable_path:
+            return self.executable_path
+        
+        from playwright.async_api import async_playwright
+        
+        playwright = await async_playwright().start()
+        try:
+            self.executable_path = playwright.chromium.executable_path
+        finally:
+            await playwright.stop()
+        return self.executable_path
+    
+    def _write_state(self, status: str, **extra: Any) -> None:
+        """Publish the worker state for scraper runs."""
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        state = {
+            "status": status,
+            "http_endpoint": self.http_endpoint,
+            "pid": self.process.pid if self.process else None,
+            "generation": self.generation,
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat() if self.started_at else None,
+            **extra,
+        }
+        
+        # Write then rename so readers never see a partial file
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+    
+    def pages_served(self) -> int:
+        """
+        Count the pages reported by scraper runs for the current browser.
+        
+        Returns:
+            Number of pages served since the last (re)start
+        """
+        total = 0
+        try:
+            with open(_usage_path(self.state_path), 'r', encoding='utf-8') as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) == 2 and parts[0] == str(self.generation):
+                        total += int(parts[1])
+        except (OSError, ValueError):
+            pass
+        return total
+    
+    def memory_mb(self) -> Optional[float]:
+        """
+        Get the resident memory used by the browser and its child processes.
+        
+        Returns:
+            Memory in megabytes, or None if it cannot be measured
+        """
+        if not self.process:
+            return None
+        return process_tree_rss_mb(self.process.pid)
+    
+    async def start(self) -> None:
+        """Launch Chromium and wait until the DevTools endpoint responds."""
+        executable = await self._resolve_executable()
+        
+        self.generation += 1
+        self.user_data_dir = tempfile.mkdtemp(prefix="gaf_browser_worker_")
+        args = [
+            executable,
+            f"--remote-debugging-port={self.port}",
+            "--remote-debugging-address=127.0.0.1",
+            f"--user-data-dir={self.user_data_dir}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--disable-dev-shm-usage",
+            "--disable-background-networking",
+            *(["--headless=new"] if self.headless else []),
+            *self.extra_args,
+            "about:blank",
+        ]
+        
+        self.process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.started_at = time.time()
+        self.health_failures = 0
+        self._write_state("starting")
+        
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if await self.is_healthy():
+                self._write_state("ready")
+                logger.info(f"Browser worker generation {self.generation} ready at {self.http_endpoint} "
+                            f"(pid {self.process.pid})")
+                return
+            if self.process.poll() is not None:
+                break
+            await asyncio.sleep(0.2)
+        
+        await self.stop_browser()
+        raise RuntimeError("Browser worker failed to start")
+    
+    async def stop_browser(self) -> None:
+        """Terminate the Chromium process and remove its profile directory."""
+        if self.process and self.process.poll() is None:
+            self.process.send_signal(signal.SIGTERM)
+            try:
+                await asyncio.to_thread(self.process.wait, 10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                await asyncio.to_thread(self.process.wait)
+        self.process = None
+        
+        if self.user_data_dir:
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
+            self.user_data_dir = None
+    
+    async def is_healthy(self) -> bool:
+        """
+        Check that the browser process is alive and the DevTools endpoint responds.
+        
+        Returns:
+            True if the browser is healthy, False otherwise
+        """
+        if not self.process or self.process.poll() is not None:
+            return False
+        try:
+            await asyncio.to_thread(_fetch_json, f"{self.http_endpoint}/json/version", 2.0)
+            return True
+        except Exception:
+            return False
+    
+    async def active_pages(self) -> int:
+        """
+        Count the pages currently open by attached scraper runs.
+        
+        Returns:
+            Number of open pages other than the initial blank tab
+        """
+        try:
+            targets = await asyncio.to_thread(_fetch_json, f"{self.http_endpoint}/json/list", 2.0)
+        except Exception:
+            return 0
+        return sum(1 for t in targets if t.get("type") == "page" and t.get("url") != "about:blank")
+    
+    async def recycle(self, reason: str, drain_timeout: float = 60.0) -> None:
+        """
+        Restart the browser once attached runs have finished their pages.
+        
+        Args:
+            reason: Why the browser is being recycled (for logging)
+            drain_timeout: Maximum seconds to wait for open pages to close
+        """
+        logger.info(f"Recycling browser worker generation {self.generation}: {reason}")
+        self._write_state("draining", reason=reason)
+        
+        deadline = time.monotonic() + drain_timeout
+        while time.monotonic() < deadline and await self.active_pages() > 0:
+            await asyncio.sleep(1.0)
+        
+        await self.stop_browser()
+        await self.start()
+    
+    async def check(self) -> None:
+        """Run one health, page-count and memory check, recycling if needed."""
+        if not await self.is_healthy():
+            self.health_failures += 1
+            logger.warning(f"Browser worker health check failed ({self.health_failures}/{self.max_health_failures})")
+            if self.health_failures >= self.max_health_failures or (self.process and self.process.poll() is not None):
+                await self.stop_browser()
+                await self.start()
+            return
+        
+        self.health_failures = 0
+        
+        pages = self.pages_served()
+        if self.max_pages and pages >= self.max_pages:
+            await self.recycle(f"served {pages} pages")
+            return
+        
+        memory = self.memory_mb()
+        if self.max_memory_mb and memory is not None and memory > self.max_memory_mb:
+            await self.recycle(f"using {memory:.0f} MB")
+            return
+        
+        memory_text = f"{memory:.0f} MB" if memory is not None else "unknown memory"
+        self._write_state("ready", pages_served=pages, memory_mb=round(memory, 1) if memory is not None else None)
+        logger.debug(f"Browser worker healthy: {pages} pages, {memory_text}")
+    
+    async def run(self) -> None:
+        """Start the browser and supervise it until stopped."""
+        await self.start()
+        try:
+            while not self._stopping:
+                await asyncio.sleep(self.health_interval)
+                await self.check()
+        finally:
+            await self.shutdown()
+    
+    def request_stop(self) -> None:
+        """Ask the supervision loop to exit."""
+        self._stopping = True
+    
+    async def shutdown(self) -> None:
+        """Stop the browser and withdraw the published endpoint."""
+        await self.stop_browser()
+        for path in (self.state_path, _usage_path(self.state_path)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        logger.info("Browser worker stopped")
+
+async def main():
+    """Main function to run the browser worker."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Persistent Chromium worker for the GAF scraper")
+    parser.add_argument("--port", type=int, default=9222, help="DevTools port (default: 9222)")
+    parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    parser.add_argument("--max-pages", type=int, default=500, help="Recycle after this many pages (default: 500)")
+    parser.add_argument("--max-memory-mb", type=int, default=1500, help="Recycle above this memory use (default: 1500)")
+    parser.add_argument("--health-interval", type=float, default=10.0, help="Seconds between health checks (default: 10)")
+    parser.add_argument("--state-path", type=str, default=DEFAULT_STATE_PATH, help=f"Worker state file (default: {DEFAULT_STATE_PATH})")
+    parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
+    
+    args = parser.parse_args()
+    
+    log_level = logging.DEBUG if args.verbose else logging.INFO
+    logging.basicConfig(
+        level=log_level,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    worker = BrowserWorker(
+        port=args.port,
+        headless=not args.headed,
+        max_pages=args.max_pages,
+        max_memory_mb=args.max_memory_mb,
+        health_interval=args.health_interval,
+        state_path=args.state_path
+    )
+    
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, worker.request_stop)
+        except NotImplementedError:
+            pass
+    
+    print(f"Starting browser worker on {worker.http_endpoint} (state file: {args.state_path})")
+    await worker.run()
+
+if __name__ == "__main__":
+    asyncio.run(main())
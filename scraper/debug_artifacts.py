@@ -0,0 +1,230 @@
+"""
+Debug artifacts for the GAF scraper.
+Captures page HTML and screenshots for a sample of pages (and always on
+errors), compresses them and writes them off the event loop under
+{directory}/{run_id}/{zip_code}/, keeping the directory within a disk budget.
+"""
+import os
+import gzip
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from .metrics import ScrapeMetrics
+
+logger = logging.getLogger("gaf_scraper.debug_artifacts")
+
+DEFAULT_ARTIFACT_DIR = os.path.join("logs", "artifacts")
+
+class DebugArtifactSink:
+    """
+    Sampled, compressed store of page snapshots.
+    HTML is gzipped and screenshots are saved as JPEG; file writes run in a
+    worker thread so they never block the scrape.
+    """
+    
+    def __init__(
+        self,
+        directory: str = DEFAULT_ARTIFACT_DIR,
+        sample_every: int = 10,
+        max_size_mb: float = 200,
+        run_id: Optional[str] = None,
+        screenshots: bool = True,
+        screenshot_quality: int = 50,
+        metrics: Optional[ScrapeMetrics] = None
+    ):
+        """
+        Initialize the artifact sink.
+        
+        Args:
+            directory: Root directory of the artifacts (default: logs/artifacts)
+            sample_every: Capture one in every N successful pages, 0 to capture errors only (default: 10)
+            max_size_mb: Disk budget of the directory, oldest artifacts are removed beyond it (default: 200 MB)
+            run_id: Name of this run's subdirectory (default: current timestamp)
+            screenshots: Capture screenshots along with HTML (default: True)
+            screenshot_quality: JPEG quality of screenshots (default: 50)
+            metrics: Registry the write times are recorded in (default: None)
+        """
+        self.directory = directory
+        self.sample_every = max(0, sample_every)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.screenshots = screenshots
+        self.screenshot_quality = screenshot_quality
+        self.metrics = metrics
+        
+        self.success_pages = 0
+        self.captured = 0
+        self.evicted = 0
+        self._pending: Set[asyncio.Future] = set()
+        self._lock = threading.Lock()
+        self._files: Deque[Tuple[str, int]] = deque()
+        self._total_bytes = 0
+        self._scanned = False
+    
+    def _scan_existing(self) -> None:
+        """
+        Index the artifacts already on disk, oldest first, for eviction.
+        Runs on the first write rather than at construction, so sinks that
+        never capture anything don't walk the directory. Writers wait for the
+        scan, so it never sees files of this sink.
+        """
+        with self._lock:
+            if self._scanned:
+                return
+            self._scanned = True
+        
+            existing = []
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    existing.append((stat.st_mtime, path, stat.st_size))
+            
+            for _, path, size in sorted(existing):
+                self._files.append((path, size))
+                self._total_bytes += size
+    
+    def should_capture(self, error: bool = False) -> bool:
+        """
+        Decide whether the current page is captured.
+        
+        Args:
+            error: Whether the page is captured because of an error
+        
+        Returns:
+            True if the page should be captured
+        """
+        if error:
+            return True
+        if not self.sample_every:
+            return False
+        
+        self.success_pages += 1
+        return (self.success_pages - 1) % self.sample_every == 0
+    
+    def artifact_path(self, zip_code: str, page_num: int, label: str, extension: str) -> str:
+        """
+        Build the path of an artifact.
+        
+        Args:
+            zip_code: ZIP code being searched
+            page_num: Result page number
+            label: Kind of snapshot, e.g. "page_content" or "error_navigation"
+            extension: File extension
+        
+        Returns:
+            Path of the artifact
+        """
+        return os.path.join(self.directory, self.run_id, zip_code, f"{label}_{zip_code}_p{page_num}.{extension}")
+    
+    async def capture(self, page, zip_code: str, page_num: int, label: str = "page_content", error: bool = False) -> bool:
+        """
+        Capture the HTML (and a screenshot) of a page if it is sampled.
+        Only the browser round trips are awaited; compression and writing
+        happen in the background until flush() is called.
+        
+        Args:
+            page: Playwright page object
+            zip_code: ZIP code being searched
+            page_num: Result page number
+            label: Kind of snapshot, e.g. "page_content" or "error_navigation"
+            error: Always capture, regardless of sampling
+        
+        Returns:
+            True if the page was captured
+        """
+        if not self.should_capture(error):
+            return False
+        
+        files: List[Tuple[str, bytes, bool]] = []
+        try:
+            html = await page.content()
+            files.append((self.artifact_path(zip_code, page_num, label, "html.gz"), html.encode("utf-8"), True))
+        except Exception as e:
+            logger.debug(f"Could not read page content for {zip_code}: {str(e)}")
+        
+        if self.screenshots:
+            try:
+                image = await page.screenshot(type="jpeg", quality=self.screenshot_quality)
+                files.append((self.artifact_path(zip_code, page_num, label, "jpg"), image, False))
+            except Exception as e:
+                logger.debug(f"Could not take screenshot for {zip_code}: {str(e)}")
+        
+        if not files:
+            return False
+        
+        self.captured += 1
+        future = asyncio.get_running_loop().run_in_executor(None, self._write_files, files)
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        return True
+    
+    def _write_files(self, files: List[Tuple[str, bytes, bool]]) -> None:
+        """Compress and write artifact files, then enforce the disk budget."""
+        started = time.monotonic()
+        self._scan_existing()
+        for path, content, compress in files:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if compress:
+                    content = gzip.compress(content, compresslevel=6)
+                with open(path, "wb") as f:
+                    f.write(content)
+            except OSError as e:
+                logger.warning(f"Could not write debug artifact {path}: {str(e)}")
+                continue
+            
+            with self._lock:
+                self._files.append((path, len(content)))
+                self._total_bytes += len(content)
+        
+        self._enforce_budget()
+        if self.metrics:
+            self.metrics.observe("artifact_write", time.monotonic() - started)
+    
+    def _enforce_budget(self) -> None:
+        """Remove the oldest artifacts until the directory fits the disk budget."""
+        with self._lock:
+            while self._total_bytes > self.max_size_bytes and self._files:
+                path, size = self._files.popleft()
+                self._total_bytes -= size
+                try:
+                    os.remove(path)
+                    self.evicted += 1
+                except OSError:
+                    continue
+                
+                # Drop directories left empty by the eviction
+                parent = os.path.dirname(path)
+                while parent and os.path.abspath(parent) != os.path.abspath(self.directory):
+                    try:
+                        os.rmdir(parent)
+                    except OSError:
+                        break
+                    parent = os.path.dirname(parent)
+    
+    async def flush(self) -> None:
+        """Wait for every pending write to finish."""
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get artifact statistics.
+        
+        Returns:
+            Dictionary with captured and evicted artifact counts and disk usage
+        """
+        return {
+            "artifacts_captured": self.captured,
+            "artifacts_evicted": self.evicted,
+            "artifact_bytes": self._total_bytes,
+        }
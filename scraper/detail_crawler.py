@@ -0,0 +1,255 @@
+"""
+Contractor profile page crawler.
+Visits the profile page of each contractor found by the search with a
+bounded pool of pages, and merges the phone, website, description, address,
+rating and certifications found there into the search records.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from playwright.async_api import BrowserContext, Page, TimeoutError as PlaywrightTimeoutError
+
+from . import page_selectors
+from .page_selectors import build_detail_fields
+
+logger = logging.getLogger("gaf_scraper.detail_crawler")
+
+# Collects the profile fields in a single round trip, preferring the
+# schema.org structured data and falling back to the rendered page.
+EXTRACT_DETAILS_JS = """
+(cfg) => {
+    const out = { certifications: [] };
+    const hostOf = (href) => {
+        try { return new URL(href, location.href).hostname; } catch (e) { return ""; }
+    };
+    const matchesDomain = (host, domains) => domains.some((d) => host === d || host.endsWith("." + d));
+    const isContractorSite = (href) => {
+        const host = hostOf(href);
+        return host && !matchesDomain(host, cfg.firstPartyDomains) && !matchesDomain(host, cfg.websiteExcludeDomains);
+    };
+
+    document.querySelectorAll('script[type="application/ld+json"]').forEach((script) => {
+        let data;
+        try { data = JSON.parse(script.textContent); } catch (e) { return; }
+        const items = [].concat(data && data["@graph"] ? data["@graph"] : data);
+        for (const item of items) {
+            if (!item || typeof item !== "object") continue;
+            if (item.telephone && !out.phone) out.phone = String(item.telephone);
+            if (item.url && !out.website && isContractorSite(item.url)) out.website = item.url;
+            if (item.description && !out.description) out.description = String(item.description);
+            const a = item.address;
+            if (a && !out.address) {
+                out.address = typeof a === "string" ? a : [
+                    a.streetAddress, a.addressLocality, [a.addressRegion, a.postalCode].filter(Boolean).join(" ")
+                ].filter(Boolean).join(", ");
+            }
+            const r = item.aggregateRating;
+            if (r && out.rating == null) {
+                out.rating = r.ratingValue;
+                out.reviewCount = r.reviewCount || r.ratingCount;
+            }
+        }
+    });
+
+    const text = document.body ? document.body.innerText : "";
+
+    if (!out.phone) {
+        const phoneEl = document.querySelector(cfg.phoneSelector);
+        const match = text.match(new RegExp(cfg.phonePattern));
+        out.phone = phoneEl ? (phoneEl.textContent.trim() || phoneEl.getAttribute("href").replace("tel:", "")) : (match ? match[0] : null);
+    }
+    if (!out.website) {
+        const link = Array.from(document.querySelectorAll(cfg.linkSelector)).find((a) => /^https?:/.test(a.href) && isContractorSite(a.href));
+        out.website = link ? link.href : null;
+    }
+    if (!out.description) {
+        const paragraphs = Array.from(document.querySelectorAll(cfg.detailDescriptionSelector), (p) => p.textContent.trim()).filter(Boolean);
+        const meta = document.querySelector('meta[name="description"]');
+        out.description = paragraphs.length ? paragraphs.join("\\n") : (meta ? meta.getAttribute("content") : null);
+    }
+    if (out.description) out.description = out.description.slice(0, cfg.detailMaxDescriptionLength);
+    if (!out.address) {
+        const addressEl = document.querySelector(cfg.detailAddressSelector);
+        out.address = addressEl ? addressEl.textContent.replace(/\\s*\\n\\s*/g, ", ").trim() : null;
+    }
+    if (out.rating == null) {
+        const rating = text.match(new RegExp(cfg.ratingPattern));
+        if (rating) {
+            out.rating = rating[1];
+            out.reviewCount = rating[2];
+        }
+    }
+
+    const certificationRe = new RegExp(cfg.certificationPattern, "i");
+    document.querySelectorAll(cfg.certificationSelector).forEach((el) => {
+        const isImage = el.tagName === "IMG";
+        if (!isImage && el.children.length) return;
+        const value = ((isImage ? el.getAttribute("alt") : el.textContent) || "").trim();
+        if (!value || value.length > cfg.certificationMaxLength) return;
+        if (!certificationRe.test(value) || cfg.certificationExclude.includes(value)) return;
+        if (!out.certifications.includes(value)) out.certifications.push(value);
+    });
+
+    return out;
+}
+"""
+
+# Resolves once the profile content (structured data, a phone link or a heading) is present
+DETAILS_READY_JS = """
+() => !!document.querySelector('script[type="application/ld+json"], a[href^="tel:"], h1')
+"""
+
+# Record values that mean a field was not found on the search page
+MISSING_VALUES = (None, "", "N/A", page_selectors.DEFAULT_DESCRIPTION)
+
+def merge_details(record: Dict[str, Any], fields: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge profile fields into a search record.
+    Missing record values are filled in, the full profile address replaces the
+    "City, ST" address of the result card and certifications are combined.
+    
+    Args:
+        record: Contractor record from the search results (updated in place)
+        fields: Record fields built from the profile page
+    
+    Returns:
+        The updated record
+    """
+    for key, value in fields.items():
+        if key == "certifications":
+            record[key] = list(dict.fromkeys((record.get(key) or []) + value))
+        elif key == "address" and "," in value:
+            record[key] = value
+        elif record.get(key) in MISSING_VALUES:
+            record[key] = value
+    return record
+
+class DetailCrawler:
+    """
+    Fetches contractor profile pages concurrently on a pool of pages.
+    Profile fields are remembered by URL, so a contractor found in several
+    searches is only fetched once per crawler.
+    """
+    
+    def __init__(self, concurrency: int = 4, timeout: int = 30000):
+        """
+        Initialize the crawler.
+        
+        Args:
+            concurrency: Number of profile pages loaded at once (default: 4)
+            timeout: Timeout for loading a profile page in milliseconds (default: 30000)
+        """
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.details: Dict[str, Dict[str, Any]] = {}
+        
+        # Statistics
+        self.pages_fetched = 0
+        self.pages_failed = 0
+    
+    async def fetch_details(
+        self,
+        page: Page,
+        url: str,
+        fetch: Callable[[Page, str], Awaitable[Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Load a profile page and extract its fields.
+        
+        Args:
+            page: Playwright page object
+            url: Profile page URL
+            fetch: Coroutine loading a URL into a page, applying rate limits and retries
+        
+        Returns:
+            Record fields from the profile, or None if the page could not be loaded
+        """
+        try:
+            await fetch(page, url)
+            try:
+                await page.wait_for_function(DETAILS_READY_JS, polling=100, timeout=self.timeout)
+            except PlaywrightTimeoutError:
+                logger.debug(f"Profile content did not appear on {url}")
+            
+            details = await page.evaluate(EXTRACT_DETAILS_JS, page_selectors.as_dict())
+            self.pages_fetched += 1
+            return build_detail_fields(details)
+        
+        except Exception as e:
+            logger.warning(f"Error fetching contractor profile {url}: {str(e)}")
+            self.pages_failed += 1
+            return None
+    
+    async def _worker(self, context: BrowserContext, queue: asyncio.Queue, fetch) -> None:
+        """Fetch profile URLs from the queue on a dedicated page until it is empty."""
+        page = await context.new_page()
+        page.set_default_timeout(self.timeout)
+        
+        try:
+            while True:
+                try:
+                    url = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                
+                fields = await self.fetch_details(page, url, fetch)
+                if fields is not None:
+                    self.details[url] = fields
+        finally:
+            try:
+                await page.close()
+            except Exception:
+                pass
+    
+    async def crawl(
+        self,
+        context: BrowserContext,
+        records: List[Dict[str, Any]],
+        fetch: Callable[[Page, str], Awaitable[Any]]
+    ) -> int:
+        """
+        Fetch the profiles of the given records and merge their fields in.
+        
+        Args:
+            context: Browser context the profile pages are opened in
+            records: Contractor records from the search results (updated in place)
+            fetch: Coroutine loading a URL into a page, applying rate limits and retries
+        
+        Returns:
+            Number of records enriched with profile fields
+        """
+        urls = list(dict.fromkeys(
+            record["profile_url"] for record in records
+            if record.get("profile_url") and record["profile_url"] not in self.details
+        ))
+        
+        if urls:
+            logger.info(f"Fetching {len(urls)} contractor profiles with {min(self.concurrency, len(urls))} pages")
+            queue: asyncio.Queue = asyncio.Queue()
+            for url in urls:
+                queue.put_nowait(url)
+            
+            await asyncio.gather(*(
+                self._worker(context, queue, fetch) for _ in range(min(self.concurrency, len(urls)))
+            ))
+        
+        enriched = 0
+        for record in records:
+            fields = self.details.get(record.get("profile_url"))
+            if fields:
+                merge_details(record, fields)
+                enriched += 1
+        return enriched
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get profile crawling statistics.
+        
+        Returns:
+            Dictionary with fetched and failed profile page counts
+        """
+        return {
+            "profile_pages_fetched": self.pages_fetched,
+            "profile_pages_failed": self.pages_failed,
+        }
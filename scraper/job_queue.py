@@ -0,0 +1,558 @@
+"""
+Durable scrape job queue.
+Stores (zip_code, distance) search jobs in SQLite so several worker
+processes can drain a large ZIP list together. Workers lease jobs and
+renew the lease with heartbeats; leases of crashed workers expire and the
+job is handed out again. Failed jobs are retried with exponential backoff
+and move to a dead-letter state after their last attempt.
+"""
+import os
+import json
+import time
+import socket
+import random
+import sqlite3
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .multi_zip import MultiZipScraper
+from .scraper import write_raw_data
+
+logger = logging.getLogger("gaf_scraper.job_queue")
+
+# Kept next to contractors.db
+DEFAULT_QUEUE_PATH = os.path.join("db", "scrape_jobs.db")
+
+JOB_STATUSES = ("pending", "leased", "done", "dead")
+
+QUEUE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    zip_code TEXT NOT NULL,
+    distance INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    last_error TEXT,
+    record_count INTEGER,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (zip_code, distance)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_available ON jobs(status, available_at);
+CREATE TABLE IF NOT EXISTS job_results (
+    job_id INTEGER PRIMARY KEY REFERENCES jobs(id),
+    records TEXT NOT NULL,
+    finished_at REAL NOT NULL
+);
+"""
+
+def default_worker_id() -> str:
+    """
+    Build a worker id unique on this network.
+    
+    Returns:
+        "<hostname>:<pid>"
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class JobQueue:
+    """
+    SQLite-backed queue of search jobs shared by worker processes.
+    Every state change runs in an immediate transaction, so two workers can
+    never lease the same job.
+    """
+    
+    def __init__(
+        self,
+        path: str = DEFAULT_QUEUE_PATH,
+        max_attempts: int = 5,
+        backoff_base: float = 30,
+        backoff_max: float = 3600
+    ):
+        """
+        Initialize the job queue.
+        
+        Args:
+            path: Path to the SQLite queue file (default: db/scrape_jobs.db)
+            max_attempts: Attempts of newly enqueued jobs before they are dead-lettered (default: 5)
+            backoff_base: Delay before the first retry in seconds, doubled on each further failure (default: 30)
+            backoff_max: Maximum retry delay in seconds (default: 3600)
+        """
+        self.path = path
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Transactions are managed explicitly; the timeout waits out other workers' writes
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(QUEUE_SCHEMA)
+    
+    def close(self) -> None:
+        """Close the queue database."""
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+    
+    def _run(self, statements) -> Any:
+        """Run a function of the connection in a transaction holding the write lock from the start."""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = statements(self.conn)
+            self.conn.execute("COMMIT")
+            return result
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+    
+    def enqueue(self, zip_codes: Iterable[str], distance: int, requeue: bool = False) -> int:
+        """
+        Add search jobs. Jobs already queued for the same (zip_code, distance) are kept.
+        
+        Args:
+            zip_codes: ZIP codes to search
+            distance: Search radius in miles
+            requeue: Also reset finished and dead jobs of these ZIP codes to pending (default: False)
+        
+        Returns:
+            Number of jobs added or reset
+        """
+        now = time.time()
+        rows = [(zip_code, distance, self.max_attempts, now, now, now) for zip_code in dict.fromkeys(zip_codes)]
+        
+        if requeue:
+            sql = """
+                INSERT INTO jobs (zip_code, distance, max_attempts, available_at, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (zip_code, distance) DO UPDATE SET
+                    status = 'pending', attempts = 0, max_attempts = excluded.max_attempts,
+                    available_at = excluded.available_at, last_error = NULL, updated_at = excluded.updated_at
+                WHERE status IN ('done', 'dead')
+            """
+        else:
+            sql = """
+                INSERT OR IGNORE INTO jobs (zip_code, distance, max_attempts, available_at, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """
+        
+        def insert(conn):
+            before = conn.total_changes
+            conn.executemany(sql, rows)
+            return conn.total_changes - before
+        
+        added = self._run(insert)
+        logger.info(f"Enqueued {added} of {len(rows)} jobs with {distance} mile radius")
+        return added
+    
+    def claim(self, worker_id: str, lease_seconds: float = 300) -> Optional[Dict[str, Any]]:
+        """
+        Lease the next available job. Expired leases are reclaimed first.
+        
+        Args:
+            worker_id: Id of the claiming worker
+            lease_seconds: Time the job is reserved for without a heartbeat (default: 300)
+        
+        Returns:
+            Job dictionary, or None if no job is available right now
+        """
+        def lease(conn):
+            now = time.time()
+            # Jobs of crashed or stalled workers go back to the queue, using up their attempt
+            reclaimed = conn.execute(
+                """
+                UPDATE jobs SET
+                    status = CASE WHEN attempts >= max_attempts THEN 'dead' ELSE 'pending' END,
+                    last_error = 'Lease of ' || lease_owner || ' expired',
+                    lease_owner = NULL, lease_expires = NULL, available_at = ?, updated_at = ?
+                WHERE status = 'leased' AND lease_expires < ?
+                """,
+                (now, now, now)
+            ).rowcount
+            if reclaimed:
+                logger.warning(f"Reclaimed {reclaimed} jobs with expired leases")
+            
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'pending' AND available_at <= ? ORDER BY available_at, id LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            
+            conn.execute(
+                """
+                UPDATE jobs SET status = 'leased', lease_owner = ?, lease_expires = ?,
+                    attempts = attempts + 1, updated_at = ?
+                WHERE id = ?
+                """,
+                (worker_id, now + lease_seconds, now, row["id"])
+            )
+            return {**dict(row), "status": "leased", "lease_owner": worker_id, "attempts": row["attempts"] + 1}
+        
+        return self._run(lease)
+    
+    def heartbeat(self, job_id: int, worker_id: str, lease_seconds: float = 300) -> bool:
+        """
+        Extend the lease of a job.
+        
+        Args:
+            job_id: Leased job
+            worker_id: Id of the worker holding the lease
+            lease_seconds: New lease duration from now (default: 300)
+        
+        Returns:
+            False if the worker no longer holds the lease
+        """
+        now = time.time()
+        cursor = self.conn.execute(
+            "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            (now + lease_seconds, now, job_id, worker_id)
+        )
+        return cursor.rowcount == 1
+    
+    def complete(self, job_id: int, worker_id: str, records: List[Dict[str, Any]]) -> bool:
+        """
+        Store the records of a job and mark it done.
+        
+        Args:
+            job_id: Leased job
+            worker_id: Id of the worker holding the lease
+            records: Contractor records found by the search
+        
+        Returns:
+            False if the lease was lost, in which case nothing is stored
+        """
+        def finish(conn):
+            now = time.time()
+            updated = conn.execute(
+                """
+                UPDATE jobs SET status = 'done', lease_owner = NULL, lease_expires = NULL,
+                    last_error = NULL, record_count = ?, updated_at = ?
+                WHERE id = ? AND status = 'leased' AND lease_owner = ?
+                """,
+                (len(records), now, job_id, worker_id)
+            ).rowcount
+            if updated:
+                conn.execute(
+                    "INSERT OR REPLACE INTO job_results (job_id, records, finished_at) VALUES (?, ?, ?)",
+                    (job_id, json.dumps(records), now)
+                )
+            return updated == 1
+        
+        return self._run(finish)
+    
+    def fail(self, job_id: int, worker_id: str, error: str) -> Optional[str]:
+        """
+        Record a failed attempt. The job is retried after an exponential backoff,
+        or dead-lettered if it has no attempts left.
+        
+        Args:
+            job_id: Leased job
+            worker_id: Id of the worker holding the lease
+            error: Error message
+        
+        Returns:
+            New status of the job ("pending" or "dead"), or None if the lease was lost
+        """
+        def retry(conn):
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (job_id, worker_id)
+            ).fetchone()
+            if row is None:
+                return None
+            
+            now = time.time()
+            status = "dead" if row["attempts"] >= row["max_attempts"] else "pending"
+            delay = min(self.backoff_base * 2 ** (row["attempts"] - 1), self.backoff_max)
+            # Jitter spreads the retries of jobs that failed together
+            available_at = now + delay * random.uniform(0.8, 1.2)
+            conn.execute(
+                """
+                UPDATE jobs SET status = ?, lease_owner = NULL, lease_expires = NULL,
+                    last_error = ?, available_at = ?, updated_at = ?
+                WHERE id = ?
+                """,
+                (status, error, available_at, now, job_id)
+            )
+            return status
+        
+        return self._run(retry)
+    
+    def retry_dead(self) -> int:
+        """
+        Move every dead-lettered job back to pending with fresh attempts.
+        
+        Returns:
+            Number of jobs requeued
+        """
+        now = time.time()
+        return self._run(lambda conn: conn.execute(
+            "UPDATE jobs SET status = 'pending', attempts = 0, available_at = ?, updated_at = ? WHERE status = 'dead'",
+            (now, now)
+        ).rowcount)
+    
+    def has_unfinished(self) -> bool:
+        """
+        Check whether any job is pending or leased.
+        
+        Returns:
+            True if the queue is not drained yet
+        """
+        row = self.conn.execute("SELECT 1 FROM jobs WHERE status IN ('pending', 'leased') LIMIT 1").fetchone()
+        return row is not None
+    
+    def counts(self) -> Dict[str, int]:
+        """
+        Count the jobs in each state.
+        
+        Returns:
+            Dictionary mapping every status to its job count
+        """
+        counts = {status: 0 for status in JOB_STATUSES}
+        for row in self.conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"):
+            counts[row["status"]] = row["n"]
+        return counts
+    
+    def dead_jobs(self) -> List[Dict[str, Any]]:
+        """
+        List the dead-lettered jobs.
+        
+        Returns:
+            Job dictionaries with their last error
+        """
+        return [dict(row) for row in self.conn.execute("SELECT * FROM jobs WHERE status = 'dead' ORDER BY id")]
+    
+    def iter_records(self, distance: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the records of finished jobs.
+        
+        Args:
+            distance: Only include jobs with this search radius (default: all)
+        
+        Yields:
+            Contractor records
+        """
+        sql = "SELECT r.records FROM job_results r JOIN jobs j ON j.id = r.job_id WHERE j.status = 'done'"
+        params = ()
+        if distance is not None:
+            sql += " AND j.distance = ?"
+            params = (distance,)
+        
+        for row in self.conn.execute(sql + " ORDER BY j.id", params):
+            yield from json.loads(row["records"])
+
+class QueueWorker:
+    """
+    Drains the job queue with a multi-ZIP scraper, running as many jobs at
+    once as the scraper's concurrency and renewing each lease while its
+    search runs.
+    """
+    
+    def __init__(
+        self,
+        queue: JobQueue,
+        scraper: MultiZipScraper,
+        worker_id: Optional[str] = None,
+        lease_seconds: float = 300,
+        poll_interval: float = 10,
+        exit_when_drained: bool = True
+    ):
+        """
+        Initialize the worker.
+        
+        Args:
+            queue: Job queue to drain
+            scraper: Scraper whose browser and context pool run the jobs
+            worker_id: Id recorded on leases (default: "<hostname>:<pid>")
+            lease_seconds: Lease duration; heartbeats are sent every third of it (default: 300)
+            poll_interval: Seconds to wait when no job is available yet (default: 10)
+            exit_when_drained: Stop once no job is pending or leased (default: True)
+        """
+        self.queue = queue
+        self.scraper = scraper
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.exit_when_drained = exit_when_drained
+        
+        # Statistics
+        self.jobs_done = 0
+        self.jobs_failed = 0
+        self.jobs_dead = 0
+        self.leases_lost = 0
+    
+    async def _heartbeat(self, job: Dict[str, Any]) -> None:
+        """Renew the lease of a job until cancelled."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not self.queue.heartbeat(job["id"], self.worker_id, self.lease_seconds):
+                logger.warning(f"Lost the lease of job {job['id']} (ZIP {job['zip_code']})")
+                return
+    
+    async def process(self, job: Dict[str, Any]) -> None:
+        """
+        Run a leased job and record its outcome.
+        
+        Args:
+            job: Job returned by JobQueue.claim
+        """
+        zip_code, distance = job["zip_code"], job["distance"]
+        logger.info(f"Worker {self.worker_id} running job {job['id']}: ZIP {zip_code}, "
+                    f"{distance} miles (attempt {job['attempts']}/{job['max_attempts']})")
+        
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            if self.scraper.serve_from_cache(zip_code, distance):
+                result = self.scraper.results[zip_code]
+            else:
+                result = await self.scraper.scrape_zip(zip_code, distance)
+        except Exception as e:
+            result = {"status": "error", "error": str(e), "contractors": []}
+        finally:
+            heartbeat.cancel()
+        
+        if result["status"] == "error":
+            status = self.queue.fail(job["id"], self.worker_id, result["error"] or "Unknown error")
+            if status is None:
+                self.leases_lost += 1
+            elif status == "dead":
+                self.jobs_dead += 1
+                logger.error(f"Job {job['id']} (ZIP {zip_code}) is dead after {job['attempts']} attempts: {result['error']}")
+            else:
+                self.jobs_failed += 1
+        elif self.queue.complete(job["id"], self.worker_id, result["contractors"]):
+            self.jobs_done += 1
+        else:
+            self.leases_lost += 1
+            logger.warning(f"Discarding results of job {job['id']}, its lease was taken over")
+        
+        # Results are stored in the queue, keep memory flat across the sweep
+        result["contractors"] = []
+    
+    async def _slot(self) -> None:
+        """Claim and run jobs one after another until the queue is drained."""
+        while True:
+            job = self.queue.claim(self.worker_id, self.lease_seconds)
+            if job is None:
+                if self.exit_when_drained and not self.queue.has_unfinished():
+                    return
+                # Jobs are waiting out a backoff or leased by other workers
+                await asyncio.sleep(self.poll_interval * random.uniform(0.5, 1.5))
+                continue
+            
+            await self.process(job)
+    
+    async def run(self) -> Dict[str, Any]:
+        """
+        Drain the queue.
+        
+        Returns:
+            Worker statistics
+        """
+        logger.info(f"Worker {self.worker_id} starting with {self.scraper.max_concurrency} slots, "
+                    f"queue: {self.queue.counts()}")
+        self.scraper.start_time = time.time()
+        
+        try:
+            await self.scraper.initialize()
+            await asyncio.gather(*(self._slot() for _ in range(self.scraper.max_concurrency)))
+        finally:
+            await self.scraper.close()
+            self.scraper.end_time = time.time()
+        
+        statistics = self.get_statistics()
+        logger.info(f"Worker {self.worker_id} finished: {statistics}")
+        return statistics
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get worker statistics.
+        
+        Returns:
+            Dictionary of job outcome counts and the queue state
+        """
+        return {
+            "jobs_done": self.jobs_done,
+            "jobs_retried": self.jobs_failed,
+            "jobs_dead": self.jobs_dead,
+            "leases_lost": self.leases_lost,
+            "queue": self.queue.counts(),
+        }
+
+def main():
+    """Main function to manage the job queue."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Manage the GAF scrape job queue")
+    parser.add_argument("--queue-path", type=str, default=DEFAULT_QUEUE_PATH, help=f"Queue database (default: {DEFAULT_QUEUE_PATH})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    enqueue_parser = subparsers.add_parser("enqueue", help="Add search jobs")
+    enqueue_parser.add_argument("--zip-codes", type=str, help="Comma-separated ZIP codes")
+    enqueue_parser.add_argument("--zip-file", type=str, help="Path to file containing ZIP codes, one per line")
+    enqueue_parser.add_argument("--distance", type=int, default=25, help="Search radius in miles (default: 25)")
+    enqueue_parser.add_argument("--max-attempts", type=int, default=5, help="Attempts before a job is dead-lettered (default: 5)")
+    enqueue_parser.add_argument("--requeue", action="store_true", help="Reset finished and dead jobs of these ZIP codes")
+    
+    subparsers.add_parser("status", help="Show job counts and dead-lettered jobs")
+    subparsers.add_parser("retry-dead", help="Requeue dead-lettered jobs")
+    
+    export_parser = subparsers.add_parser("export", help="Write the records of finished jobs to a raw data file")
+    export_parser.add_argument("--output", type=str, default=os.path.join("data", "raw_contractors.json"), help="Raw data file (default: data/raw_contractors.json)")
+    export_parser.add_argument("--distance", type=int, help="Only export jobs with this search radius")
+    
+    args = parser.parse_args()
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    if args.command == "enqueue":
+        queue = JobQueue(args.queue_path, max_attempts=args.max_attempts)
+        zip_codes = []
+        if args.zip_codes:
+            zip_codes.extend(z.strip() for z in args.zip_codes.split(",") if z.strip())
+        if args.zip_file and os.path.exists(args.zip_file):
+            with open(args.zip_file, 'r') as f:
+                zip_codes.extend(line.strip() for line in f if line.strip())
+        if not zip_codes:
+            parser.error("No ZIP codes given")
+        print(f"Enqueued {queue.enqueue(zip_codes, args.distance, requeue=args.requeue)} jobs")
+    
+    elif args.command == "status":
+        queue = JobQueue(args.queue_path)
+        for status, count in queue.counts().items():
+            print(f"  {status:<8} {count:>7}")
+        for job in queue.dead_jobs():
+            print(f"  dead: {job['zip_code']} ({job['distance']} mi) after {job['attempts']} attempts: {job['last_error']}")
+    
+    elif args.command == "retry-dead":
+        queue = JobQueue(args.queue_path)
+        print(f"Requeued {queue.retry_dead()} dead jobs")
+    
+    elif args.command == "export":
+        queue = JobQueue(args.queue_path)
+        records = list(queue.iter_records(args.distance))
+        metadata = {
+            "scrape_date": datetime.now().isoformat(),
+            "source": "GAF",
+            "job_queue": queue.path,
+            "distance": args.distance,
+            "total_results": len(records),
+        }
+        write_raw_data(args.output, records, metadata, {"jobs": queue.counts()})
+        print(f"Exported {len(records)} records to {args.output}")
+    
+    queue.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Scrape metrics in the Prometheus text format.
+Records a latency histogram per scrape phase (browser launch, navigation,
+readiness wait, extraction, pagination, artifact writes) and counters of
+requests, errors, CAPTCHAs and records by ZIP code and proxy. Metrics can
+be written to a file for the node exporter textfile collector or served
+on a local HTTP endpoint while the scrape runs.
+"""
+import os
+import time
+import logging
+import threading
+import contextlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from .utils import proxy_settings
+
+logger = logging.getLogger("gaf_scraper.metrics")
+
+METRIC_PREFIX = "gaf_scraper"
+
+# Upper bounds in seconds, from a blocked resource to a slow paginated search
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Phases are disjoint: "pagination" is only the next-button click, the wait for the next page is a readiness wait
+PHASES = ("browser_launch", "navigation", "readiness_wait", "extraction", "pagination", "artifact_write")
+
+COUNTERS = {
+    "requests_total": "Page navigations by ZIP code and proxy",
+    "errors_total": "Failed navigations and searches by ZIP code and proxy",
+    "captchas_total": "CAPTCHA challenges detected by ZIP code and proxy",
+    "records_total": "Contractor records produced by ZIP code",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+def proxy_label(proxy: Optional[str]) -> str:
+    """
+    Label value of a proxy, without its credentials.
+    
+    Args:
+        proxy: Proxy URL or None for direct connections
+    
+    Returns:
+        Proxy server URL or "direct"
+    """
+    return proxy_settings(proxy)["server"] if proxy else "direct"
+
+def _format_labels(labels: Labels) -> str:
+    """Format labels as {name="value",...}, escaping values."""
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+def _format_value(value: float) -> str:
+    """Format a sample value, dropping the fraction of whole numbers."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Histogram:
+    """Cumulative bucket counts, sum and count of observed durations."""
+    
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Initialize the histogram.
+        
+        Args:
+            buckets: Sorted bucket upper bounds in seconds
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value: float) -> None:
+        """
+        Record an observation.
+        
+        Args:
+            value: Observed duration in seconds
+        """
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile from the buckets, interpolating linearly within a bucket.
+        
+        Args:
+            q: Quantile between 0 and 1
+        
+        Returns:
+            Estimated value in seconds, or None if nothing was observed
+        """
+        if not self.count:
+            return None
+        
+        rank = q * self.count
+        lower, below = 0.0, 0
+        for bound, cumulative in zip(self.buckets, self.counts):
+            if cumulative >= rank:
+                in_bucket = cumulative - below
+                return lower + (bound - lower) * ((rank - below) / in_bucket if in_bucket else 1.0)
+            lower, below = bound, cumulative
+        return self.buckets[-1]
+
+class ScrapeMetrics:
+    """
+    Thread-safe registry of phase histograms and labelled counters.
+    Shared by every scraper of a run; artifact writes report from worker threads.
+    """
+    
+    def __init__(self, path: Optional[str] = None, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Initialize the registry.
+        
+        Args:
+            path: File the metrics are written to by flush() (default: None, not written)
+            buckets: Histogram bucket upper bounds in seconds
+        """
+        self.path = path
+        self.buckets = buckets
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, Dict[Labels, float]] = {name: {} for name in COUNTERS}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+    
+    def observe(self, phase: str, seconds: float) -> None:
+        """
+        Record the duration of a phase.
+        
+        Args:
+            phase: Phase name, one of PHASES
+            seconds: Duration in seconds
+        """
+        with self._lock:
+            histogram = self.histograms.get(phase)
+            if histogram is None:
+                histogram = self.histograms[phase] = Histogram(self.buckets)
+            histogram.observe(seconds)
+    
+    @contextlib.contextmanager
+    def time(self, phase: str) -> Iterator[None]:
+        """
+        Time the enclosed block as a phase, including awaits inside it.
+        
+        Args:
+            phase: Phase name, one of PHASES
+        """
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.monotonic() - started)
+    
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        """
+        Increment a counter.
+        
+        Args:
+            name: Counter name, one of COUNTERS
+            value: Amount to add (default: 1)
+            **labels: Label values, e.g. zip_code and proxy
+        """
+        key = tuple(sorted((label, str(v)) for label, v in labels.items()))
+        with self._lock:
+            series = self.counters[name]
+            series[key] = series.get(key, 0) + value
+    
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+        
+        Returns:
+            Metrics text
+        """
+        lines = []
+        with self._lock:
+            name = f"{METRIC_PREFIX}_phase_seconds"
+            lines.append(f"# HELP {name} Time spent in each scrape phase, phases do not nest")
+            lines.append(f"# TYPE {name} histogram")
+            for phase in sorted(self.histograms):
+                histogram = self.histograms[phase]
+                labels = (("phase", phase),)
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', _format_value(bound)),))} {count}")
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+            
+            for counter, help_text in COUNTERS.items():
+                name = f"{METRIC_PREFIX}_{counter}"
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(self.counters[counter].items()):
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        
+        return "\n".join(lines) + "\n"
+    
+    def write(self, path: str) -> None:
+        """
+        Write the metrics to a file atomically, so a collector never reads a partial file.
+        
+        Args:
+            path: Output file, e.g. in the node exporter textfile directory
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(temp_path, path)
+    
+    def flush(self) -> None:
+        """Write the metrics to the configured file, if any."""
+        if not self.path:
+            return
+        try:
+            self.write(self.path)
+        except OSError as e:
+            logger.warning(f"Could not write metrics to {self.path}: {str(e)}")
+    
+    def serve(self, port: int, host: str = "127.0.0.1") -> None:
+        """
+        Serve the metrics at http://host:port/metrics from a background thread.
+        
+        Args:
+            port: Port to listen on
+            host: Interface to listen on (default: 127.0.0.1, local only)
+        """
+        registry = self
+        
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+        
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True).start()
+        logger.info(f"Serving metrics at http://{host}:{self._server.server_port}/metrics")
+    
+    def stop(self) -> None:
+        """Stop the HTTP endpoint, if it is running."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get a summary of the phase timings.
+        
+        Returns:
+            Dictionary with the count, total, mean and estimated p50/p95 seconds of each phase
+        """
+        with self._lock:
+            return {
+                "phase_timings": {
+                    phase: {
+                        "count": histogram.count,
+                        "total_seconds": round(histogram.sum, 3),
+                        "mean_seconds": round(histogram.sum / histogram.count, 3) if histogram.count else None,
+                        "p50_seconds": round(histogram.quantile(0.5), 3) if histogram.count else None,
+                        "p95_seconds": round(histogram.quantile(0.95), 3) if histogram.count else None,
+                    }
+                    for phase, histogram in sorted(self.histograms.items())
+                }
+            }
@@ -0,0 +1,442 @@
+"""
+Local stand-in for the GAF contractor search.
+Serves result pages for any ZIP code with generated contractors, using the
+same card markup the scraper and the offline parser read, optionally
+wrapped in a saved page. Latency, result counts, page size, CAPTCHA pages
+and error responses are configurable, so scraper performance can be
+measured without touching gaf.com.
+"""
+import json
+import gzip
+import re
+import html
+import random
+import asyncio
+import logging
+from http import HTTPStatus
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlencode, urlparse
+
+import lxml.html
+from aiohttp import web
+
+from . import page_selectors
+from .offline_parser import BASE_URL
+
+logger = logging.getLogger("gaf_scraper.mock_site")
+
+# Path of the search page, the same as on gaf.com so profile links stay first-party
+SEARCH_PATH = urlparse(BASE_URL).path
+
+# Marker replaced by the generated results when a saved page is used as template
+RESULTS_MARKER = "<!--mock-results-->"
+
+# Elements removed from saved pages so they render offline and show only generated results
+TEMPLATE_STRIP_SELECTORS = [
+    "script", "noscript", "iframe", "link[rel='stylesheet']", "link[rel='preload']",
+    ".pagination", ".pagination-next", "a.next-page", "button.next-page",
+]
+
+DEFAULT_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Find a Roofing Contractor | GAF</title>
+</head>
+<body>
+<main>
+<h1>Residential Roofing Contractors</h1>
+<section class="results">
+<!--mock-results-->
+</section>
+</main>
+</body>
+</html>
+"""
+
+CAPTCHA_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>Security check</title></head>
+<body>
+<h1>Please verify you are a human</h1>
+<form action="/captcha" method="post">
+<div class="g-recaptcha" data-sitekey="mock"></div>
+<button type="submit">Continue</button>
+</form>
+</body>
+</html>
+"""
+
+ERROR_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>{status} {reason}</title></head>
+<body><h1>{status} {reason}</h1><p>{message}</p></body>
+</html>
+"""
+
+ERROR_MESSAGES = {
+    403: "Access denied",
+    429: "Too many requests, please try again later",
+}
+
+NAME_PREFIXES = [
+    "Summit", "Liberty", "Apex", "Guardian", "Premier", "Skyline", "Reliable", "Empire",
+    "Hudson Valley", "Metropolitan", "Precision", "Superior", "First Class", "Gotham", "Keystone", "Heritage",
+]
+NAME_SUFFIXES = [
+    "Roofing", "Roofing & Siding", "Roofing Contractors", "Roofing Systems",
+    "Roofing & Construction", "Roofing Services", "Exteriors", "Roofing Co.",
+]
+CITIES = [
+    ("New York", "NY"), ("Brooklyn", "NY"), ("Queens", "NY"), ("Yonkers", "NY"), ("Jersey City", "NJ"),
+    ("Hoboken", "NJ"), ("Newark", "NJ"), ("Stamford", "CT"), ("White Plains", "NY"), ("Paterson", "NJ"),
+]
+CERTIFICATIONS = [
+    "GAF Master Elite®", "GAF Certified™", "GAF Certified Plus™", "President's Club Award", "FORTIFIED Roof™",
+]
+
+def load_template(path: str) -> str:
+    """
+    Turn a saved search result page (optionally gzipped) into a template.
+    Scripts, frames, stylesheets, pagination, result counts and the saved
+    result cards are removed, and the cards are replaced by RESULTS_MARKER.
+    
+    Args:
+        path: Saved page, e.g. logs/page_content_{zip}.html or a debug artifact
+    
+    Returns:
+        Template HTML containing RESULTS_MARKER once
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, 'rt', encoding='utf-8', errors='replace') as f:
+        document = lxml.html.fromstring(f.read())
+    
+    for selector in TEMPLATE_STRIP_SELECTORS:
+        for element in document.cssselect(selector):
+            element.drop_tree()
+    
+    # Result counts of the saved search would contradict the generated ones
+    saved_counts = re.compile(f"{page_selectors.RESULTS_RANGE_PATTERN}|{page_selectors.NO_RESULTS_PATTERN}", re.IGNORECASE)
+    for element in list(document.iter()):
+        if isinstance(element.tag, str) and len(element) == 0 and saved_counts.search(element.text_content() or ""):
+            element.drop_tree()
+    
+    container = None
+    for selector in page_selectors.CARD_SELECTORS:
+        cards = document.cssselect(selector)
+        if cards:
+            container = cards[0].getparent()
+            for card in cards:
+                card.drop_tree()
+            break
+    
+    if container is None:
+        container = document.find("body")
+        if container is None:
+            container = document
+    container.append(lxml.html.HtmlComment("mock-results"))
+    
+    return "<!DOCTYPE html>\n" + lxml.html.tostring(document, encoding="unicode")
+
+class MockSite:
+    """
+    Deterministic fake of the contractor search, served with aiohttp.
+    The contractors of a ZIP code depend only on the seed, so repeated runs
+    see the same records; injected CAPTCHAs and errors are drawn per request.
+    """
+    
+    def __init__(
+        self,
+        results: int = 35,
+        results_spread: int = 0,
+        page_size: int = 10,
+        latency: float = 0.2,
+        latency_jitter: float = 0.1,
+        captcha_rate: float = 0.0,
+        error_rate: float = 0.0,
+        error_statuses: Sequence[int] = (503,),
+        template_path: Optional[str] = None,
+        seed: int = 0
+    ):
+        """
+        Initialize the mock site.
+        
+        Args:
+            results: Contractors found for each ZIP code (default: 35)
+            results_spread: Vary the count per ZIP code by up to this many, either way (default: 0)
+            page_size: Contractors per result page (default: 10)
+            latency: Seconds before each response (default: 0.2)
+            latency_jitter: Random extra latency of up to this many seconds (default: 0.1)
+            captcha_rate: Share of result pages answered with a CAPTCHA page (default: 0)
+            error_rate: Share of result pages answered with an error status (default: 0)
+            error_statuses: Statuses of injected errors, picked at random (default: 503)
+            template_path: Saved page the results are rendered into (default: a minimal page)
+            seed: Seed of the generated contractors and of the injected failures (default: 0)
+        """
+        self.results = max(0, results)
+        self.results_spread = max(0, results_spread)
+        self.page_size = max(1, page_size)
+        self.latency = max(0.0, latency)
+        self.latency_jitter = max(0.0, latency_jitter)
+        self.captcha_rate = captcha_rate
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses) or (503,)
+        self.seed = seed
+        self.template = load_template(template_path) if template_path else DEFAULT_PAGE
+        self.random = random.Random(seed)
+        
+        self.runner: Optional[web.AppRunner] = None
+        self.base_url: Optional[str] = None
+        self._contractors: Dict[str, List[Dict[str, Any]]] = {}
+        
+        # Statistics
+        self.requests = 0
+        self.pages_served = 0
+        self.captchas_served = 0
+        self.errors_served = 0
+    
+    def contractors_for(self, zip_code: str) -> List[Dict[str, Any]]:
+        """
+        Get the contractors found for a ZIP code.
+        
+        Args:
+            zip_code: ZIP code searched
+        
+        Returns:
+            List of raw card fields (name, rating, reviewCount, location, distance,
+            phone, certifications, website, profileUrl and contractorId)
+        """
+        if zip_code in self._contractors:
+            return self._contractors[zip_code]
+        
+        rng = random.Random(f"{self.seed}:{zip_code}")
+        count = max(0, self.results + rng.randint(-self.results_spread, self.results_spread))
+        
+        contractors = []
+        for i in range(count):
+            name = f"{rng.choice(NAME_PREFIXES)} {rng.choice(NAME_SUFFIXES)}"
+            city, state = rng.choice(CITIES)
+            contractor_id = f"{zip_code}{i:04d}"
+            slug = "".join(c if c.isalnum() else "-" for c in name.lower()).strip("-")
+            contractors.append({
+                "name": f"{name} {i + 1}" if any(c["name"] == name for c in contractors) else name,
+                "rating": f"{rng.uniform(3.5, 5.0):.1f}",
+                "reviewCount": str(rng.randint(0, 400)),
+                "location": f"{city}, {state}",
+                "distance": f"{(i + rng.random()) * 25 / max(count, 1):.1f}",
+                "phone": f"({rng.randint(201, 989)}) {rng.randint(200, 999)}-{rng.randint(0, 9999):04d}",
+                "certifications": sorted(rng.sample(CERTIFICATIONS, rng.randint(1, 2))),
+                "website": f"https://www.{slug}.example.com/",
+                "profileUrl": f"https://www.gaf.com{SEARCH_PATH}/{slug}-{contractor_id}",
+                "contractorId": contractor_id,
+            })
+        
+        self._contractors[zip_code] = contractors
+        return contractors
+    
+    @staticmethod
+    def render_card(contractor: Dict[str, Any]) -> str:
+        """Render one result card in the markup read by the extractors."""
+        data_layer = json.dumps([{"event_attributes": {
+            "contractor_id": contractor["contractorId"],
+            "contractor_name": contractor["name"],
+            "contractor_rating": contractor["rating"],
+            "contractor_reviews_count": contractor["reviewCount"],
+        }}])
+        phone_digits = "".join(c for c in contractor["phone"] if c.isdigit())
+        certifications = "".join(f"<li>{html.escape(c)}</li>" for c in contractor["certifications"])
+        return (
+            f'<article class="certification-card" {page_selectors.DATA_LAYER_ATTRIBUTE}="{html.escape(data_layer)}">\n'
+            f'<h3>{html.escape(contractor["name"])}</h3>\n'
+            f'<p class="rating">{contractor["rating"]} ({contractor["reviewCount"]})</p>\n'
+            f'<p class="location">{html.escape(contractor["location"])} - {contractor["distance"]} mi</p>\n'
+            f'<a href="tel:{phone_digits}">{contractor["phone"]}</a>\n'
+            f'<ul class="certifications">{certifications}</ul>\n'
+            f'<a href="{html.escape(contractor["profileUrl"])}">View profile</a>\n'
+            f'<a href="{html.escape(contractor["website"])}" rel="nofollow">Visit website</a>\n'
+            f'</article>'
+        )
+    
+    def render_results(self, zip_code: str, distance: str, page_num: int) -> str:
+        """
+        Render a result page of a ZIP code into the template.
+        
+        Args:
+            zip_code: ZIP code searched
+            distance: Search radius, kept in the pagination links
+            page_num: Result page number (1-based)
+        
+        Returns:
+            Page HTML
+        """
+        contractors = self.contractors_for(zip_code)
+        start = (page_num - 1) * self.page_size
+        shown = contractors[start:start + self.page_size]
+        
+        if not shown:
+            results = '<p class="no-results">No contractors found</p>' if not contractors else ""
+        else:
+            parts = [f'<p class="results-range">Showing {start + 1} - {start + len(shown)} of {len(contractors)} results</p>']
+            parts.extend(self.render_card(contractor) for contractor in shown)
+            if start + len(shown) < len(contractors):
+                query = urlencode({"postalCode": zip_code, "distance": distance, "page": page_num + 1})
+                parts.append(f'<nav class="pagination"><a class="next-page" href="{SEARCH_PATH}?{query}">Next</a></nav>')
+            results = "\n".join(parts)
+        
+        return self.template.replace(RESULTS_MARKER, results, 1)
+    
+    def _draw_failure(self) -> Optional[Tuple[int, str]]:
+        """Pick an injected CAPTCHA or error response for a request, if any."""
+        draw = self.random.random()
+        if draw < self.captcha_rate:
+            self.captchas_served += 1
+            return 200, CAPTCHA_PAGE
+        if draw < self.captcha_rate + self.error_rate:
+            self.errors_served += 1
+            status = self.random.choice(self.error_statuses)
+            try:
+                reason = HTTPStatus(status).phrase
+            except ValueError:
+                reason = "Error"
+            message = ERROR_MESSAGES.get(status, "The server could not complete the request")
+            return status, ERROR_PAGE.format(status=status, reason=reason, message=message)
+        return None
+    
+    async def handle_search(self, request: web.Request) -> web.Response:
+        """Serve a search result page, after the configured latency."""
+        self.requests += 1
+        await asyncio.sleep(self.latency + self.random.uniform(0, self.latency_jitter))
+        
+        failure = self._draw_failure()
+        if failure:
+            status, body = failure
+            return web.Response(status=status, text=body, content_type="text/html")
+        
+        zip_code = request.query.get("postalCode", "")
+        distance = request.query.get("distance", "25")
+        try:
+            page_num = max(1, int(request.query.get("page", "1")))
+        except ValueError:
+            page_num = 1
+        
+        self.pages_served += 1
+        return web.Response(text=self.render_results(zip_code, distance, page_num), content_type="text/html")
+    
+    async def handle_statistics(self, request: web.Request) -> web.Response:
+        """Serve the request counters as JSON."""
+        return web.json_response(self.get_statistics())
+    
+    def build_app(self) -> web.Application:
+        """
+        Build the aiohttp application.
+        
+        Returns:
+            Application serving the search page and /mock/stats
+        """
+        app = web.Application()
+        app.router.add_get(SEARCH_PATH, self.handle_search)
+        app.router.add_get("/mock/stats", self.handle_statistics)
+        return app
+    
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Start serving on the running event loop.
+        
+        Args:
+            host: Interface to listen on (default: 127.0.0.1, local only)
+            port: Port to listen on (default: 0, any free port)
+        
+        Returns:
+            Search page URL to pass to the scraper as base_url
+        """
+        self.runner = web.AppRunner(self.build_app(), access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        
+        bound_host, bound_port = self.runner.addresses[0][:2]
+        self.base_url = f"http://{bound_host}:{bound_port}{SEARCH_PATH}"
+        logger.info(f"Mock GAF site serving at {self.base_url}")
+        return self.base_url
+    
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get mock site statistics.
+        
+        Returns:
+            Dictionary with the numbers of requests, pages, CAPTCHAs and errors served
+        """
+        return {
+            "mock_requests": self.requests,
+            "mock_pages_served": self.pages_served,
+            "mock_captchas_served": self.captchas_served,
+            "mock_errors_served": self.errors_served,
+        }
+
+def add_site_arguments(parser) -> None:
+    """Add the options of MockSite to an argument parser."""
+    parser.add_argument("--results", type=int, default=35, help="Contractors per ZIP code (default: 35)")
+    parser.add_argument("--results-spread", type=int, default=0, help="Vary the count per ZIP code by up to this many (default: 0)")
+    parser.add_argument("--page-size", type=int, default=10, help="Contractors per result page (default: 10)")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds before each response (default: 0.2)")
+    parser.add_argument("--latency-jitter", type=float, default=0.1, help="Random extra latency in seconds (default: 0.1)")
+    parser.add_argument("--captcha-rate", type=float, default=0.0, help="Share of pages answered with a CAPTCHA (default: 0)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of pages answered with an error status (default: 0)")
+    parser.add_argument("--error-status", type=int, nargs="+", default=[503], help="Statuses of injected errors (default: 503)")
+    parser.add_argument("--template", type=str, help="Saved result page to render results into, e.g. logs/page_content_10013.html")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of generated contractors and injected failures (default: 0)")
+
+def site_from_arguments(args) -> MockSite:
+    """Create a MockSite from parsed add_site_arguments options."""
+    return MockSite(
+        results=args.results,
+        results_spread=args.results_spread,
+        page_size=args.page_size,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        captcha_rate=args.captcha_rate,
+        error_rate=args.error_rate,
+        error_statuses=args.error_status,
+        template_path=args.template,
+        seed=args.seed
+    )
+
+async def main():
+    """Main function to serve the mock site until interrupted."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Local mock of the GAF contractor search")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Interface to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765)")
+    add_site_arguments(parser)
+    parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
+    
+    args = parser.parse_args()
+    
+    log_level = logging.DEBUG if args.verbose else logging.INFO
+    logging.basicConfig(
+        level=log_level,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    site = site_from_arguments(args)
+    base_url = await site.start(args.host, args.port)
+    print(f"Mock GAF site serving at {base_url}")
+    print(f"Scrape it with: python -m scraper.scraper --zip 10013 --base-url {base_url}")
+    
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await site.stop()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
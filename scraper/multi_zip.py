@@ -0,0 +1,537 @@
+"""
+Multi-ZIP GAF scraper.
+Shares one Chromium instance across a bounded pool of browser contexts and
+runs searches for many ZIP codes concurrently.
+"""
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Callable
+from playwright.async_api import async_playwright, Browser, BrowserContext
+
+from .scraper import GAFScraper, write_raw_data, write_raw_data_from_stream
+from .request_filter import RequestFilter
+from .result_cache import ResultCache
+from .debug_artifacts import DebugArtifactSink
+from .detail_crawler import DetailCrawler
+from .record_stream import RecordStream
+from .metrics import ScrapeMetrics
+from .throttle import AdaptiveThrottle
+from .browser_worker import DEFAULT_STATE_PATH as BROWSER_WORKER_STATE_PATH, find_worker_endpoint, record_pages_served
+from .utils import RateLimiter, KeyedRateLimiter, ProxyManager, DEFAULT_GEOLOCATION
+
+logger = logging.getLogger("gaf_scraper.multi_zip")
+
+class MultiZipScraper:
+    """
+    Scrapes GAF contractor listings for a list of ZIP codes using a single
+    browser and a pool of reusable browser contexts.
+    """
+    
+    def __init__(
+        self,
+        zip_codes: List[str],
+        distance: int = 25,
+        headless: bool = True,
+        requests_per_minute: int = 10,
+        proxies: Optional[List[str]] = None,
+        max_retries: int = 3,
+        timeout: int = 30000,
+        burst: int = 1,
+        host_requests_per_minute: Optional[int] = None,
+        pool_size: int = 4,
+        max_concurrency: Optional[int] = None,
+        extraction_mode: str = "dom",
+        request_filter: Optional[RequestFilter] = None,
+        cdp_endpoint: Optional[str] = None,
+        use_browser_worker: bool = False,
+        result_cache: Optional[ResultCache] = None,
+        artifact_sink: Optional[DebugArtifactSink] = None,
+        detail_crawler: Optional[DetailCrawler] = None,
+        record_stream: Optional[RecordStream] = None,
+        metrics: Optional[ScrapeMetrics] = None,
+        page_concurrency: int = 4,
+        throttle: Optional[AdaptiveThrottle] = None,
+        base_url: Optional[str] = None,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        """
+        Initialize the multi-ZIP scraper.
+        
+        Args:
+            zip_codes: ZIP codes to search
+            distance: Search radius in miles (default: 25)
+            headless: Whether to run browser in headless mode (default: True)
+            requests_per_minute: Maximum number of requests per minute across all ZIPs (default: 10)
+            proxies: List of proxy URLs (default: None)
+            max_retries: Maximum number of retry attempts (default: 3)
+            timeout: Default timeout for operations in milliseconds (default: 30000)
+            burst: Maximum number of requests allowed back to back across all ZIPs (default: 1)
+            host_requests_per_minute: Separate budget per host (default: None, global budget only)
+            pool_size: Number of browser contexts kept open (default: 4)
+            max_concurrency: Maximum number of searches running at once (default: pool_size)
+            extraction_mode: "dom" or "network", see GAFScraper (default: "dom")
+            request_filter: Request filter installed on every context (default: None, load everything)
+            cdp_endpoint: Attach to an already running browser at this CDP endpoint
+            use_browser_worker: Attach to the local browser worker if one is running (default: False)
+            result_cache: Cache of previous search results shared by every ZIP (default: None)
+            artifact_sink: Debug snapshot sink shared by every ZIP (default: logs/artifacts, 1 in 10 pages)
+            detail_crawler: Profile crawler shared by every ZIP, so each contractor is fetched once (default: None)
+            record_stream: NDJSON stream records are appended to; completed ZIPs are skipped on resume
+                and records are not kept in memory (default: None)
+            metrics: Registry of phase timings and request counters shared by every ZIP (default: a new registry)
+            page_concurrency: Result pages of one search loaded at once, see GAFScraper (default: 4)
+            throttle: Adaptive controller of the shared request rate and of the number of concurrent
+                searches, up to max_concurrency (default: None, fixed rate and concurrency)
+            base_url: Search page URL of every ZIP, see GAFScraper (default: GAFScraper.BASE_URL)
+            progress_callback: Called with the result of each ZIP as it completes
+        """
+        # Drop duplicates while keeping the requested order
+        self.zip_codes = list(dict.fromkeys(zip_codes))
+        self.distance = distance
+        self.headless = headless
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.extraction_mode = extraction_mode
+        self.request_filter = request_filter
+        self.cdp_endpoint = cdp_endpoint
+        self.use_browser_worker = use_browser_worker
+        self.attached_to_worker = False
+        self.result_cache = result_cache
+        self.metrics = metrics or ScrapeMetrics()
+        self.artifact_sink = artifact_sink or DebugArtifactSink(metrics=self.metrics)
+        self.detail_crawler = detail_crawler
+        self.record_stream = record_stream
+        self.page_concurrency = page_concurrency
+        self.base_url = base_url
+        self.pool_size = max(1, pool_size)
+        self.max_concurrency = min(max_concurrency or self.pool_size, self.pool_size)
+        self.progress_callback = progress_callback
+        self.raw_data_path = os.path.join("data", "raw_contractors.json")
+        
+        # Shared across every ZIP so the global request budget is respected
+        if host_requests_per_minute:
+            self.rate_limiter = KeyedRateLimiter(
+                requests_per_minute=requests_per_minute,
+                burst=burst,
+                key_requests_per_minute=host_requests_per_minute,
+                key_burst=burst
+            )
+        else:
+            self.rate_limiter = RateLimiter(requests_per_minute=requests_per_minute, burst=burst)
+        self.proxy_manager = ProxyManager(proxies=proxies)
+        self.throttle = throttle
+        if throttle:
+            throttle.attach(self.rate_limiter, self.max_concurrency)
+        
+        self.playwright = None
+        self.browser: Optional[Browser] = None
+        self.context_pool: asyncio.Queue = asyncio.Queue()
+        self.contexts: List[BrowserContext] = []
+        self.context_proxies: Dict[BrowserContext, Optional[str]] = {}
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        # Results keyed by ZIP code
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.start_time = None
+        self.end_time = None
+    
+    async def initialize(self):
+        """Launch the shared browser and create the context pool."""
+        try:
+            with self.metrics.time("browser_launch"):
+                self.playwright = await async_playwright().start()
+                
+                endpoint = self.cdp_endpoint
+                if not endpoint and self.use_browser_worker:
+                    endpoint = await find_worker_endpoint(BROWSER_WORKER_STATE_PATH)
+                    if not endpoint:
+                        logger.warning("No healthy browser worker found, launching a local browser")
+                
+                if endpoint:
+                    self.browser = await self.playwright.chromium.connect_over_cdp(endpoint, timeout=self.timeout)
+                    self.attached_to_worker = True
+                    logger.info(f"Attached to browser worker at {endpoint}")
+                    if self.proxy_manager.proxies:
+                        logger.warning("The attached browser was not launched for per-context proxies, "
+                                       "requests will not go through the configured proxies")
+                else:
+                    # Proxies are set per context, the launch proxy is only a placeholder
+                    self.browser = await self.playwright.chromium.launch(
+                        headless=self.headless,
+                        proxy=GAFScraper.PER_CONTEXT_PROXY if self.proxy_manager.proxies else None,
+                        timeout=self.timeout
+                    )
+                
+                for _ in range(self.pool_size):
+                    self.context_pool.put_nowait(await self._new_context())
+            
+            logger.info(f"Browser initialized with a pool of {self.pool_size} contexts "
+                        f"(max concurrency {self.max_concurrency})")
+        
+        except Exception as e:
+            logger.error(f"Failed to initialize browser: {str(e)}")
+            raise
+    
+    async def _new_context(self) -> BrowserContext:
+        """
+        Create a pooled context with its own proxy.
+        
+        Returns:
+            New browser context
+        """
+        proxy = await self.proxy_manager.get_next_proxy()
+        context = await self.browser.new_context(
+            **GAFScraper.build_context_options(DEFAULT_GEOLOCATION, proxy)
+        )
+        if self.request_filter:
+            await self.request_filter.install(context)
+        
+        self.contexts.append(context)
+        self.context_proxies[context] = proxy
+        return context
+    
+    async def _replace_context(self, context: BrowserContext) -> BrowserContext:
+        """
+        Close a pooled context whose proxy was ejected and create one with another proxy.
+        
+        Args:
+            context: Context to replace
+        
+        Returns:
+            New browser context
+        """
+        logger.info(f"Replacing context using ejected proxy {self.context_proxies.get(context)}")
+        replacement = await self._new_context()
+        
+        self.contexts.remove(context)
+        self.context_proxies.pop(context, None)
+        try:
+            await context.close()
+        except Exception as e:
+            logger.debug(f"Error closing context: {str(e)}")
+        return replacement
+    
+    async def close(self):
+        """Close all contexts, the browser and the Playwright driver."""
+        await self.artifact_sink.flush()
+        
+        for context in self.contexts:
+            try:
+                await context.close()
+            except Exception as e:
+                logger.debug(f"Error closing context: {str(e)}")
+        self.contexts = []
+        self.context_proxies = {}
+        
+        if self.attached_to_worker:
+            # Leave the worker's browser running, only report what this run used
+            pages = sum(r.get("statistics", {}).get("request_count", 0) for r in self.results.values())
+            record_pages_served(pages, BROWSER_WORKER_STATE_PATH)
+            self.attached_to_worker = False
+        elif self.browser:
+            await self.browser.close()
+        self.browser = None
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
+    
+        self.metrics.flush()
+    
+    def _create_zip_scraper(self, zip_code: str, distance: Optional[int] = None) -> GAFScraper:
+        """
+        Create a scraper for a single ZIP code that shares this scraper's limits.
+        
+        Args:
+            zip_code: ZIP code to search
+            distance: Search radius in miles (default: the radius of this scraper)
+        
+        Returns:
+            GAFScraper configured for the ZIP code
+        """
+        scraper = GAFScraper(
+            zip_code=zip_code,
+            distance=distance or self.distance,
+            headless=self.headless,
+            max_retries=self.max_retries,
+            timeout=self.timeout,
+            extraction_mode=self.extraction_mode,
+            block_resources=False,
+            result_cache=self.result_cache,
+            artifact_sink=self.artifact_sink,
+            detail_crawler=self.detail_crawler,
+            record_stream=self.record_stream,
+            metrics=self.metrics,
+            page_concurrency=self.page_concurrency,
+            throttle=self.throttle,
+            base_url=self.base_url,
+            rate_limiter=self.rate_limiter,
+            proxy_manager=self.proxy_manager
+        )
+        scraper.browser = self.browser
+        return scraper
+    
+    def serve_from_cache(self, zip_code: str, distance: Optional[int] = None) -> bool:
+        """
+        Record the result of a ZIP code from the result cache if it has a fresh entry.
+        
+        Args:
+            zip_code: ZIP code to look up
+            distance: Search radius in miles (default: the radius of this scraper)
+        
+        Returns:
+            True if the ZIP code was served from the cache
+        """
+        scraper = self._create_zip_scraper(zip_code, distance)
+        scraper.reset_statistics()
+        contractors = scraper.get_cached_results()
+        if contractors is None:
+            return False
+        
+        scraper.end_time = time.time()
+        statistics = scraper.get_statistics()
+        self._report_progress({
+            "zip_code": zip_code,
+            "status": "success" if contractors else "no_results",
+            "contractors": contractors,
+            "total_results": len(contractors),
+            "pages_scraped": scraper.pages_scraped,
+            "duration_seconds": statistics["scrape_duration_seconds"],
+            "error": None,
+            "from_cache": True,
+            "statistics": statistics,
+        })
+        return True
+    
+    def serve_from_checkpoint(self, zip_code: str) -> bool:
+        """
+        Record the result of a ZIP code completed by an interrupted run.
+        
+        Args:
+            zip_code: ZIP code to look up
+        
+        Returns:
+            True if the record stream already holds every page of the ZIP code
+        """
+        if not self.record_stream or not self.record_stream.is_complete(zip_code):
+            return False
+        
+        total = self.record_stream.zip_record_count(zip_code)
+        self._report_progress({
+            "zip_code": zip_code,
+            "status": "success" if total else "no_results",
+            "contractors": [],
+            "total_results": total,
+            "pages_scraped": self.record_stream.pages_done(zip_code),
+            "duration_seconds": 0.0,
+            "error": None,
+            "from_checkpoint": True,
+            "statistics": {},
+        })
+        return True
+    
+    async def scrape_zip(self, zip_code: str, distance: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Search a single ZIP code on a pooled context.
+        
+        Args:
+            zip_code: ZIP code to search
+            distance: Search radius in miles (default: the radius of this scraper)
+        
+        Returns:
+            Result dictionary for the ZIP code
+        """
+        scraper = self._create_zip_scraper(zip_code, distance)
+        result = {
+            "zip_code": zip_code,
+            "status": "error",
+            "contractors": [],
+            "total_results": 0,
+            "pages_scraped": 0,
+            "duration_seconds": None,
+            "error": None,
+        }
+        
+        # The throttle narrows the number of concurrent searches when the site pushes back
+        async with (self.throttle.slot() if self.throttle else self.semaphore):
+            context = await self.context_pool.get()
+            page = None
+            scraper.reset_statistics()
+            
+            try:
+                # Don't let a failing exit stall the sweep, move the slot to another proxy
+                if not self.proxy_manager.is_available(self.context_proxies.get(context)):
+                    context = await self._replace_context(context)
+                scraper.proxy = self.context_proxies.get(context)
+                
+                # Each search reports the location of its own ZIP code
+                await context.set_geolocation(scraper.geolocation)
+                scraper.context = context
+                
+                page = await context.new_page()
+                page.set_default_timeout(self.timeout)
+                
+                contractors = await scraper.scrape_search_results(page)
+                if contractors is None:
+                    result["error"] = "Failed to navigate to search page"
+                else:
+                    result["status"] = "success" if contractors else "no_results"
+                    result["contractors"] = contractors
+                    result["total_results"] = len(contractors)
+            
+            except Exception as e:
+                logger.error(f"Error scraping ZIP code {zip_code}: {str(e)}")
+                result["error"] = str(e)
+                self.metrics.inc("errors_total", **scraper.metric_labels())
+            
+            finally:
+                if page:
+                    try:
+                        await page.close()
+                    except Exception:
+                        pass
+                self.context_pool.put_nowait(context)
+        
+        scraper.end_time = time.time()
+        result["pages_scraped"] = scraper.pages_scraped
+        result["statistics"] = scraper.get_statistics()
+        result["duration_seconds"] = result["statistics"]["scrape_duration_seconds"]
+        
+        self._report_progress(result)
+        return result
+    
+    def _report_progress(self, result: Dict[str, Any]) -> None:
+        """
+        Record and report the result of a single ZIP code.
+        
+        Args:
+            result: Result dictionary for the ZIP code
+        """
+        self.results[result["zip_code"]] = result
+        
+        progress = f"[{len(self.results)}/{len(self.zip_codes)}] " if self.zip_codes else ""
+        logger.info(f"{progress}ZIP {result['zip_code']}: "
+                    f"{result['status']}, {result['total_results']} contractors, "
+                    f"{result['pages_scraped']} pages, {result['duration_seconds']}s")
+        
+        if self.progress_callback:
+            try:
+                self.progress_callback(result)
+            except Exception as e:
+                logger.warning(f"Progress callback failed: {str(e)}")
+        
+        # Streamed records are already on disk, keep memory flat across the sweep
+        if self.record_stream:
+            result["contractors"] = []
+    
+        # Keep the metrics file current during long sweeps
+        self.metrics.flush()
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get statistics aggregated across all ZIP codes.
+        
+        Returns:
+            Dictionary of request and timing statistics
+        """
+        statistics = {
+            "scrape_duration_seconds": round(self.end_time - self.start_time, 2) if self.end_time and self.start_time else None,
+            "request_count": 0,
+            "success_count": 0,
+            "error_count": 0,
+            "captcha_count": 0,
+        }
+        
+        for result in self.results.values():
+            for key in ("request_count", "success_count", "error_count", "captcha_count"):
+                statistics[key] += result.get("statistics", {}).get(key, 0)
+        
+        if self.request_filter:
+            statistics.update(self.request_filter.get_statistics())
+        if self.result_cache:
+            statistics.update(self.result_cache.get_statistics())
+        statistics.update(self.artifact_sink.get_statistics())
+        if self.detail_crawler:
+            statistics.update(self.detail_crawler.get_statistics())
+        statistics.update(self.metrics.get_statistics())
+        if self.throttle:
+            statistics.update(self.throttle.get_statistics())
+        if self.proxy_manager.proxies:
+            statistics["proxies"] = self.proxy_manager.get_statistics()
+        
+        statistics["zip_codes_succeeded"] = sum(1 for r in self.results.values() if r["status"] == "success")
+        statistics["zip_codes_failed"] = sum(1 for r in self.results.values() if r["status"] == "error")
+        return statistics
+    
+    async def scrape(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Search every ZIP code and save the combined results.
+        
+        Returns:
+            Dictionary mapping each ZIP code to its result
+        """
+        self.start_time = time.time()
+        self.results = {}
+        
+        logger.info(f"Starting multi-ZIP scrape for {len(self.zip_codes)} ZIP codes "
+                    f"with {self.distance} mile radius")
+        
+        try:
+            # Only ZIP codes without fresh cached results need the browser
+            pending = [
+                zip_code for zip_code in self.zip_codes
+                if not self.serve_from_checkpoint(zip_code) and not self.serve_from_cache(zip_code)
+            ]
+            if pending:
+                await self.initialize()
+                await asyncio.gather(*(self.scrape_zip(zip_code) for zip_code in pending))
+        
+        except Exception as e:
+            logger.error(f"Error during multi-ZIP scrape: {str(e)}")
+        
+        finally:
+            await self.close()
+            self.end_time = time.time()
+        
+        all_contractors = [
+            contractor
+            for zip_code in self.zip_codes
+            for contractor in self.results.get(zip_code, {}).get("contractors", [])
+        ]
+        total_results = self.record_stream.record_count if self.record_stream else len(all_contractors)
+        
+        metadata = {
+            "scrape_date": datetime.now().isoformat(),
+            "source": "GAF",
+            "zip_codes": self.zip_codes,
+            "distance": self.distance,
+            "total_results": total_results,
+            "zip_results": {
+                zip_code: {
+                    "status": result["status"],
+                    "total_results": result["total_results"],
+                    "pages_scraped": result["pages_scraped"],
+                    "duration_seconds": result["duration_seconds"],
+                    "error": result["error"],
+                    "from_cache": result.get("from_cache", False),
+                    "from_checkpoint": result.get("from_checkpoint", False),
+                }
+                for zip_code, result in self.results.items()
+            },
+        }
+        
+        if self.record_stream:
+            metadata["record_stream"] = self.record_stream.path
+            write_raw_data_from_stream(self.raw_data_path, self.record_stream, metadata, self.get_statistics())
+            
+            # A completed sweep is not resumed by the next run
+            if all(self.record_stream.is_complete(zip_code) for zip_code in self.zip_codes):
+                self.record_stream.retire()
+        else:
+            write_raw_data(self.raw_data_path, all_contractors, metadata, self.get_statistics())
+        
+        logger.info(f"Multi-ZIP scrape complete: {total_results} contractors from "
+                    f"{len(self.results)} ZIP codes in {self.end_time - self.start_time:.2f} seconds")
+        return self.results
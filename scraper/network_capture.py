@@ -0,0 +1,251 @@
+"""
+Network capture of GAF contractor search responses.
+Listens for the XHR/fetch JSON responses behind the client-rendered
+results list and turns their payloads into raw card fields, so records
+can be built without waiting for or reading the rendered DOM.
+"""
+import re
+import asyncio
+import logging
+from typing import Dict, List, Optional, Any, Iterable
+
+logger = logging.getLogger("gaf_scraper.network_capture")
+
+# URL fragments of the API calls that return contractor search results
+DEFAULT_URL_PATTERNS = [
+    r"/api/.*contractor",
+    r"contractor.*search",
+    r"search.*contractor",
+    r"/roofing-contractors/.*\.json",
+    r"coveo\.com/rest/search",
+]
+
+# Payload keys (lowercased) that may hold each raw card field
+FIELD_ALIASES = {
+    "name": ["name", "contractorname", "companyname", "businessname", "displayname", "contractor_name"],
+    "rating": ["rating", "averagerating", "googlerating", "starrating", "contractor_rating"],
+    "reviewCount": ["reviewcount", "reviewscount", "numberofreviews", "totalreviews", "googlereviewcount", "contractor_reviews_count"],
+    "phone": ["phone", "phonenumber", "telephone", "mainphone"],
+    "website": ["website", "websiteurl", "companywebsite"],
+    "profileUrl": ["profileurl", "detailsurl", "contractorurl", "pageurl"],
+    "contractorId": ["contractorid", "id", "accountid", "contractor_id"],
+    "distance": ["distance", "distancemiles", "miles"],
+    "description": ["description", "about", "summary", "overview"],
+    "certifications": ["certifications", "certificationlevels", "awards", "badges"],
+}
+
+# Keys holding the total number of results for the query
+TOTAL_KEYS = ["total", "totalresults", "totalcount", "resultcount", "count"]
+
+def _lower_keys(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Index a dictionary by lowercased key."""
+    return {str(key).lower(): value for key, value in item.items()}
+
+def _first(item: Dict[str, Any], aliases: Iterable[str]) -> Any:
+    """Return the first non-empty value among the aliases of a field."""
+    for alias in aliases:
+        value = item.get(alias)
+        if value not in (None, "", [], {}):
+            return value
+    return None
+
+def _looks_like_contractor(item: Any) -> bool:
+    """Check whether a JSON object looks like a contractor entry."""
+    if not isinstance(item, dict):
+        return False
+    keys = _lower_keys(item)
+    has_name = _first(keys, FIELD_ALIASES["name"]) is not None
+    has_detail = any(_first(keys, FIELD_ALIASES[field]) is not None for field in ("rating", "phone", "certifications", "distance"))
+    return has_name and (has_detail or "address" in keys)
+
+def _format_location(item: Dict[str, Any]) -> Optional[str]:
+    """Build a "City, ST" style location from the address fields of an entry."""
+    address = item.get("address")
+    if isinstance(address, str) and address.strip():
+        return address.strip()
+    
+    source = _lower_keys(address) if isinstance(address, dict) else item
+    city = _first(source, ["city", "locality"])
+    state = _first(source, ["state", "statecode", "region", "province"])
+    street = _first(source, ["address1", "street", "streetaddress", "line1"])
+    
+    parts = [str(part).strip() for part in (street, city) if part]
+    if state:
+        parts.append(str(state).strip())
+    return ", ".join(parts) if parts else None
+
+def _format_certifications(value: Any) -> List[str]:
+    """Normalize certifications given as strings or objects into a list of names."""
+    if not value:
+        return []
+    if isinstance(value, (str, dict)):
+        value = [value]
+    
+    certifications = []
+    for entry in value:
+        if isinstance(entry, dict):
+            entry = _first(_lower_keys(entry), ["name", "title", "label", "displayname"])
+        if entry and str(entry).strip() not in certifications:
+            certifications.append(str(entry).strip())
+    return certifications
+
+def payload_to_cards(item: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map a contractor entry from a JSON payload onto the raw card fields used
+    by build_contractor_record.
+    
+    Args:
+        item: Contractor entry from the payload
+    
+    Returns:
+        Raw card fields
+    """
+    keys = _lower_keys(item)
+    card = {field: _first(keys, aliases) for field, aliases in FIELD_ALIASES.items()}
+    card["certifications"] = _format_certifications(card["certifications"])
+    card["location"] = _format_location(keys)
+    card["phone"] = str(card["phone"]) if card["phone"] is not None else None
+    card["contractorId"] = str(card["contractorId"]) if card["contractorId"] is not None else None
+    return card
+
+def find_contractor_entries(payload: Any) -> List[Dict[str, Any]]:
+    """
+    Find the contractor entries anywhere in a JSON payload.
+    
+    Args:
+        payload: Decoded JSON payload
+    
+    Returns:
+        List of contractor entries, in payload order
+    """
+    entries = []
+    stack = [payload]
+    
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+        elif isinstance(node, dict):
+            if _looks_like_contractor(node):
+                entries.append(node)
+            else:
+                # Results are often wrapped, e.g. {"results": [{"raw": {...}}]}
+                stack.extend(reversed(list(node.values())))
+    
+    return entries
+
+def find_total_results(payload: Any) -> Optional[int]:
+    """
+    Find the total number of results reported by a payload.
+    
+    Args:
+        payload: Decoded JSON payload
+    
+    Returns:
+        Total result count or None if the payload does not report one
+    """
+    if isinstance(payload, dict):
+        keys = _lower_keys(payload)
+        for key in TOTAL_KEYS:
+            if isinstance(keys.get(key), int):
+                return keys[key]
+        for value in payload.values():
+            if isinstance(value, dict):
+                total = find_total_results(value)
+                if total is not None:
+                    return total
+    return None
+
+class SearchResponseCollector:
+    """Collects contractor entries from the JSON responses of a page."""
+    
+    def __init__(self, url_patterns: Optional[List[str]] = None):
+        """
+        Initialize the collector.
+        
+        Args:
+            url_patterns: Regular expressions matching search API URLs
+        """
+        self.url_patterns = [re.compile(p, re.IGNORECASE) for p in (url_patterns or DEFAULT_URL_PATTERNS)]
+        self.cards: List[Dict[str, Any]] = []
+        self.total_results: Optional[int] = None
+        self.response_count = 0
+        self._received = asyncio.Event()
+        self._page = None
+    
+    def attach(self, page) -> None:
+        """
+        Start listening for responses on a page.
+        
+        Args:
+            page: Playwright page object
+        """
+        self._page = page
+        page.on("response", self._on_response)
+    
+    def detach(self) -> None:
+        """Stop listening for responses."""
+        if self._page:
+            self._page.remove_listener("response", self._on_response)
+            self._page = None
+    
+    def reset(self) -> None:
+        """Forget collected entries, e.g. before requesting the next page."""
+        self.cards = []
+        self._received.clear()
+    
+    def matches(self, url: str) -> bool:
+        """Check whether a URL looks like a contractor search API call."""
+        return any(pattern.search(url) for pattern in self.url_patterns)
+    
+    async def _on_response(self, response) -> None:
+        """Parse a response if it is a JSON search result."""
+        try:
+            if response.request.resource_type not in ("xhr", "fetch") or not self.matches(response.url):
+                return
+            if "json" not in (response.headers.get("content-type") or ""):
+                return
+            
+            payload = await response.json()
+            entries = find_contractor_entries(payload)
+            if not entries:
+                return
+            
+            self.response_count += 1
+            self.cards.extend(payload_to_cards(entry) for entry in entries)
+            total = find_total_results(payload)
+            if total is not None:
+                self.total_results = total
+            
+            logger.debug(f"Captured {len(entries)} contractors from {response.url}")
+            self._received.set()
+        
+        except Exception as e:
+            logger.debug(f"Could not parse response from {response.url}: {str(e)}")
+    
+    async def wait_for_cards(self, timeout: float) -> List[Dict[str, Any]]:
+        """
+        Wait until a search response has been captured.
+        
+        Args:
+            timeout: Maximum time to wait in seconds
+        
+        Returns:
+            Raw card fields captured so far (empty if nothing arrived in time)
+        """
+        try:
+            await asyncio.wait_for(self._received.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"No contractor search response captured within {timeout:.1f}s")
+        return list(self.cards)
+    
+    def take_cards(self) -> List[Dict[str, Any]]:
+        """
+        Return the captured entries and reset the collector.
+        
+        Returns:
+            Raw card fields
+        """
+        cards = list(self.cards)
+        self.reset()
+        return cards
@@ -0,0 +1,291 @@
+"""
+Offline parser for saved GAF search result pages.
+Turns HTML snapshots written by the scraper back into contractor records
+without launching a browser, using lxml and the same selectors as the
+in-page extractor.
+"""
+import os
+import re
+import glob
+import gzip
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Any, Tuple
+from urllib.parse import urljoin, urlparse
+
+import lxml.html
+
+from . import page_selectors
+from .page_selectors import build_contractor_record
+
+logger = logging.getLogger("gaf_scraper.offline_parser")
+
+BASE_URL = "https://www.gaf.com/en-us/roofing-contractors/residential"
+
+# Matches page_content_{zip}.html, full_page_content_{zip}.html and the debug
+# artifacts page_content_{zip}_p{page}.html.gz (optionally gzipped)
+SNAPSHOT_PATTERN = re.compile(r"^(full_)?page_content_(?P<zip_code>[^_.]+)(_p(?P<page>\d+))?\.html(\.gz)?$")
+
+_RATING_RE = re.compile(page_selectors.RATING_PATTERN)
+_LOCATION_RE = re.compile(page_selectors.LOCATION_PATTERN)
+_PHONE_RE = re.compile(page_selectors.PHONE_PATTERN)
+_CERTIFICATION_RE = re.compile(page_selectors.CERTIFICATION_PATTERN, re.IGNORECASE)
+
+def _is_first_party(url: str) -> bool:
+    """Check whether a URL points at a GAF-owned host."""
+    host = urlparse(url).hostname or ""
+    return any(host == d or host.endswith("." + d) for d in page_selectors.FIRST_PARTY_DOMAINS)
+
+def _has_element_children(element) -> bool:
+    """Check whether an element has child elements (ignoring comments and text)."""
+    return any(isinstance(child.tag, str) for child in element)
+
+def _read_data_layer(card) -> Dict[str, Any]:
+    """Read the analytics attributes attached to a card, if any."""
+    attribute = page_selectors.DATA_LAYER_ATTRIBUTE
+    holder = card if card.get(attribute) is not None else next(iter(card.xpath(f".//*[@{attribute}]")), None)
+    if holder is None:
+        return {}
+    
+    try:
+        parsed = json.loads(holder.get(attribute))
+        entry = parsed[0] if isinstance(parsed, list) and parsed else parsed
+        return (entry or {}).get("event_attributes", {}) if isinstance(entry, dict) else {}
+    except (ValueError, TypeError):
+        return {}
+
+def parse_card(card, base_url: str = BASE_URL) -> Dict[str, Any]:
+    """
+    Collect the raw fields of a single result card.
+    Mirrors EXTRACT_CARDS_JS in scraper.py.
+    
+    Args:
+        card: lxml element of the card
+        base_url: URL the snapshot was taken from, used to resolve relative links
+    
+    Returns:
+        Raw card fields
+    """
+    text = "\n".join(t.strip() for t in card.itertext() if t.strip())
+    data_layer = _read_data_layer(card)
+    
+    names = card.cssselect(page_selectors.NAME_SELECTOR)
+    rating = _RATING_RE.search(text)
+    place = _LOCATION_RE.search(text)
+    
+    phone = None
+    phone_links = card.cssselect(page_selectors.PHONE_SELECTOR)
+    if phone_links:
+        phone = phone_links[0].text_content().strip() or phone_links[0].get("href", "").replace("tel:", "")
+    if not phone:
+        match = _PHONE_RE.search(text)
+        phone = match.group(0) if match else None
+    
+    certifications = []
+    for element in card.cssselect(page_selectors.CERTIFICATION_SELECTOR):
+        is_image = element.tag == "img"
+        if not is_image and _has_element_children(element):
+            continue
+        value = ((element.get("alt") if is_image else element.text_content()) or "").strip()
+        if not value or len(value) > page_selectors.CERTIFICATION_MAX_LENGTH:
+            continue
+        if not _CERTIFICATION_RE.search(value) or value in page_selectors.CERTIFICATION_EXCLUDE:
+            continue
+        if value not in certifications:
+            certifications.append(value)
+    
+    website = None
+    profile_url = None
+    search_path = urlparse(base_url).path
+    for link in card.cssselect(page_selectors.LINK_SELECTOR):
+        href = urljoin(base_url, link.get("href", ""))
+        if not href.startswith(("http://", "https://")):
+            continue
+        if not _is_first_party(href):
+            website = website or href
+        elif not profile_url:
+            path = urlparse(href).path
+            if page_selectors.PROFILE_PATH in path and path != search_path:
+                profile_url = href
+    
+    return {
+        "name": names[0].text_content().strip() if names else data_layer.get("contractor_name"),
+        "rating": rating.group(1) if rating else data_layer.get("contractor_rating"),
+        "reviewCount": rating.group(2) if rating else data_layer.get("contractor_reviews_count"),
+        "location": place.group(1).strip() if place else None,
+        "distance": place.group(2) if place else None,
+        "phone": phone,
+        "certifications": certifications,
+        "website": website,
+        "profileUrl": profile_url,
+        "contractorId": data_layer.get("contractor_id"),
+    }
+
+def parse_snapshot_html(html: str, zip_code: str, base_url: str = BASE_URL) -> List[Dict[str, Any]]:
+    """
+    Parse a saved search result page into contractor records.
+    
+    Args:
+        html: HTML of the saved page
+        zip_code: ZIP code the page was searched for
+        base_url: URL the snapshot was taken from
+    
+    Returns:
+        List of contractor data dictionaries
+    """
+    if not html or not html.strip():
+        return []
+    
+    document = lxml.html.fromstring(html)
+    
+    cards = []
+    for selector in page_selectors.CARD_SELECTORS:
+        cards = document.cssselect(selector)
+        if cards:
+            break
+    
+    contractors = []
+    for card in cards:
+        contractor_data = build_contractor_record(parse_card(card, base_url), zip_code)
+        if contractor_data["name"]:
+            contractors.append(contractor_data)
+    
+    # Fall back to bare company names if the card layout was not recognized
+    if not contractors:
+        for heading in document.cssselect(page_selectors.NAME_SELECTOR):
+            name = heading.text_content().strip()
+            if name:
+                contractors.append(build_contractor_record({"name": name}, zip_code))
+    
+    return contractors
+
+def read_snapshot(path: str) -> str:
+    """
+    Read a snapshot file, transparently decompressing gzipped snapshots.
+    
+    Args:
+        path: Path to the snapshot
+    
+    Returns:
+        HTML content
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+def parse_snapshot_file(path: str) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Parse a single snapshot file. The ZIP code is taken from the file name.
+    
+    Args:
+        path: Path to the snapshot
+    
+    Returns:
+        Tuple of (path, contractor records)
+    """
+    match = SNAPSHOT_PATTERN.match(os.path.basename(path))
+    zip_code = match.group("zip_code") if match else ""
+    
+    try:
+        return path, parse_snapshot_html(read_snapshot(path), zip_code)
+    except Exception as e:
+        logger.error(f"Error parsing snapshot {path}: {str(e)}")
+        return path, []
+
+def find_snapshots(directory: str) -> List[str]:
+    """
+    Find the snapshot files in a directory and its subdirectories, one per
+    ZIP code and result page. When both a page_content and a full_page_content
+    snapshot exist for a page, the full_page_content one (taken after the page
+    settled) is used; among debug artifacts of several runs, the latest run wins.
+    
+    Args:
+        directory: Directory to search
+    
+    Returns:
+        Sorted list of snapshot paths
+    """
+    by_page: Dict[Tuple[str, int], str] = {}
+    
+    # Run directories are named by timestamp, so sorted paths put later runs last
+    for path in sorted(glob.glob(os.path.join(directory, "**", "*page_content_*.html*"), recursive=True)):
+        match = SNAPSHOT_PATTERN.match(os.path.basename(path))
+        if not match:
+            continue
+        
+        key = (match.group("zip_code"), int(match.group("page") or 1))
+        previous = by_page.get(key)
+        if previous is None or match.group(1) or not os.path.basename(previous).startswith("full_"):
+            by_page[key] = path
+    
+    return sorted(by_page.values())
+
+def parse_snapshot_directory(directory: str, workers: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Parse every snapshot in a directory in parallel across processes.
+    
+    Args:
+        directory: Directory containing saved result pages
+        workers: Number of worker processes (default: number of CPUs)
+    
+    Returns:
+        Dictionary mapping snapshot paths to contractor records
+    """
+    paths = find_snapshots(directory)
+    if not paths:
+        logger.warning(f"No snapshots found in {directory}")
+        return {}
+    
+    workers = workers or os.cpu_count() or 1
+    logger.info(f"Parsing {len(paths)} snapshots with {workers} workers")
+    
+    if workers == 1 or len(paths) == 1:
+        return dict(parse_snapshot_file(path) for path in paths)
+    
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return dict(executor.map(parse_snapshot_file, paths, chunksize=chunksize))
+
+def main():
+    """Main function to run the offline parser."""
+    import argparse
+    from datetime import datetime
+    
+    parser = argparse.ArgumentParser(description="Parse saved GAF result pages into contractor records")
+    parser.add_argument("directory", nargs="?", default="logs", help="Directory with saved result pages (default: logs)")
+    parser.add_argument("--output", type=str, default=os.path.join("data", "raw_contractors.json"), help="Output raw data file")
+    parser.add_argument("--workers", type=int, help="Number of worker processes (default: number of CPUs)")
+    parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
+    
+    args = parser.parse_args()
+    
+    log_level = logging.DEBUG if args.verbose else logging.INFO
+    logging.basicConfig(
+        level=log_level,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    results = parse_snapshot_directory(args.directory, workers=args.workers)
+    
+    contractors = []
+    for path, records in sorted(results.items()):
+        print(f"  {os.path.basename(path)}: {len(records)} contractors")
+        contractors.extend(records)
+    
+    from .scraper import write_raw_data
+    
+    metadata = {
+        "scrape_date": datetime.now().isoformat(),
+        "source": "GAF",
+        "parsed_from": args.directory,
+        "snapshots": sorted(results),
+        "total_results": len(contractors),
+    }
+    write_raw_data(args.output, contractors, metadata)
+    
+    print(f"Parsed {len(contractors)} contractors from {len(results)} snapshots")
+    print(f"Raw data saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
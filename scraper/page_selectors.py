@@ -0,0 +1,159 @@
+"""
+Selectors and text patterns for GAF contractor search result cards.
+Shared by the in-page extractor and the offline snapshot parser so both
+produce the same records from the same markup.
+"""
+from typing import Any, Dict, Optional
+
+# Contractor card containers, in order of preference
+CARD_SELECTORS = [".certification-card", ".small-contractor-card", "article"]
+
+# Elements inside a card
+NAME_SELECTOR = "h3, h2"
+PHONE_SELECTOR = "a[href^='tel:']"
+LINK_SELECTOR = "a[href]"
+CERTIFICATION_SELECTOR = "li, span, p, div, img[alt]"
+
+# Attribute holding the analytics JSON for a card (contractor id, rating, review count)
+DATA_LAYER_ATTRIBUTE = "data-layer"
+
+# Text patterns (kept compatible with both Python and JavaScript regex syntax)
+RATING_PATTERN = r"(\d(?:\.\d)?)\s*\((\d[\d,]*)\)"
+LOCATION_PATTERN = r"([A-Za-z][A-Za-z .'\-]*,\s*[A-Z]{2})\s*-\s*(\d+(?:\.\d+)?)\s*mi"
+PHONE_PATTERN = r"\(?\d{3}\)?[\s.\-]?\d{3}[\s.\-]?\d{4}"
+CERTIFICATION_PATTERN = r"Master Elite|President|Certified|Award|FORTIFIED"
+CERTIFICATION_EXCLUDE = ["Certifications and Awards", "View All"]
+CERTIFICATION_MAX_LENGTH = 60
+
+# Text shown when a search has no contractors
+NO_RESULTS_PATTERN = r"no (contractors|results)( were)? found|showing 0 results"
+
+# Elements of CAPTCHA challenges
+CAPTCHA_SELECTORS = [
+    "iframe[src*='captcha']",
+    "iframe[src*='recaptcha']",
+    ".g-recaptcha",
+    "form[action*='captcha']",
+    "input[name*='captcha']",
+]
+
+# Text of pages served instead of results when requests are blocked
+BLOCK_PAGE_PATTERN = r"access denied|request (was )?blocked|unusual traffic|too many requests|are you a robot"
+
+# Result range shown above the cards, e.g. "Showing 1 - 10 of 85 results"
+RESULTS_RANGE_PATTERN = r"showing\s+(\d[\d,]*)\s*[-\u2013]\s*(\d[\d,]*)\s+of\s+(\d[\d,]*)\s+(?:results|contractors)"
+
+# Hosts that belong to GAF itself (links to them are never a contractor website)
+FIRST_PARTY_DOMAINS = ["gaf.com"]
+
+# Path fragment of contractor profile pages
+PROFILE_PATH = "/roofing-contractors/"
+
+DEFAULT_DESCRIPTION = "GAF Certified Contractor"
+
+# Elements of contractor profile pages, used when structured data is missing
+DETAIL_ADDRESS_SELECTOR = "address, [itemprop='address'], [class*='address']"
+DETAIL_DESCRIPTION_SELECTOR = "[class*='about'] p, [id*='about'] p, [class*='description'] p"
+DETAIL_MAX_DESCRIPTION_LENGTH = 2000
+
+# Hosts of links on profile pages that are never the contractor's own website
+WEBSITE_EXCLUDE_DOMAINS = [
+    "facebook.com", "instagram.com", "twitter.com", "x.com", "linkedin.com",
+    "youtube.com", "google.com", "yelp.com", "houzz.com", "bbb.org", "pinterest.com",
+]
+
+def as_dict() -> Dict[str, Any]:
+    """
+    Bundle the selectors and patterns so they can be passed into the page.
+    
+    Returns:
+        Dictionary of selectors and patterns
+    """
+    return {
+        "cardSelectors": CARD_SELECTORS,
+        "nameSelector": NAME_SELECTOR,
+        "phoneSelector": PHONE_SELECTOR,
+        "linkSelector": LINK_SELECTOR,
+        "certificationSelector": CERTIFICATION_SELECTOR,
+        "dataLayerAttribute": DATA_LAYER_ATTRIBUTE,
+        "ratingPattern": RATING_PATTERN,
+        "locationPattern": LOCATION_PATTERN,
+        "phonePattern": PHONE_PATTERN,
+        "certificationPattern": CERTIFICATION_PATTERN,
+        "certificationExclude": CERTIFICATION_EXCLUDE,
+        "certificationMaxLength": CERTIFICATION_MAX_LENGTH,
+        "firstPartyDomains": FIRST_PARTY_DOMAINS,
+        "profilePath": PROFILE_PATH,
+        "detailAddressSelector": DETAIL_ADDRESS_SELECTOR,
+        "detailDescriptionSelector": DETAIL_DESCRIPTION_SELECTOR,
+        "detailMaxDescriptionLength": DETAIL_MAX_DESCRIPTION_LENGTH,
+        "websiteExcludeDomains": WEBSITE_EXCLUDE_DOMAINS,
+        "captchaSelectors": CAPTCHA_SELECTORS,
+        "blockPattern": BLOCK_PAGE_PATTERN,
+        "noResultsPattern": NO_RESULTS_PATTERN,
+    }
+
+def _to_float(value: Any) -> Optional[float]:
+    """Convert a scraped value to float, returning None when it is missing or invalid."""
+    try:
+        return float(str(value).replace(",", "")) if value not in (None, "") else None
+    except ValueError:
+        return None
+
+def _to_int(value: Any) -> Optional[int]:
+    """Convert a scraped value to int, returning None when it is missing or invalid."""
+    number = _to_float(value)
+    return int(number) if number is not None else None
+
+def build_contractor_record(card: Dict[str, Any], zip_code: str) -> Dict[str, Any]:
+    """
+    Turn the raw fields collected from a result card into a contractor record.
+    
+    Args:
+        card: Raw card fields (name, rating, reviewCount, location, distance,
+              phone, certifications, website, profileUrl, contractorId and
+              optionally description)
+        zip_code: ZIP code that was searched
+    
+    Returns:
+        Contractor data dictionary
+    """
+    return {
+        "name": (card.get("name") or "").strip() or None,
+        "rating": _to_float(card.get("rating")),
+        "review_count": _to_int(card.get("reviewCount")),
+        "address": card.get("location") or "N/A",
+        "distance_miles": _to_float(card.get("distance")),
+        "phone": card.get("phone") or "N/A",
+        "certifications": card.get("certifications") or [],
+        "description": card.get("description") or DEFAULT_DESCRIPTION,
+        "website": card.get("website") or "N/A",
+        "profile_url": card.get("profileUrl"),
+        "gaf_contractor_id": card.get("contractorId"),
+        "source": "GAF",
+        "zip_code": zip_code,
+    }
+
+def build_detail_fields(details: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Turn the raw fields collected from a contractor profile page into record fields.
+    Fields the page did not provide are left out.
+    
+    Args:
+        details: Raw profile fields (phone, website, description, address,
+                 rating, reviewCount and certifications)
+    
+    Returns:
+        Dictionary of contractor record fields
+    """
+    fields = {
+        "phone": (details.get("phone") or "").strip() or None,
+        "website": details.get("website") or None,
+        "description": (details.get("description") or "").strip() or None,
+        "address": (details.get("address") or "").strip() or None,
+        "rating": _to_float(details.get("rating")),
+        "review_count": _to_int(details.get("reviewCount")),
+        "certifications": details.get("certifications") or None,
+    }
+    return {key: value for key, value in fields.items() if value is not None}
+
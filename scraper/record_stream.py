@@ -0,0 +1,214 @@
+"""
+Streaming scraper output with checkpoints.
+Appends contractor records to an NDJSON file as each result page is
+extracted and records completed ZIP codes and pages in a checkpoint file,
+so an interrupted sweep can resume where it stopped without holding every
+record in memory. The checkpoint is retired once a sweep completes, so
+only interrupted sweeps are resumed.
+"""
+import os
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger("gaf_scraper.record_stream")
+
+DEFAULT_STREAM_PATH = os.path.join("data", "raw_contractors.ndjson")
+
+class RecordStream:
+    """
+    NDJSON record writer with a resumable checkpoint.
+    
+    The checkpoint stores the byte offset of the stream after the last
+    fully written page. On resume the stream is truncated back to that
+    offset, so a page interrupted halfway is written again exactly once.
+    """
+    
+    def __init__(
+        self,
+        path: str = DEFAULT_STREAM_PATH,
+        checkpoint_path: Optional[str] = None,
+        resume: bool = True,
+        distance: Optional[int] = None
+    ):
+        """
+        Initialize the record stream.
+        
+        Args:
+            path: Path of the NDJSON output
+            checkpoint_path: Path of the checkpoint file (default: <path>.checkpoint.json)
+            resume: Continue from an existing checkpoint instead of starting over (default: True)
+            distance: Search radius of the run; a checkpoint for another radius is not resumed
+        """
+        self.path = path
+        self.checkpoint_path = checkpoint_path or f"{path}.checkpoint.json"
+        self.distance = distance
+        
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        
+        self.state = self._load_checkpoint() if resume else None
+        if self.state is None:
+            self.state = {
+                "distance": distance,
+                "offset": 0,
+                "record_count": 0,
+                "zip_codes": {},
+                "started": datetime.now().isoformat(),
+            }
+        
+        # Drop anything written after the last checkpoint
+        with open(self.path, "ab") as f:
+            f.truncate(self.state["offset"])
+        self.file = open(self.path, "ab")
+        
+        if self.state["zip_codes"]:
+            completed = sum(1 for z in self.state["zip_codes"].values() if z["complete"])
+            logger.info(f"Resuming from checkpoint: {self.state['record_count']} records, "
+                        f"{completed} of {len(self.state['zip_codes'])} ZIP codes complete")
+    
+    def _load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """Load the checkpoint if it exists and matches this run."""
+        if not os.path.exists(self.checkpoint_path) or not os.path.exists(self.path):
+            return None
+        
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint {self.checkpoint_path}: {str(e)}")
+            return None
+        
+        if self.distance is not None and state.get("distance") != self.distance:
+            logger.warning(f"Checkpoint was written for a {state.get('distance')} mile radius, starting over")
+            return None
+        if state.get("offset", 0) > os.path.getsize(self.path):
+            logger.warning("Checkpoint is ahead of the record stream, starting over")
+            return None
+        return state
+    
+    def _save_checkpoint(self) -> None:
+        """Write the checkpoint atomically."""
+        self.state["updated"] = datetime.now().isoformat()
+        temp_path = f"{self.checkpoint_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.checkpoint_path)
+    
+    def _zip_state(self, zip_code: str) -> Dict[str, Any]:
+        """Get (creating if needed) the checkpoint entry of a ZIP code."""
+        return self.state["zip_codes"].setdefault(zip_code, {"pages": 0, "records": 0, "complete": False})
+    
+    @property
+    def record_count(self) -> int:
+        """Number of records in the stream."""
+        return self.state["record_count"]
+    
+    def pages_done(self, zip_code: str) -> int:
+        """
+        Number of result pages of a ZIP code already written.
+        
+        Args:
+            zip_code: ZIP code
+        
+        Returns:
+            Page count
+        """
+        entry = self.state["zip_codes"].get(zip_code)
+        return entry["pages"] if entry else 0
+    
+    def is_complete(self, zip_code: str) -> bool:
+        """
+        Check whether every result page of a ZIP code has been written.
+        
+        Args:
+            zip_code: ZIP code
+        
+        Returns:
+            True if the ZIP code is complete
+        """
+        entry = self.state["zip_codes"].get(zip_code)
+        return bool(entry and entry["complete"])
+    
+    def zip_record_count(self, zip_code: str) -> int:
+        """
+        Number of records written for a ZIP code.
+        
+        Args:
+            zip_code: ZIP code
+        
+        Returns:
+            Record count
+        """
+        entry = self.state["zip_codes"].get(zip_code)
+        return entry["records"] if entry else 0
+    
+    def write_page(self, zip_code: str, page_num: int, records: List[Dict[str, Any]]) -> None:
+        """
+        Append the records of a result page and checkpoint it.
+        
+        Args:
+            zip_code: ZIP code the page belongs to
+            page_num: Result page number (pages written earlier are not written again)
+            records: Contractor records of the page
+        """
+        entry = self._zip_state(zip_code)
+        if page_num <= entry["pages"]:
+            return
+        
+        for record in records:
+            self.file.write((json.dumps(record) + "\n").encode("utf-8"))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        
+        entry["pages"] = page_num
+        entry["records"] += len(records)
+        self.state["record_count"] += len(records)
+        self.state["offset"] = self.file.tell()
+        self._save_checkpoint()
+    
+    def complete_zip(self, zip_code: str) -> None:
+        """
+        Mark a ZIP code as complete so a resumed run skips it.
+        
+        Args:
+            zip_code: ZIP code
+        """
+        self._zip_state(zip_code)["complete"] = True
+        self._save_checkpoint()
+    
+    def retire(self) -> None:
+        """
+        Remove the checkpoint after every ZIP code of a sweep completed.
+        The next run on this path then starts a new stream instead of serving
+        these records again; they stay in the file until that run truncates it.
+        """
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+            logger.info(f"Sweep complete, retired checkpoint {self.checkpoint_path}")
+    
+    def read_records(self, zip_code: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the records in the stream.
+        
+        Args:
+            zip_code: Only yield the records of this ZIP code (default: all)
+        
+        Yields:
+            Contractor records
+        """
+        self.file.flush()
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if zip_code is None or record.get("zip_code") == zip_code:
+                    yield record
+    
+    def close(self) -> None:
+        """Close the stream file."""
+        if self.file and not self.file.closed:
+            self.file.close()
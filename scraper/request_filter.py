@@ -0,0 +1,152 @@
+"""
+Request filtering for scraper browser contexts.
+Aborts requests for resources the scraper never reads (images, fonts,
+media, analytics and other third-party hosts) to cut page load time and
+bandwidth.
+"""
+import re
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger("gaf_scraper.request_filter")
+
+# Resource types that are never needed to extract contractor data
+DEFAULT_BLOCKED_RESOURCE_TYPES = ["image", "media", "font", "texttrack", "eventsource", "manifest"]
+
+# Analytics, advertising and tracking hosts loaded by the GAF site
+DEFAULT_BLOCKED_HOST_PATTERNS = [
+    r"googletagmanager\.com$",
+    r"google-analytics\.com$",
+    r"doubleclick\.net$",
+    r"googleadservices\.com$",
+    r"facebook\.(com|net)$",
+    r"hotjar\.(com|io)$",
+    r"eloqua\.com$",
+    r"en25\.com$",
+    r"onetrust\.com$",
+    r"cookielaw\.org$",
+    r"clarity\.ms$",
+    r"bing\.com$",
+    r"linkedin\.com$",
+    r"licdn\.com$",
+    r"youtube\.com$",
+    r"vimeo\.com$",
+    r"tiktok\.com$",
+    r"pinterest\.com$",
+    r"qualtrics\.com$",
+]
+
+# Hosts considered first party when third-party blocking is enabled
+DEFAULT_ALLOWED_DOMAINS = ["gaf.com"]
+
+class RequestFilter:
+    """Aborts non-essential requests made by a browser context."""
+    
+    def __init__(
+        self,
+        blocked_resource_types: Optional[List[str]] = None,
+        blocked_host_patterns: Optional[List[str]] = None,
+        block_third_party: bool = False,
+        allowed_domains: Optional[List[str]] = None
+    ):
+        """
+        Initialize the request filter.
+        
+        Args:
+            blocked_resource_types: Playwright resource types to abort (default: images, media, fonts, ...)
+            blocked_host_patterns: Regular expressions for hosts to abort (default: analytics and ad hosts)
+            block_third_party: Abort every request whose host is not in allowed_domains (default: False)
+            allowed_domains: First-party domains kept when block_third_party is set (default: gaf.com)
+        """
+        self.blocked_resource_types = set(
+            DEFAULT_BLOCKED_RESOURCE_TYPES if blocked_resource_types is None else blocked_resource_types
+        )
+        self.blocked_host_patterns = [
+            re.compile(pattern, re.IGNORECASE)
+            for pattern in (DEFAULT_BLOCKED_HOST_PATTERNS if blocked_host_patterns is None else blocked_host_patterns)
+        ]
+        self.block_third_party = block_third_party
+        self.allowed_domains = allowed_domains or DEFAULT_ALLOWED_DOMAINS
+        
+        # Statistics
+        self.allowed_count = 0
+        self.blocked_count = 0
+        self.blocked_by_reason: Counter = Counter()
+    
+    def _is_allowed_domain(self, host: str) -> bool:
+        """Check whether a host belongs to one of the allowed domains."""
+        return any(host == domain or host.endswith("." + domain) for domain in self.allowed_domains)
+    
+    def block_reason(self, url: str, resource_type: str) -> Optional[str]:
+        """
+        Decide whether a request should be aborted.
+        
+        Args:
+            url: Request URL
+            resource_type: Playwright resource type of the request
+        
+        Returns:
+            Reason for blocking the request, or None if it should be allowed
+        """
+        # The document itself is always loaded
+        if resource_type == "document":
+            return None
+        
+        if resource_type in self.blocked_resource_types:
+            return f"type:{resource_type}"
+        
+        host = (urlparse(url).hostname or "").lower()
+        if not host:
+            return None
+        
+        for pattern in self.blocked_host_patterns:
+            if pattern.search(host):
+                return "host"
+        
+        if self.block_third_party and not self._is_allowed_domain(host):
+            return "third_party"
+        
+        return None
+    
+    async def _handle_route(self, route) -> None:
+        """Abort or continue a routed request."""
+        request = route.request
+        reason = self.block_reason(request.url, request.resource_type)
+        
+        try:
+            if reason:
+                self.blocked_count += 1
+                self.blocked_by_reason[reason] += 1
+                await route.abort("blockedbyclient")
+            else:
+                self.allowed_count += 1
+                await route.continue_()
+        except Exception as e:
+            # The page may have navigated away or closed while the request was pending
+            logger.debug(f"Could not route request {request.url}: {str(e)}")
+    
+    async def install(self, context) -> None:
+        """
+        Install the filter on a browser context.
+        
+        Args:
+            context: Playwright browser context
+        """
+        await context.route("**/*", self._handle_route)
+        logger.debug(f"Request filter installed (blocking types: {sorted(self.blocked_resource_types)}, "
+                     f"third party: {self.block_third_party})")
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get request filtering statistics.
+        
+        Returns:
+            Dictionary with allowed and blocked request counts
+        """
+        return {
+            "allowed_requests": self.allowed_count,
+            "blocked_requests": self.blocked_count,
+            "blocked_by_reason": dict(self.blocked_by_reason),
+        }
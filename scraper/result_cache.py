@@ -0,0 +1,269 @@
+"""
+Result cache for GAF search queries.
+Stores the extracted contractor records of each (zip_code, distance)
+search and extraction configuration together with a hash of the results
+page, so repeated queries can be served without opening a page and
+unchanged pages can skip extraction.
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+from typing import Dict, List, Optional, Any
+
+logger = logging.getLogger("gaf_scraper.result_cache")
+
+DEFAULT_CACHE_PATH = os.path.join("data", "scrape_cache.db")
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_cache (
+    cache_key TEXT PRIMARY KEY,
+    zip_code TEXT NOT NULL,
+    distance INTEGER NOT NULL,
+    records TEXT NOT NULL,
+    record_count INTEGER NOT NULL,
+    pages_scraped INTEGER,
+    content_hash TEXT,
+    size_bytes INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    last_accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_search_cache_last_accessed ON search_cache(last_accessed);
+"""
+
+def hash_content(content: str) -> str:
+    """
+    Hash page content for change detection.
+    
+    Args:
+        content: Text to hash
+    
+    Returns:
+        Hex digest of the content
+    """
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+class ResultCache:
+    """
+    SQLite-backed cache of search results with a TTL and size-based eviction.
+    Entries past their TTL are no longer served directly but are kept (until
+    evicted) so a re-fetched page can be compared against their content hash.
+    """
+    
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        ttl_seconds: float = 6 * 3600,
+        max_size_mb: float = 100
+    ):
+        """
+        Initialize the result cache.
+        
+        Args:
+            path: Path to the SQLite cache file
+            ttl_seconds: How long entries are served without re-fetching (default: 6 hours)
+            max_size_mb: Maximum total size of cached records (default: 100 MB)
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(CACHE_SCHEMA)
+        self.conn.commit()
+        
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.unchanged = 0
+    
+    @staticmethod
+    def make_key(zip_code: str, distance: int, variant: str = "") -> str:
+        """
+        Build the cache key of a search query.
+        
+        Args:
+            zip_code: ZIP code searched
+            distance: Search radius in miles
+            variant: Extraction configuration the records were produced with, e.g. "dom|details"
+        
+        Returns:
+            Cache key
+        """
+        return f"{zip_code}|{distance}|{variant}"
+    
+    def close(self) -> None:
+        """Close the cache database."""
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+    
+    def get(self, zip_code: str, distance: int, variant: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Get the cached entry of a query, fresh or not.
+        
+        Args:
+            zip_code: ZIP code searched
+            distance: Search radius in miles
+            variant: Extraction configuration, see make_key (default: "")
+        
+        Returns:
+            Entry with records, content_hash, pages_scraped, fetched_at and fresh, or None
+        """
+        row = self.conn.execute(
+            "SELECT * FROM search_cache WHERE cache_key = ?", (self.make_key(zip_code, distance, variant),)
+        ).fetchone()
+        if row is None:
+            return None
+        
+        age = time.time() - row["fetched_at"]
+        return {
+            "records": json.loads(row["records"]),
+            "record_count": row["record_count"],
+            "pages_scraped": row["pages_scraped"],
+            "content_hash": row["content_hash"],
+            "fetched_at": row["fetched_at"],
+            "age_seconds": age,
+            "fresh": age < self.ttl_seconds,
+        }
+    
+    def get_fresh(self, zip_code: str, distance: int, variant: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Get the cached entry of a query if it is within the TTL.
+        
+        Args:
+            zip_code: ZIP code searched
+            distance: Search radius in miles
+            variant: Extraction configuration, see make_key (default: "")
+        
+        Returns:
+            Fresh entry or None
+        """
+        entry = self.get(zip_code, distance, variant)
+        if entry and entry["fresh"]:
+            self.hits += 1
+            self._mark_accessed(zip_code, distance, variant)
+            return entry
+        
+        self.misses += 1
+        return None
+    
+    def _mark_accessed(self, zip_code: str, distance: int, variant: str = "") -> None:
+        """Update the last access time used for eviction."""
+        self.conn.execute(
+            "UPDATE search_cache SET last_accessed = ? WHERE cache_key = ?",
+            (time.time(), self.make_key(zip_code, distance, variant))
+        )
+        self.conn.commit()
+    
+    def touch(self, zip_code: str, distance: int, variant: str = "") -> None:
+        """
+        Mark an entry as freshly fetched, e.g. when a re-fetched page was unchanged.
+        Only valid when every page of the entry was re-checked, i.e. for single-page results.
+        
+        Args:
+            zip_code: ZIP code searched
+            distance: Search radius in miles
+            variant: Extraction configuration, see make_key (default: "")
+        """
+        now = time.time()
+        self.unchanged += 1
+        self.conn.execute(
+            "UPDATE search_cache SET fetched_at = ?, last_accessed = ? WHERE cache_key = ?",
+            (now, now, self.make_key(zip_code, distance, variant))
+        )
+        self.conn.commit()
+    
+    def put(
+        self,
+        zip_code: str,
+        distance: int,
+        records: List[Dict[str, Any]],
+        content_hash: Optional[str] = None,
+        pages_scraped: Optional[int] = None,
+        variant: str = ""
+    ) -> None:
+        """
+        Store the results of a query and evict old entries if the cache is too large.
+        
+        Args:
+            zip_code: ZIP code searched
+            distance: Search radius in miles
+            records: Extracted contractor records
+            content_hash: Hash of the first results page
+            pages_scraped: Number of result pages the records came from
+            variant: Extraction configuration, see make_key (default: "")
+        """
+        payload = json.dumps(records)
+        now = time.time()
+        self.conn.execute(
+            """
+            INSERT OR REPLACE INTO search_cache (
+                cache_key, zip_code, distance, records, record_count, pages_scraped,
+                content_hash, size_bytes, fetched_at, last_accessed
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                self.make_key(zip_code, distance, variant), zip_code, distance, payload, len(records),
+                pages_scraped, content_hash, len(payload.encode("utf-8")), now, now
+            )
+        )
+        self.conn.commit()
+        self.evict()
+    
+    def total_size(self) -> int:
+        """
+        Get the total size of cached records.
+        
+        Returns:
+            Size in bytes
+        """
+        return self.conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM search_cache").fetchone()[0]
+    
+    def evict(self) -> int:
+        """
+        Remove least recently used entries until the cache fits its size budget.
+        
+        Returns:
+            Number of entries removed
+        """
+        total = self.total_size()
+        if total <= self.max_size_bytes:
+            return 0
+        
+        removed = 0
+        rows = self.conn.execute(
+            "SELECT cache_key, size_bytes FROM search_cache ORDER BY last_accessed"
+        ).fetchall()
+        for row in rows:
+            if total <= self.max_size_bytes:
+                break
+            self.conn.execute("DELETE FROM search_cache WHERE cache_key = ?", (row["cache_key"],))
+            total -= row["size_bytes"]
+            removed += 1
+        
+        self.conn.commit()
+        logger.info(f"Evicted {removed} cache entries to stay within {self.max_size_bytes} bytes")
+        return removed
+    
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        self.conn.execute("DELETE FROM search_cache")
+        self.conn.commit()
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get cache usage statistics.
+        
+        Returns:
+            Dictionary with hit, miss and unchanged-page counts
+        """
+        return {
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+            "cache_unchanged_pages": self.unchanged,
+        }
@@ -4,21 +4,37 @@ Extracts contractor information from GAF's website.
 """
 import json
 import os
+import math
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Iterable, Union
 import asyncio
 import time
 from datetime import datetime
+from urllib.parse import urlparse
 from playwright.async_api import async_playwright, Page, Browser, BrowserContext, TimeoutError as PlaywrightTimeoutError, Error as PlaywrightError
 
 from .utils import (
-    setup_retry_mechanism, 
+    RetryPolicy, 
     create_directory_if_not_exists, 
     RateLimiter, 
+    KeyedRateLimiter,
     ProxyManager, 
     validate_contractor_data,
-    handle_captcha
+    get_zip_geolocation,
+    proxy_settings
 )
+from . import page_selectors
+from .page_selectors import build_contractor_record
+from .network_capture import SearchResponseCollector
+from .request_filter import RequestFilter
+from .browser_worker import DEFAULT_STATE_PATH as BROWSER_WORKER_STATE_PATH, find_worker_endpoint, record_pages_served
+from .result_cache import DEFAULT_CACHE_PATH, ResultCache, hash_content
+from .debug_artifacts import DEFAULT_ARTIFACT_DIR, DebugArtifactSink
+from .detail_crawler import DetailCrawler
+from .record_stream import DEFAULT_STREAM_PATH, RecordStream
+from .snapshot_store import SnapshotStore
+from .metrics import ScrapeMetrics, proxy_label
+from .throttle import BLOCK_STATUSES, AdaptiveThrottle, detect_block
 
 # Configure logging
 logging.basicConfig(
@@ -27,6 +43,138 @@ logging.basicConfig(
 )
 logger = logging.getLogger("gaf_scraper")
 
+# Collects every result card field in a single round trip to the browser.
+# Receives the selectors and patterns from page_selectors.as_dict().
+EXTRACT_CARDS_JS = """
+(cfg) => {
+    const ratingRe = new RegExp(cfg.ratingPattern);
+    const locationRe = new RegExp(cfg.locationPattern);
+    const phoneRe = new RegExp(cfg.phonePattern);
+    const certificationRe = new RegExp(cfg.certificationPattern, "i");
+
+    const isFirstParty = (href) => {
+        try {
+            const host = new URL(href, location.href).hostname;
+            return cfg.firstPartyDomains.some((d) => host === d || host.endsWith("." + d));
+        } catch (e) {
+            return true;
+        }
+    };
+
+    const readDataLayer = (card) => {
+        const holder = card.hasAttribute(cfg.dataLayerAttribute)
+            ? card
+            : card.querySelector("[" + cfg.dataLayerAttribute + "]");
+        if (!holder) return {};
+        try {
+            const parsed = JSON.parse(holder.getAttribute(cfg.dataLayerAttribute));
+            const entry = Array.isArray(parsed) ? parsed[0] : parsed;
+            return (entry && entry.event_attributes) || {};
+        } catch (e) {
+            return {};
+        }
+    };
+
+    let cards = [];
+    for (const selector of cfg.cardSelectors) {
+        cards = Array.from(document.querySelectorAll(selector));
+        if (cards.length) break;
+    }
+
+    return cards.map((card) => {
+        const text = card.innerText || card.textContent || "";
+        const dataLayer = readDataLayer(card);
+        const nameEl = card.querySelector(cfg.nameSelector);
+        const rating = text.match(ratingRe);
+        const place = text.match(locationRe);
+
+        const phoneEl = card.querySelector(cfg.phoneSelector);
+        let phone = phoneEl ? (phoneEl.textContent.trim() || phoneEl.getAttribute("href").replace("tel:", "")) : null;
+        if (!phone) {
+            const match = text.match(phoneRe);
+            phone = match ? match[0] : null;
+        }
+
+        const certifications = [];
+        card.querySelectorAll(cfg.certificationSelector).forEach((el) => {
+            const isImage = el.tagName === "IMG";
+            if (!isImage && el.children.length) return;
+            const value = ((isImage ? el.getAttribute("alt") : el.textContent) || "").trim();
+            if (!value || value.length > cfg.certificationMaxLength) return;
+            if (!certificationRe.test(value) || cfg.certificationExclude.includes(value)) return;
+            if (!certifications.includes(value)) certifications.push(value);
+        });
+
+        let website = null;
+        let profileUrl = null;
+        card.querySelectorAll(cfg.linkSelector).forEach((a) => {
+            const href = a.href;
+            if (!href || !/^https?:/.test(href)) return;
+            if (!isFirstParty(href)) {
+                website = website || href;
+            } else if (!profileUrl) {
+                const path = new URL(href).pathname;
+                if (path.includes(cfg.profilePath) && path !== location.pathname) profileUrl = href;
+            }
+        });
+
+        return {
+            name: nameEl ? nameEl.textContent.trim() : (dataLayer.contractor_name || null),
+            rating: rating ? rating[1] : (dataLayer.contractor_rating || null),
+            reviewCount: rating ? rating[2] : (dataLayer.contractor_reviews_count || null),
+            location: place ? place[1].trim() : null,
+            distance: place ? place[2] : null,
+            phone: phone,
+            certifications: certifications,
+            website: website,
+            profileUrl: profileUrl,
+            contractorId: dataLayer.contractor_id || null,
+        };
+    });
+}
+"""
+
+# Resolves once result cards (different from previous_marker, if given) or a
+# "no results" message are rendered. Returns the card count and the text of
+# the first card, used to detect when the next page has replaced the results.
+WAIT_FOR_RESULTS_JS = """
+([cardSelectors, noResultsPattern, previousMarker]) => {
+    for (const selector of cardSelectors) {
+        const cards = document.querySelectorAll(selector);
+        if (cards.length) {
+            const marker = (cards[0].textContent || "").trim();
+            return marker !== previousMarker ? { count: cards.length, marker: marker } : false;
+        }
+    }
+    const text = document.body ? document.body.innerText : "";
+    return new RegExp(noResultsPattern, "i").test(text) ? { count: 0, marker: null } : false;
+}
+"""
+
+# Reads the "Showing 1 - 10 of 85 results" range, used to plan the remaining pages
+RESULTS_RANGE_JS = """
+(pattern) => {
+    const text = document.body ? document.body.innerText : "";
+    const match = text.match(new RegExp(pattern, "i"));
+    if (!match) return null;
+    const toInt = (value) => parseInt(value.replace(/,/g, ""), 10);
+    return { first: toInt(match[1]), last: toInt(match[2]), total: toInt(match[3]) };
+}
+"""
+
+# Normalized text of the rendered result cards, hashed to detect unchanged pages
+RESULTS_TEXT_JS = """
+(cardSelectors) => {
+    for (const selector of cardSelectors) {
+        const cards = document.querySelectorAll(selector);
+        if (cards.length) {
+            return Array.from(cards, (card) => (card.textContent || "").replace(/\\s+/g, " ").trim()).join("\\n");
+        }
+    }
+    return "";
+}
+"""
+
 class GAFScraper:
     """
     Scraper for GAF website to extract contractor information.
@@ -35,6 +183,19 @@ class GAFScraper:
     
     BASE_URL = "https://www.gaf.com/en-us/roofing-contractors/residential"
     
+    # "dom" reads the rendered result cards, "network" parses the search API responses
+    EXTRACTION_MODES = ("dom", "network")
+    
+    # Chromium only honours per-context proxies if the browser was launched with one
+    PER_CONTEXT_PROXY = {"server": "http://per-context"}
+    
+    # Response statuses that count against the proxy the request went through
+    PROXY_FAILURE_STATUSES = (403, 407, 429, 502, 503, 504)
+    
+    # Query parameter selecting a (1-based) result page, and the most pages planned for one search
+    PAGE_PARAMETER = "page"
+    MAX_PAGES = 100
+    
     def __init__(
         self, 
         zip_code: str, 
@@ -43,7 +204,24 @@ class GAFScraper:
         requests_per_minute: int = 10,
         proxies: Optional[List[str]] = None,
         max_retries: int = 3,
-        timeout: int = 30000  # 30 seconds
+        timeout: int = 30000,  # 30 seconds
+        burst: int = 1,
+        geolocation: Optional[Dict[str, float]] = None,
+        extraction_mode: str = "dom",
+        block_resources: bool = True,
+        request_filter: Optional[RequestFilter] = None,
+        cdp_endpoint: Optional[str] = None,
+        use_browser_worker: bool = False,
+        result_cache: Optional[ResultCache] = None,
+        artifact_sink: Optional[DebugArtifactSink] = None,
+        detail_crawler: Optional[DetailCrawler] = None,
+        record_stream: Optional[RecordStream] = None,
+        metrics: Optional[ScrapeMetrics] = None,
+        page_concurrency: int = 4,
+        throttle: Optional[AdaptiveThrottle] = None,
+        base_url: Optional[str] = None,
+        rate_limiter: Optional[Union[RateLimiter, KeyedRateLimiter]] = None,
+        proxy_manager: Optional[ProxyManager] = None
     ):
         """
         Initialize the GAF scraper.
@@ -56,23 +234,73 @@ class GAFScraper:
             proxies: List of proxy URLs (default: None)
             max_retries: Maximum number of retry attempts (default: 3)
             timeout: Default timeout for operations in milliseconds (default: 30000)
+            burst: Maximum number of requests allowed back to back (default: 1)
+            geolocation: Browser geolocation as {"latitude", "longitude"} (default: centroid of zip_code)
+            extraction_mode: "dom" to read rendered cards or "network" to parse search API responses (default: "dom")
+            block_resources: Abort images, fonts, media and analytics requests (default: True)
+            request_filter: Custom request filter to install instead of the default one
+            cdp_endpoint: Attach to an already running browser at this CDP endpoint
+            use_browser_worker: Attach to the local browser worker if one is running (default: False)
+            result_cache: Cache of previous search results to serve or revalidate against (default: None)
+            artifact_sink: Where sampled debug snapshots of pages are written (default: logs/artifacts, 1 in 10 pages)
+            detail_crawler: Crawler used to merge contractor profile pages into the results (default: None, search results only)
+            record_stream: NDJSON stream each result page is appended to, with resume checkpoints (default: None)
+            metrics: Registry of phase timings and request counters (default: a new registry)
+            page_concurrency: Result pages loaded at once by URL when the page count is known,
+                1 to follow the next button page by page (default: 4)
+            throttle: Adaptive controller of the request rate fed with block signals (default: None, fixed rate)
+            base_url: Search page URL, e.g. of a local mock site (default: BASE_URL)
+            rate_limiter: Rate limiter shared with other scrapers, replacing requests_per_minute
+                and burst (default: a new RateLimiter)
+            proxy_manager: Proxy manager shared with other scrapers, replacing proxies
+                (default: a new ProxyManager)
         """
+        if extraction_mode not in self.EXTRACTION_MODES:
+            raise ValueError(f"Unknown extraction mode: {extraction_mode}")
+        
         self.zip_code = zip_code
         self.distance = distance
         self.headless = headless
+        self.base_url = base_url or self.BASE_URL
+        self.playwright = None
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
+        self.geolocation = geolocation or get_zip_geolocation(zip_code)
         self.raw_data_path = os.path.join("data", "raw_contractors.json")
         
         # Initialize rate limiter
-        self.rate_limiter = RateLimiter(requests_per_minute=requests_per_minute)
+        self.rate_limiter = rate_limiter or RateLimiter(requests_per_minute=requests_per_minute, burst=burst)
         
         # Initialize proxy manager if proxies are provided
-        self.proxy_manager = ProxyManager(proxies=proxies)
+        self.proxy_manager = proxy_manager or ProxyManager(proxies=proxies)
         
         # Configuration
         self.max_retries = max_retries
         self.timeout = timeout
+        self.retry_policy = RetryPolicy(max_retries=max_retries, deadline=timeout / 1000 * (max_retries + 1))
+        self.extraction_mode = extraction_mode
+        self.response_collector: Optional[SearchResponseCollector] = None
+        self.request_filter = request_filter or (RequestFilter() if block_resources else None)
+        self._results_marker: Optional[str] = None
+        self.cdp_endpoint = cdp_endpoint
+        self.use_browser_worker = use_browser_worker
+        self.attached_to_worker = False
+        self.proxy: Optional[str] = None
+        self.result_cache = result_cache
+        self.metrics = metrics or ScrapeMetrics()
+        self.artifact_sink = artifact_sink or DebugArtifactSink(metrics=self.metrics)
+        self.detail_crawler = detail_crawler
+        # Records with and without profile details, or from different extraction modes, are cached apart
+        self.cache_variant = f"{extraction_mode}|{'details' if detail_crawler else 'search'}"
+        self.record_stream = record_stream
+        self.page_concurrency = max(1, page_concurrency)
+        self.throttle = throttle
+        if throttle and throttle.rate_limiter is None:
+            throttle.attach(self.rate_limiter)
+        self._results_hash: Optional[str] = None
+        self._results_complete = False
+        self._results_reused = False
+        self._results_partial = False
         
         # Statistics
         self.start_time = None
@@ -81,42 +309,75 @@ class GAFScraper:
         self.success_count = 0
         self.error_count = 0
         self.captcha_count = 0
+        self.pages_scraped = 0
+    
+    @staticmethod
+    def build_context_options(geolocation: Dict[str, float], proxy: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build the keyword arguments used to create a browser context.
         
+        Args:
+            geolocation: Geolocation reported by the context
+            proxy: Proxy URL the context's requests go through (default: None, direct)
+            
+        Returns:
+            Dictionary of options for Browser.new_context
+        """
+        options = {
+            "viewport": {"width": 1280, "height": 800},
+            "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+            "geolocation": geolocation,
+            "locale": "en-US",
+            "timezone_id": "America/New_York",
+            "has_touch": False,
+            "java_script_enabled": True,
+            "color_scheme": "no-preference",
+            "ignore_https_errors": True,
+            "permissions": ["geolocation"],
+            "extra_http_headers": {
+                "Accept-Language": "en-US,en;q=0.9",
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+            },
+        }
+        if proxy:
+            options["proxy"] = proxy_settings(proxy)
+        return options
+    
     async def initialize(self):
-        """Initialize the Playwright browser."""
+        """Initialize the Playwright browser, attaching to a warm browser worker when available."""
         try:
-            playwright = await async_playwright().start()
-            
-            # Get a proxy if available
-            proxy = await self.proxy_manager.get_next_proxy()
-            proxy_config = {"server": proxy} if proxy else None
-            
-            # Launch browser with proxy if configured
-            self.browser = await playwright.chromium.launch(
-                headless=self.headless,
-                proxy=proxy_config,
-                timeout=self.timeout
-            )
-            
-            # Create a new browser context with custom settings
-            self.context = await self.browser.new_context(
-                viewport={"width": 1280, "height": 800},
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-                geolocation={"latitude": 40.7128, "longitude": -74.0060},  # NYC coordinates for ZIP 10013
-                locale="en-US",
-                timezone_id="America/New_York",
-                has_touch=False,
-                java_script_enabled=True,
-                color_scheme="no-preference",
-                ignore_https_errors=True,
-                extra_http_headers={
-                    "Accept-Language": "en-US,en;q=0.9",
-                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                }
-            )
+            with self.metrics.time("browser_launch"):
+                self.playwright = await async_playwright().start()
+                
+                endpoint = self.cdp_endpoint
+                if not endpoint and self.use_browser_worker:
+                    endpoint = await find_worker_endpoint(BROWSER_WORKER_STATE_PATH)
+                    if not endpoint:
+                        logger.warning("No healthy browser worker found, launching a local browser")
+                
+                if endpoint:
+                    # Reuse the running browser instead of paying for a launch
+                    self.browser = await self.playwright.chromium.connect_over_cdp(endpoint, timeout=self.timeout)
+                    self.attached_to_worker = True
+                    logger.info(f"Attached to browser worker at {endpoint}")
+                    if self.proxy_manager.proxies:
+                        logger.warning("The attached browser was not launched for per-context proxies, "
+                                       "requests will not go through the configured proxies")
+                else:
+                    # Proxies are set per context, the launch proxy is only a placeholder
+                    self.browser = await self.playwright.chromium.launch(
+                        headless=self.headless,
+                        proxy=self.PER_CONTEXT_PROXY if self.proxy_manager.proxies else None,
+                        timeout=self.timeout
+                    )
+                
+                # Create a new browser context with custom settings, using a proxy if available
+                self.proxy = await self.proxy_manager.get_next_proxy()
+                self.context = await self.browser.new_context(**self.build_context_options(self.geolocation, self.proxy))
             
-            # Set various permissions
-            await self.context.grant_permissions(["geolocation"])
+            # Abort requests for resources that are never read
+            if self.request_filter:
+                await self.request_filter.install(self.context)
             
             # Set cookies for session consistency (if needed)
             # await self.context.add_cookies([...])
@@ -129,10 +390,85 @@ class GAFScraper:
     
     async def close(self):
         """Close the browser and cleanup resources."""
+        await self.artifact_sink.flush()
+        
         if self.context:
             await self.context.close()
-        if self.browser:
+            self.context = None
+        
+        if self.attached_to_worker:
+            # Leave the worker's browser running, only report what this run used
+            record_pages_served(self.request_count, BROWSER_WORKER_STATE_PATH)
+            self.attached_to_worker = False
+        elif self.browser:
             await self.browser.close()
+        self.browser = None
+        
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
+    
+        self.metrics.flush()
+    
+    def metric_labels(self) -> Dict[str, str]:
+        """
+        Labels of the request counters of this search.
+        
+        Returns:
+            Dictionary with the ZIP code and the proxy in use
+        """
+        return {"zip_code": self.zip_code, "proxy": proxy_label(self.proxy)}
+    
+    async def _goto(self, page: Page, url: str):
+        """
+        Load a URL within the request budget of its host.
+        
+        Args:
+            page: Playwright page object
+            url: URL to load
+            
+        Returns:
+            Playwright response of the navigation
+        """
+        await self.rate_limiter.wait(urlparse(url).hostname)
+        self.request_count += 1
+        self.metrics.inc("requests_total", **self.metric_labels())
+        
+        started = time.monotonic()
+        try:
+            response = await page.goto(url, wait_until="domcontentloaded", timeout=self.timeout)
+        except PlaywrightError as e:
+            self.metrics.observe("navigation", time.monotonic() - started)
+            self.metrics.inc("errors_total", **self.metric_labels())
+            self.proxy_manager.record_failure(self.proxy)
+            self.record_signal("timeout" if isinstance(e, PlaywrightTimeoutError) else "error")
+            raise
+        
+        elapsed = time.monotonic() - started
+        self.metrics.observe("navigation", elapsed)
+        if response is not None and response.status in BLOCK_STATUSES:
+            self.record_signal("blocked")
+        if response is not None and response.status in self.PROXY_FAILURE_STATUSES:
+            self.metrics.inc("errors_total", **self.metric_labels())
+            self.proxy_manager.record_failure(self.proxy)
+        else:
+            self.proxy_manager.record_success(self.proxy, elapsed)
+        return response
+    
+    def search_url(self, page_num: int = 1) -> str:
+        """
+        Build the URL of a search result page.
+        
+        Args:
+            page_num: Result page number (default: 1)
+            
+        Returns:
+            Search URL for this scraper's ZIP code and distance
+        """
+        url = f"{self.base_url}?postalCode={self.zip_code}&distance={self.distance}"
+        if page_num > 1:
+            url += f"&{self.PAGE_PARAMETER}={page_num}"
+        return url
     
     async def navigate_to_search_page(self, page: Page) -> bool:
         """
@@ -145,131 +481,200 @@ class GAFScraper:
             bool: True if contractor listings are detected, False otherwise
         """
         try:
-            await self.rate_limiter.wait()
-
-            search_url = f"{self.BASE_URL}?postalCode={self.zip_code}&distance={self.distance}"
+            search_url = self.search_url()
             logger.info(f"Navigating to: {search_url}")
 
-            response = await page.goto(search_url, wait_until="domcontentloaded", timeout=self.timeout)
-            self.request_count += 1
+            response = await self._fetch(page, search_url)
 
-            # Wait for the results to load
-            await page.wait_for_timeout(3000)  # Give page time to load completely
+            # In network mode the search API response is the readiness signal
+            if self.response_collector:
+                with self.metrics.time("readiness_wait"):
+                    cards = await self.response_collector.wait_for_cards(self.timeout / 1000)
+                if cards:
+                    logger.info(f"Captured {len(cards)} contractors from search responses")
+                    self.success_count += 1
+                    return True
+                logger.warning("No search responses captured, falling back to DOM extraction")
 
-            # Check if listings appear
-            article_elements = page.locator("article")
-            article_count = await article_elements.count()
+            # Wait until the results (or a "no results" message) are rendered
+            with self.metrics.time("readiness_wait"):
+                results = await self.wait_for_results(page)
+            self._results_marker = results["marker"]
+            article_count = results["count"]
             logger.info(f"Found {article_count} contractor cards")
 
-            # Save screenshot + HTML for debugging
-            os.makedirs("logs", exist_ok=True)
-            await page.screenshot(path=f"logs/search_page_{self.zip_code}.png")
-            html_content = await page.content()
-            with open(f"logs/page_content_{self.zip_code}.html", "w", encoding="utf-8") as f:
-                f.write(html_content)
+            # Save a sampled snapshot for debugging, always when nothing was found
+            await self.artifact_sink.capture(page, self.zip_code, 1, error=article_count == 0)
 
             if article_count > 0:
                 self.success_count += 1
+                self.record_signal("ok")
                 return True
             else:
                 logger.warning("No contractor listings found")
+                # An empty page may be a challenge rather than a search without results
+                await self.check_page(page)
                 return False
 
         except Exception as e:
             logger.error(f"Error navigating to search page: {str(e)}")
-            try:
-                await page.screenshot(path=f"logs/error_navigation_{self.zip_code}.png")
-            except:
-                pass
+            await self.artifact_sink.capture(page, self.zip_code, 1, label="error_navigation", error=True)
             self.error_count += 1
+            self.metrics.inc("errors_total", **self.metric_labels())
             return False           
             
     
-    async def extract_contractor_details(self, page: Page) -> List[Dict[str, Any]]:
+    def record_signal(self, signal: str) -> None:
+        """
+        Report the outcome of a page load to the adaptive throttle, if any.
+        
+        Args:
+            signal: "ok" or a block signal, see throttle.HARD_SIGNALS and throttle.SOFT_SIGNALS
+        """
+        if self.throttle:
+            self.throttle.record(signal)
+    
+    async def check_page(self, page: Page) -> str:
+        """
+        Check a page without results for CAPTCHAs and block pages in a single
+        round trip, and report what was found.
+        
+        Args:
+            page: Playwright page object
+            
+        Returns:
+            "captcha", "blocked", "empty", "error" or "ok" (a genuine "no results" page)
+        """
+        signal = await detect_block(page)
+        if signal == "captcha":
+            logger.warning(f"CAPTCHA detected for ZIP code {self.zip_code}")
+            self.captcha_count += 1
+            self.metrics.inc("captchas_total", **self.metric_labels())
+        elif signal == "blocked":
+            logger.warning(f"Block page served for ZIP code {self.zip_code}")
+        
+        self.record_signal(signal)
+        return signal
+    
+    async def wait_for_results(self, page: Page, previous_marker: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Wait until result cards or a "no results" message are rendered.
+        
+        Args:
+            page: Playwright page object
+            previous_marker: Text of the first card of the previous page, if paginating
+            
+        Returns:
+            Dictionary with the card count and the marker of the current page
+        """
+        try:
+            handle = await page.wait_for_function(
+                WAIT_FOR_RESULTS_JS,
+                arg=[page_selectors.CARD_SELECTORS, page_selectors.NO_RESULTS_PATTERN, previous_marker],
+                polling=100,
+                timeout=self.timeout
+            )
+            results = await handle.json_value()
+        except PlaywrightTimeoutError:
+            logger.warning("Timed out waiting for search results to render")
+            results = {"count": 0, "marker": None}
+        
+        return results
+    
+    async def compute_results_hash(self, page: Page) -> Optional[str]:
+        """
+        Hash the results currently shown, to detect pages unchanged since they were cached.
+        
+        Args:
+            page: Playwright page object
+            
+        Returns:
+            Hex digest of the results, or None if there is nothing to hash
+        """
+        try:
+            if self.response_collector and self.response_collector.cards:
+                content = json.dumps(self.response_collector.cards, sort_keys=True)
+            else:
+                content = await page.evaluate(RESULTS_TEXT_JS, page_selectors.CARD_SELECTORS)
+        except Exception as e:
+            logger.debug(f"Could not hash search results: {str(e)}")
+            return None
+        
+        return hash_content(content) if content else None
+    
+    def get_cached_results(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the cached results of this search if they are still within the cache TTL.
+        
+        Returns:
+            List of contractor details, or None if there is no fresh cache entry
+        """
+        # Cached records are not split by page, so they can't complete a partially written ZIP
+        if not self.result_cache or (self.record_stream and self.record_stream.pages_done(self.zip_code)):
+            return None
+        
+        entry = self.result_cache.get_fresh(self.zip_code, self.distance, self.cache_variant)
+        if entry is None:
+            return None
+        
+        self.pages_scraped = entry["pages_scraped"] or 0
+        logger.info(f"Serving {entry['record_count']} cached contractors for ZIP code {self.zip_code} "
+                    f"(fetched {entry['age_seconds']:.0f}s ago)")
+        
+        if self.record_stream:
+            self.record_stream.write_page(self.zip_code, max(self.pages_scraped, 1), entry["records"])
+            self.record_stream.complete_zip(self.zip_code)
+        self.metrics.inc("records_total", len(entry["records"]), zip_code=self.zip_code)
+        return entry["records"]
+    
+    async def extract_contractor_details(
+        self,
+        page: Page,
+        response_collector: Optional[SearchResponseCollector] = None
+    ) -> List[Dict[str, Any]]:
         """
         Extract all contractor details from the search results page.
+        All card fields are collected inside the page in a single call.
         
         Args:
             page: Playwright page object
+            response_collector: Collector listening on the page (default: the search page's collector)
             
         Returns:
             List of dictionaries containing contractor details
         """
         contractors = []
+        collector = response_collector or self.response_collector
         
         try:
-            # Using article elements as the container for contractor listings
-            contractor_cards = page.locator("article")
-            count = await contractor_cards.count()
-            
-            logger.info(f"Extracting details from {count} contractor cards")
-            
-            # First, let's try to get the full HTML content and parse it directly
-            html_content = await page.content()
-            
-            # Write the HTML to a file for offline analysis
-            with open(f"logs/full_page_content_{self.zip_code}.html", "w", encoding="utf-8") as f:
-                f.write(html_content)
-            
-            # Dump the text content of the full page for analysis
-            page_text = await page.text_content("body")
-            with open(f"logs/page_text_{self.zip_code}.txt", "w", encoding="utf-8") as f:
-                f.write(page_text)
-            
-            # Since we can't interact with the articles directly, let's try a different approach
-            # We'll extract data from visible sections of the page
-            
-            # Get all h3 elements which likely contain company names
-            h3_elements = page.locator("h3")
-            h3_count = await h3_elements.count()
-            logger.info(f"Found {h3_count} h3 elements on the page")
-            
-            # Extract company names
-            company_names = []
-            for i in range(h3_count):
-                try:
-                    name = await h3_elements.nth(i).text_content()
-                    if name:
-                        company_names.append(name.strip())
-                        logger.info(f"Found company name: {name.strip()}")
-                except Exception as e:
-                    logger.warning(f"Error extracting h3 element {i}: {str(e)}")
-            
-            # If we found company names, we'll create a basic contractor entry for each
-            for name in company_names:
-                contractor_data = {
-                    "name": name,
-                    "rating": None,  # We can't reliably extract this without proper selectors
-                    "address": "N/A",
-                    "phone": "N/A",
-                    "certifications": [],
-                    "description": "GAF Certified Contractor",  # Default description
-                    "website": "N/A",
-                    "source": "GAF",
-                    "zip_code": self.zip_code,
-                }
-                
-                logger.info(f"Created basic entry for contractor: {name}")
-                contractors.append(contractor_data)
+            # Prefer entries captured from the search API responses
+            if collector and collector.cards:
+                for card in collector.take_cards():
+                    contractor_data = build_contractor_record(card, self.zip_code)
+                    if contractor_data["name"]:
+                        contractors.append(contractor_data)
+                logger.info(f"Extracted {len(contractors)} contractors from search responses")
+                return contractors
+            
+            cards = await page.evaluate(EXTRACT_CARDS_JS, page_selectors.as_dict())
+            logger.info(f"Extracting details from {len(cards)} contractor cards")
+            
+            for card in cards:
+                contractor_data = build_contractor_record(card, self.zip_code)
+                if contractor_data["name"]:
+                    contractors.append(contractor_data)
             
-            # If we couldn't get names, let's at least return something
+            # Fall back to bare company names if the card layout was not recognized
             if not contractors:
-                logger.warning("Could not extract company names, creating placeholder entries")
+                names = await page.locator(page_selectors.NAME_SELECTOR).all_text_contents()
+                logger.warning(f"No contractor cards recognized, falling back to {len(names)} headings")
                 
-                # Create generic entries for the number of articles we found
-                for i in range(count):
-                    contractor_data = {
-                        "name": f"GAF Contractor {i+1}",
-                        "rating": None,
-                        "address": "N/A",
-                        "phone": "N/A",
-                        "certifications": [],
-                        "description": "GAF Certified Contractor",
-                        "website": "N/A",
-                        "source": "GAF",
-                        "zip_code": self.zip_code,
-                    }
-                    contractors.append(contractor_data)
+                for name in names:
+                    if name and name.strip():
+                        contractors.append(build_contractor_record({"name": name}, self.zip_code))
+            
+            for contractor_data in contractors:
+                logger.debug(f"Extracted contractor: {contractor_data['name']}")
             
         except Exception as e:
             logger.error(f"Error extracting contractor details: {str(e)}")
@@ -311,16 +716,361 @@ class GAFScraper:
             next_button = page.locator(".pagination-next:not(.disabled), a.next-page, button.next-page")
             
             if await next_button.count() > 0 and await next_button.is_visible():
-                await next_button.click()
-                await page.wait_for_load_state("networkidle")
-                await page.wait_for_selector(".certification-card", timeout=10000)
-                return True
+                if self.response_collector:
+                    self.response_collector.reset()
+                with self.metrics.time("pagination"):
+                    await next_button.click()
+                
+                if self.response_collector:
+                    with self.metrics.time("readiness_wait"):
+                        cards = await self.response_collector.wait_for_cards(self.timeout / 1000)
+                    if cards:
+                        return True
+                    logger.warning("No search response for next page, falling back to DOM extraction")
+                
+                # The next page is ready once its first card replaces the previous one
+                with self.metrics.time("readiness_wait"):
+                    results = await self.wait_for_results(page, previous_marker=self._results_marker)
+                self._results_marker = results["marker"]
+                return results["count"] > 0
             
             return False
         except Exception as e:
             logger.error(f"Error navigating to next page: {str(e)}")
             return False
     
+    async def scrape_search_results(self, page: Page) -> Optional[List[Dict[str, Any]]]:
+        """
+        Run the search for this scraper's ZIP code on an already open page,
+        following pagination until the last page of results.
+        
+        Args:
+            page: Playwright page object
+            
+        Returns:
+            List of contractor details, or None if the search page could not be loaded
+        """
+        all_contractors = []
+        self.pages_scraped = 0
+        
+        if self.extraction_mode == "network":
+            self.response_collector = SearchResponseCollector()
+            self.response_collector.attach(page)
+        
+        try:
+            contractors = await self._scrape_search_pages(page, all_contractors)
+        finally:
+            if self.response_collector:
+                self.response_collector.detach()
+                self.response_collector = None
+        
+        if contractors is None:
+            return None
+        self.metrics.inc("records_total", len(contractors), zip_code=self.zip_code)
+        
+        if self.record_stream and self._results_complete:
+            self.record_stream.complete_zip(self.zip_code)
+        
+        # Only cache complete result sets. Records reused from the cache are already stored,
+        # and pages skipped on resume were never enriched.
+        if self.result_cache and self._results_complete and not (self._results_reused or self._results_partial):
+            self.result_cache.put(
+                self.zip_code, self.distance, contractors, self._results_hash, self.pages_scraped, self.cache_variant
+            )
+        
+        return contractors
+    
+    async def _fetch(self, page: Page, url: str):
+        """
+        Load a URL with retries, within the request budget of its host.
+        
+        Args:
+            page: Playwright page object
+            url: URL to load
+            
+        Returns:
+            Playwright response of the navigation
+        """
+        return await self.retry_policy.run(self._goto, page, url)
+    
+    async def _process_page(self, page: Page, page_num: int, contractors: List[Dict[str, Any]]) -> None:
+        """
+        Enrich the contractors of a result page and append them to the record stream.
+        Pages already written by an interrupted run are skipped.
+        
+        Args:
+            page: Playwright page object
+            page_num: Result page number
+            contractors: Contractors extracted from the page (updated in place)
+        """
+        if self.record_stream and page_num <= self.record_stream.pages_done(self.zip_code):
+            logger.info(f"Page {page_num} of ZIP code {self.zip_code} was already written, skipping")
+            self._results_partial = True
+            return
+        
+        if self.detail_crawler and contractors:
+            enriched = await self.detail_crawler.crawl(page.context, contractors, self._fetch)
+            logger.info(f"Merged profile details into {enriched} of {len(contractors)} contractors")
+        
+        if self.record_stream:
+            self.record_stream.write_page(self.zip_code, page_num, contractors)
+    
+    async def detect_page_count(self, page: Page, first_page_size: int) -> Optional[int]:
+        """
+        Work out the number of result pages from the first page.
+        Uses the total reported by the search API, or the "Showing 1 - 10 of 85
+        results" range shown above the cards.
+        
+        Args:
+            page: Playwright page object showing the first result page
+            first_page_size: Number of contractors on the first page
+            
+        Returns:
+            Number of result pages (capped at MAX_PAGES), or None if it is not shown
+        """
+        total = self.response_collector.total_results if self.response_collector else None
+        page_size = first_page_size
+        
+        if total is None:
+            try:
+                shown = await page.evaluate(RESULTS_RANGE_JS, page_selectors.RESULTS_RANGE_PATTERN)
+            except Exception as e:
+                logger.debug(f"Could not read the result range: {str(e)}")
+                shown = None
+            if shown:
+                total = shown["total"]
+                page_size = max(shown["last"] - shown["first"] + 1, page_size)
+        
+        if not total or not page_size:
+            return None
+        
+        page_count = math.ceil(total / page_size)
+        if page_count > self.MAX_PAGES:
+            logger.warning(f"Search reports {page_count} pages, only the first {self.MAX_PAGES} are scraped")
+        return min(page_count, self.MAX_PAGES)
+    
+    async def fetch_page_by_url(self, context: BrowserContext, page_num: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Load a result page by URL in a new tab and extract its contractors.
+        
+        Args:
+            context: Browser context the tab is opened in
+            page_num: Result page number
+            
+        Returns:
+            Contractors of the page, or None if it could not be loaded
+        """
+        tab = await context.new_page()
+        tab.set_default_timeout(self.timeout)
+        collector = None
+        if self.extraction_mode == "network":
+            collector = SearchResponseCollector()
+            collector.attach(tab)
+        
+        try:
+            await self._fetch(tab, self.search_url(page_num))
+            
+            with self.metrics.time("readiness_wait"):
+                ready = collector is not None and await collector.wait_for_cards(self.timeout / 1000)
+                if not ready:
+                    await self.wait_for_results(tab)
+            
+            with self.metrics.time("extraction"):
+                contractors = await self.extract_contractor_details(tab, collector)
+            if contractors:
+                self.record_signal("ok")
+            else:
+                await self.check_page(tab)
+            await self.artifact_sink.capture(tab, self.zip_code, page_num, error=not contractors)
+            return contractors
+        
+        except Exception as e:
+            logger.error(f"Error loading page {page_num} for ZIP code {self.zip_code}: {str(e)}")
+            await self.artifact_sink.capture(tab, self.zip_code, page_num, label="error_pagination", error=True)
+            self.error_count += 1
+            self.metrics.inc("errors_total", **self.metric_labels())
+            return None
+        
+        finally:
+            if collector:
+                collector.detach()
+            try:
+                await tab.close()
+            except Exception:
+                pass
+    
+    async def fetch_pages_by_url(
+        self,
+        context: BrowserContext,
+        page_count: int,
+        first_page: List[Dict[str, Any]]
+    ) -> Optional[List[Optional[List[Dict[str, Any]]]]]:
+        """
+        Load result pages 2 to page_count concurrently, within the rate budget.
+        
+        Args:
+            context: Browser context the tabs are opened in
+            page_count: Number of result pages
+            first_page: Contractors of the first page, to detect ignored page parameters
+            
+        Returns:
+            Contractors of each page in page order (None for pages that failed),
+            or None if the site ignored the page parameter
+        """
+        semaphore = asyncio.Semaphore(self.page_concurrency)
+        
+        async def fetch(page_num: int):
+            async with semaphore:
+                return await self.fetch_page_by_url(context, page_num)
+        
+        logger.info(f"Fetching pages 2-{page_count} for ZIP code {self.zip_code}, {self.page_concurrency} at a time")
+        pages = await asyncio.gather(*(fetch(page_num) for page_num in range(2, page_count + 1)))
+        
+        # A page showing the first page's contractors means the page parameter was not understood
+        signature = [c["name"] for c in first_page[:3]]
+        if any(contractors and [c["name"] for c in contractors[:3]] == signature for contractors in pages):
+            logger.warning("Page URLs returned the first page again, following the next button instead")
+            return None
+        return pages
+    
+    async def _scrape_search_pages(self, page: Page, all_contractors: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Walk the search result pages, appending extracted contractors.
+        
+        Args:
+            page: Playwright page object
+            all_contractors: List that extracted contractors are appended to
+            
+        Returns:
+            The contractor list, or None if the search page could not be loaded
+        """
+        # Navigate to the search page
+        success = await self.navigate_to_search_page(page)
+        if not success:
+            logger.error(f"Failed to navigate to search page for ZIP code {self.zip_code}")
+            return None
+        
+        # Skip extraction if the results are unchanged since they were cached. The hash only
+        # covers the first page, so this is limited to results that fit on a single page:
+        # reusing more pages would also extend the TTL of pages that were never re-checked
+        content_hash = None
+        self._results_reused = False
+        self._results_complete = False
+        self._results_partial = False
+        resuming = bool(self.record_stream and self.record_stream.pages_done(self.zip_code))
+        if self.result_cache and not resuming:
+            content_hash = await self.compute_results_hash(page)
+            cached = self.result_cache.get(self.zip_code, self.distance, self.cache_variant)
+            if (
+                cached and content_hash and cached["content_hash"] == content_hash
+                and cached["pages_scraped"] == 1 and not await self.check_for_pagination(page)
+            ):
+                logger.info(f"Search results for ZIP code {self.zip_code} unchanged, reusing "
+                            f"{cached['record_count']} cached contractors")
+                self.result_cache.touch(self.zip_code, self.distance, self.cache_variant)
+                self.pages_scraped = 1
+                self._results_reused = True
+                self._results_complete = True
+                all_contractors.extend(cached["records"])
+                if self.record_stream:
+                    self.record_stream.write_page(self.zip_code, self.pages_scraped, cached["records"])
+                return all_contractors
+        
+        # Extract contractors from first page
+        page_num = 1
+        logger.info(f"Scraping page {page_num}")
+        with self.metrics.time("extraction"):
+            contractors = await self.extract_contractor_details(page)
+        self.pages_scraped = page_num
+        await self._process_page(page, page_num, contractors)
+        
+        # Continue even if we have 0 contractors, since next time we might hit a different page condition
+        all_contractors.extend(contractors)
+        
+        # Fetch the remaining pages concurrently once their number is known
+        page_count = None
+        if self.page_concurrency > 1 and contractors:
+            page_count = await self.detect_page_count(page, len(contractors))
+        
+        if page_count and page_count > 1:
+            # Each tab times its own navigation, readiness wait and extraction
+            pages = await self.fetch_pages_by_url(page.context, page_count, contractors)
+            
+            if pages is not None:
+                # Pages are written in order, stopping at the first page that failed
+                for page_num, page_contractors in enumerate(pages, start=2):
+                    if page_contractors is None:
+                        logger.warning(f"Failed to load page {page_num}, results are incomplete")
+                        self._results_hash = content_hash
+                        self._results_complete = False
+                        return all_contractors
+                    await self._process_page(page, page_num, page_contractors)
+                    all_contractors.extend(page_contractors)
+                    self.pages_scraped = page_num
+                
+                self._results_hash = content_hash
+                self._results_complete = True
+                return all_contractors
+        
+        # Otherwise follow the next button page by page
+        complete = True
+        while await self.check_for_pagination(page):
+            page_num += 1
+            logger.info(f"Navigating to page {page_num}")
+            
+            # The click navigates on the page's host, so it spends that host's budget like _goto
+            await self.rate_limiter.wait(urlparse(page.url).hostname)
+            
+            success = await self.go_to_next_page(page)
+            if not success:
+                logger.warning(f"Failed to navigate to page {page_num}")
+                complete = False
+                break
+            
+            logger.info(f"Scraping page {page_num}")
+            with self.metrics.time("extraction"):
+                contractors = await self.extract_contractor_details(page)
+            await self._process_page(page, page_num, contractors)
+            all_contractors.extend(contractors)
+            self.pages_scraped = page_num
+            await self.artifact_sink.capture(page, self.zip_code, page_num, error=not contractors)
+        
+        self._results_hash = content_hash
+        self._results_complete = complete
+        return all_contractors
+    
+    def reset_statistics(self) -> None:
+        """Reset the run statistics."""
+        self.start_time = time.time()
+        self.end_time = None
+        self.request_count = 0
+        self.success_count = 0
+        self.error_count = 0
+        self.captcha_count = 0
+        self.pages_scraped = 0
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get statistics about the current scrape.
+        
+        Returns:
+            Dictionary of request and timing statistics
+        """
+        return {
+            "scrape_duration_seconds": round(self.end_time - self.start_time, 2) if self.end_time and self.start_time else None,
+            "request_count": self.request_count,
+            "success_count": self.success_count,
+            "error_count": self.error_count,
+            "captcha_count": self.captcha_count,
+            **(self.request_filter.get_statistics() if self.request_filter else {}),
+            **(self.result_cache.get_statistics() if self.result_cache else {}),
+            **self.artifact_sink.get_statistics(),
+            **(self.detail_crawler.get_statistics() if self.detail_crawler else {}),
+            **self.metrics.get_statistics(),
+            **(self.throttle.get_statistics() if self.throttle else {}),
+            **({"proxies": self.proxy_manager.get_statistics()} if self.proxy_manager.proxies else {})
+        }
+    
     async def scrape(self) -> List[Dict[str, Any]]:
         """
         Execute the complete scraping process.
@@ -332,59 +1082,43 @@ class GAFScraper:
         
         try:
             # Start tracking time and reset statistics
-            self.start_time = time.time()
-            self.request_count = 0
-            self.success_count = 0
-            self.error_count = 0
-            self.captcha_count = 0
+            self.reset_statistics()
             
             logger.info(f"Starting scrape for ZIP code {self.zip_code} with {self.distance} mile radius")
             
-            await self.initialize()
-            page = await self.context.new_page()
-            
-            # Set default timeout for all operations
-            page.set_default_timeout(self.timeout)
+            # A ZIP code completed by an interrupted run is not searched again
+            from_checkpoint = bool(self.record_stream and self.record_stream.is_complete(self.zip_code))
+            if from_checkpoint:
+                logger.info(f"ZIP code {self.zip_code} was completed by a previous run, reading its records")
+                self.pages_scraped = self.record_stream.pages_done(self.zip_code)
+                results = []
+            else:
+                # Fresh cached results are served without opening a page
+                results = self.get_cached_results()
+            from_cache = results is not None and not from_checkpoint
             
-            # Navigate to the search page
-            success = await self.navigate_to_search_page(page)
-            if not success:
-                logger.error("Failed to navigate to search page")
+            if results is None:
+                await self.initialize()
+                page = await self.context.new_page()
                 
+                # Set default timeout for all operations
+                page.set_default_timeout(self.timeout)
+                
+                results = await self.scrape_search_results(page)
+            
+            if results is None:
                 # Save raw data even if empty to maintain consistent workflow
                 empty_data = []
                 self.save_raw_data(empty_data, {"error": "Failed to navigate to search page"})
                 
                 return []
             
-            # Extract contractors from first page
-            page_num = 1
-            logger.info(f"Scraping page {page_num}")
-            contractors = await self.extract_contractor_details(page)
-            
-            # Continue even if we have 0 contractors, since next time we might hit a different page condition
-            all_contractors.extend(contractors)
+            # The stream holds every page, including pages written before a resume
+            if self.record_stream:
+                results = list(self.record_stream.read_records(self.zip_code))
             
-            # Handle pagination
-            while await self.check_for_pagination(page):
-                page_num += 1
-                logger.info(f"Navigating to page {page_num}")
-                
-                # Rate limiting between page navigations
-                await self.rate_limiter.wait()
-                
-                success = await self.go_to_next_page(page)
-                if not success:
-                    logger.warning(f"Failed to navigate to page {page_num}")
-                    break
-                
-                logger.info(f"Scraping page {page_num}")
-                contractors = await self.extract_contractor_details(page)
-                all_contractors.extend(contractors)
-                
-                # Add some randomized delay between pages to appear more human-like
-                delay = random.uniform(1.0, 3.0)
-                await asyncio.sleep(delay)
+            all_contractors = results
+            page_num = self.pages_scraped
             
             # Add metadata to the scraped data
             metadata = {
@@ -395,6 +1129,10 @@ class GAFScraper:
                 "total_results": len(all_contractors),
                 "pages_scraped": page_num
             }
+            if from_cache:
+                metadata["from_cache"] = True
+            if self.record_stream:
+                metadata["record_stream"] = self.record_stream.path
             
             # Track end time and calculate statistics
             self.end_time = time.time()
@@ -407,6 +1145,10 @@ class GAFScraper:
             # Save raw data with metadata
             self.save_raw_data(all_contractors, metadata)
             
+            # A completed sweep is not resumed by the next run
+            if self.record_stream and self.record_stream.is_complete(self.zip_code):
+                self.record_stream.retire()
+            
         except Exception as e:
             logger.error(f"Error during scraping process: {str(e)}")
             import traceback
@@ -429,43 +1171,113 @@ class GAFScraper:
             data: List of contractor data dictionaries
             metadata: Optional metadata about the scrape
         """
-        try:
-            create_directory_if_not_exists(os.path.dirname(self.raw_data_path))
-            
-            # Create output structure with metadata
-            output = {
-                "data": data,
-                "metadata": metadata or {},
-                "statistics": {
-                    "total_contractors": len(data),
-                    "scrape_duration_seconds": round(self.end_time - self.start_time, 2) if self.end_time and self.start_time else None,
-                    "request_count": self.request_count,
-                    "success_count": self.success_count,
-                    "error_count": self.error_count,
-                    "captcha_count": self.captcha_count
-                }
+        write_raw_data(self.raw_data_path, data, metadata, self.get_statistics())
+
+def write_raw_data(
+    raw_data_path: str,
+    data: List[Dict[str, Any]],
+    metadata: Optional[Dict[str, Any]] = None,
+    statistics: Optional[Dict[str, Any]] = None,
+    snapshot_store: Optional[SnapshotStore] = None
+) -> None:
+    """
+    Write raw scraped data to a JSON file and record it in the snapshot store.
+    
+    Args:
+        raw_data_path: Path of the raw data file
+        data: List of contractor data dictionaries
+        metadata: Optional metadata about the scrape
+        statistics: Optional scrape statistics
+        snapshot_store: Store keeping past outputs (default: snapshots/ next to the raw data file)
+    """
+    try:
+        create_directory_if_not_exists(os.path.dirname(raw_data_path))
+        
+        # Create output structure with metadata
+        output = {
+            "data": data,
+            "metadata": metadata or {},
+            "statistics": {
+                "total_contractors": len(data),
+                **(statistics or {})
             }
-            
-            # Create timestamped backup of previous data if it exists
-            if os.path.exists(self.raw_data_path):
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                backup_path = f"{self.raw_data_path}.{timestamp}.bak"
-                try:
-                    os.rename(self.raw_data_path, backup_path)
-                    logger.info(f"Created backup of previous data at {backup_path}")
-                except Exception as e:
-                    logger.warning(f"Could not create backup: {str(e)}")
-            
-            # Save the new data
-            with open(self.raw_data_path, 'w', encoding='utf-8') as f:
-                json.dump(output, f, indent=2)
-            
-            logger.info(f"Saved raw data to {self.raw_data_path}")
-            
-            # Additional backup to S3 or other storage could be added here
-            
-        except Exception as e:
-            logger.error(f"Error saving raw data: {str(e)}")
+        }
+        
+        # Save the new data
+        with open(raw_data_path, 'w', encoding='utf-8') as f:
+            json.dump(output, f, indent=2)
+        
+        logger.info(f"Saved raw data to {raw_data_path}")
+        
+    except Exception as e:
+        logger.error(f"Error saving raw data: {str(e)}")
+    
+    snapshot_raw_data(raw_data_path, data, metadata, statistics, snapshot_store)
+
+def snapshot_raw_data(
+    raw_data_path: str,
+    records: Iterable[Dict[str, Any]],
+    metadata: Optional[Dict[str, Any]] = None,
+    statistics: Optional[Dict[str, Any]] = None,
+    snapshot_store: Optional[SnapshotStore] = None
+) -> None:
+    """
+    Record the output of a run in the snapshot store. Replaces the timestamped
+    .bak copies of the raw data file; identical outputs are stored once.
+    
+    Args:
+        raw_data_path: Path of the raw data file
+        records: Iterable of contractor data dictionaries
+        metadata: Optional metadata about the scrape
+        statistics: Optional scrape statistics
+        snapshot_store: Store keeping past outputs (default: snapshots/ next to the raw data file)
+    """
+    try:
+        store = snapshot_store or SnapshotStore(os.path.join(os.path.dirname(raw_data_path), "snapshots"))
+        store.save(records, metadata, statistics)
+    except Exception as e:
+        logger.warning(f"Could not snapshot raw data: {str(e)}")
+
+def write_raw_data_from_stream(
+    raw_data_path: str,
+    record_stream: RecordStream,
+    metadata: Optional[Dict[str, Any]] = None,
+    statistics: Optional[Dict[str, Any]] = None,
+    snapshot_store: Optional[SnapshotStore] = None
+) -> None:
+    """
+    Write the records of an NDJSON stream to a raw data file, one record at a
+    time so memory use does not grow with the number of records.
+    
+    Args:
+        raw_data_path: Path of the raw data file
+        record_stream: Stream holding the scraped records
+        metadata: Optional metadata about the scrape
+        statistics: Optional scrape statistics
+        snapshot_store: Store keeping past outputs (default: snapshots/ next to the raw data file)
+    """
+    try:
+        create_directory_if_not_exists(os.path.dirname(raw_data_path))
+        
+        count = 0
+        with open(raw_data_path, 'w', encoding='utf-8') as f:
+            f.write('{\n  "data": [')
+            for record in record_stream.read_records():
+                f.write(",\n    " if count else "\n    ")
+                f.write(json.dumps(record))
+                count += 1
+            f.write('\n  ],\n  "metadata": ')
+            json.dump(metadata or {}, f)
+            f.write(',\n  "statistics": ')
+            json.dump({"total_contractors": count, **(statistics or {})}, f)
+            f.write("\n}\n")
+        
+        logger.info(f"Saved {count} streamed records to {raw_data_path}")
+        
+    except Exception as e:
+        logger.error(f"Error saving raw data: {str(e)}")
+    
+    snapshot_raw_data(raw_data_path, record_stream.read_records(), metadata, statistics, snapshot_store)
 
 async def main():
     """Main function to run the scraper."""
@@ -474,14 +1286,51 @@ async def main():
     # Parse command line arguments
     parser = argparse.ArgumentParser(description="GAF Contractor Scraper")
     parser.add_argument("--zip-code", type=str, default="10013", help="ZIP code to search (default: 10013)")
+    parser.add_argument("--zip-codes", type=str, help="Comma-separated ZIP codes to search concurrently")
+    parser.add_argument("--zip-file", type=str, help="Path to file containing ZIP codes, one per line")
+    parser.add_argument("--pool-size", type=int, default=4, help="Browser contexts for multi-ZIP mode (default: 4)")
+    parser.add_argument("--concurrency", type=int, help="Maximum concurrent searches in multi-ZIP mode (default: pool size)")
     parser.add_argument("--distance", type=int, default=25, help="Search radius in miles (default: 25)")
+    parser.add_argument("--plan-coverage", action="store_true", help="Only search the ZIP codes needed for the radius to cover all given ZIP codes")
     parser.add_argument("--headless", action="store_true", help="Run browser in headless mode")
     parser.add_argument("--rate-limit", type=int, default=10, help="Requests per minute (default: 10)")
+    parser.add_argument("--burst", type=int, default=1, help="Requests allowed back to back (default: 1)")
+    parser.add_argument("--adaptive-throttle", action="store_true", help="Adjust the request rate and concurrency to CAPTCHAs, blocks, empty pages and timeouts")
+    parser.add_argument("--max-rate", type=int, help="Highest requests per minute reached by the adaptive throttle (default: 3x --rate-limit)")
     parser.add_argument("--timeout", type=int, default=30000, help="Timeout in milliseconds (default: 30000)")
     parser.add_argument("--proxy-file", type=str, help="Path to file containing proxy URLs, one per line")
+    parser.add_argument("--extraction-mode", choices=GAFScraper.EXTRACTION_MODES, default="dom", help="Read rendered cards (dom) or search API responses (network)")
+    parser.add_argument("--no-block-resources", action="store_true", help="Load images, fonts, media and analytics")
+    parser.add_argument("--block-third-party", action="store_true", help="Abort every request to non-GAF hosts")
+    parser.add_argument("--browser-worker", action="store_true", help="Attach to the running browser worker (python -m scraper.browser_worker)")
+    parser.add_argument("--cdp-endpoint", type=str, help="Attach to a browser at this CDP endpoint")
+    parser.add_argument("--cache-ttl", type=float, default=6 * 3600, help="Seconds cached search results are reused (default: 21600)")
+    parser.add_argument("--cache-path", type=str, default=DEFAULT_CACHE_PATH, help=f"Result cache file (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument("--no-cache", action="store_true", help="Always scrape, without reading or writing the result cache")
+    parser.add_argument("--artifact-dir", type=str, default=DEFAULT_ARTIFACT_DIR, help=f"Directory of debug snapshots (default: {DEFAULT_ARTIFACT_DIR})")
+    parser.add_argument("--artifact-sample", type=int, default=10, help="Snapshot one in N successful pages, 0 for errors only (default: 10)")
+    parser.add_argument("--artifact-budget-mb", type=float, default=200, help="Disk budget of debug snapshots in MB (default: 200)")
+    parser.add_argument("--page-concurrency", type=int, default=4, help="Result pages loaded at once by URL, 1 to follow the next button (default: 4)")
+    parser.add_argument("--base-url", type=str, help="Search page URL to scrape instead of gaf.com, e.g. of python -m scraper.mock_site")
+    parser.add_argument("--fetch-details", action="store_true", help="Visit each contractor's profile page for phone, website, description and certifications")
+    parser.add_argument("--detail-concurrency", type=int, default=4, help="Profile pages loaded at once (default: 4)")
+    parser.add_argument("--stream-output", nargs="?", const=DEFAULT_STREAM_PATH, help=f"Append records to an NDJSON file as pages are scraped, resuming interrupted runs (default path: {DEFAULT_STREAM_PATH})")
+    parser.add_argument("--no-resume", action="store_true", help="Start the stream over instead of resuming from its checkpoint")
+    parser.add_argument("--metrics-file", type=str, help="Write phase timings and request counters in Prometheus text format to this file")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics during the run")
+    parser.add_argument("--enqueue", action="store_true", help="Add the ZIP codes to the job queue instead of scraping them")
+    parser.add_argument("--worker", action="store_true", help="Run as a queue worker, scraping queued jobs until the queue is drained")
+    parser.add_argument("--queue-path", type=str, help="Job queue database (default: db/scrape_jobs.db)")
+    parser.add_argument("--lease-seconds", type=float, default=300, help="Job lease duration in worker mode, renewed by heartbeats (default: 300)")
     parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
     
     args = parser.parse_args()
+    if args.worker and args.stream_output:
+        parser.error("--stream-output can't be used in worker mode, workers store results in the job queue")
+    if args.proxy_file and (args.browser_worker or args.cdp_endpoint):
+        # Chromium only honours per-context proxies when launched with PER_CONTEXT_PROXY, attached browsers are not
+        parser.error("--proxy-file can't be used with --browser-worker or --cdp-endpoint, "
+                     "an attached browser would ignore the proxies")
     
     # Configure logging level
     log_level = logging.DEBUG if args.verbose else logging.INFO
@@ -497,18 +1346,171 @@ async def main():
             proxies = [line.strip() for line in f if line.strip()]
         print(f"Loaded {len(proxies)} proxies from {args.proxy_file}")
     
+    request_filter = None
+    if not args.no_block_resources:
+        request_filter = RequestFilter(block_third_party=args.block_third_party)
+    
+    result_cache = None
+    if not args.no_cache:
+        result_cache = ResultCache(args.cache_path, ttl_seconds=args.cache_ttl)
+    
+    throttle = None
+    if args.adaptive_throttle:
+        throttle = AdaptiveThrottle(max_rpm=args.max_rate or args.rate_limit * 3)
+    
+    metrics = ScrapeMetrics(path=args.metrics_file)
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+    
+    artifact_sink = DebugArtifactSink(
+        directory=args.artifact_dir,
+        sample_every=args.artifact_sample,
+        max_size_mb=args.artifact_budget_mb,
+        metrics=metrics
+    )
+    
+    detail_crawler = None
+    if args.fetch_details:
+        detail_crawler = DetailCrawler(concurrency=args.detail_concurrency, timeout=args.timeout)
+    
+    record_stream = None
+    if args.stream_output:
+        record_stream = RecordStream(args.stream_output, resume=not args.no_resume, distance=args.distance)
+    
+    # Collect ZIP codes for multi-ZIP mode
+    zip_codes = []
+    if args.zip_codes:
+        zip_codes.extend(z.strip() for z in args.zip_codes.split(",") if z.strip())
+    if args.zip_file and os.path.exists(args.zip_file):
+        with open(args.zip_file, 'r') as f:
+            zip_codes.extend(line.strip() for line in f if line.strip())
+    
+    if zip_codes and args.plan_coverage:
+        from .zip_index import plan_coverage
+        
+        plan = plan_coverage(zip_codes, args.distance)
+        print(f"Coverage plan: {len(plan)} searches cover {len(set(zip_codes))} ZIP codes")
+        zip_codes = [search["zip_code"] for search in plan]
+    
+    if args.enqueue or args.worker:
+        from .job_queue import DEFAULT_QUEUE_PATH, JobQueue, QueueWorker
+        
+        queue = JobQueue(args.queue_path or DEFAULT_QUEUE_PATH)
+        if args.enqueue:
+            added = queue.enqueue(zip_codes or [args.zip_code], args.distance)
+            print(f"Added {added} jobs to {queue.path}: {queue.counts()}")
+        
+        if args.worker:
+            from .multi_zip import MultiZipScraper
+            
+            worker = QueueWorker(
+                queue,
+                MultiZipScraper(
+                    zip_codes=[],
+                    distance=args.distance,
+                    headless=args.headless,
+                    requests_per_minute=args.rate_limit,
+                    burst=args.burst,
+                    proxies=proxies,
+                    timeout=args.timeout,
+                    pool_size=args.pool_size,
+                    max_concurrency=args.concurrency,
+                    extraction_mode=args.extraction_mode,
+                    request_filter=request_filter,
+                    cdp_endpoint=args.cdp_endpoint,
+                    use_browser_worker=args.browser_worker,
+                    result_cache=result_cache,
+                    artifact_sink=artifact_sink,
+                    detail_crawler=detail_crawler,
+                    metrics=metrics,
+                    page_concurrency=args.page_concurrency,
+                    throttle=throttle,
+                    base_url=args.base_url
+                ),
+                lease_seconds=args.lease_seconds
+            )
+            print(f"Starting queue worker {worker.worker_id} on {queue.path}")
+            statistics = await worker.run()
+            metrics.stop()
+            print(f"Worker finished: {statistics['jobs_done']} jobs done, {statistics['jobs_retried']} retried, "
+                  f"{statistics['jobs_dead']} dead. Queue: {statistics['queue']}")
+        
+        queue.close()
+        return
+    
+    if zip_codes:
+        from .multi_zip import MultiZipScraper
+        
+        multi_scraper = MultiZipScraper(
+            zip_codes=zip_codes,
+            distance=args.distance,
+            headless=args.headless,
+            requests_per_minute=args.rate_limit,
+            burst=args.burst,
+            proxies=proxies,
+            timeout=args.timeout,
+            pool_size=args.pool_size,
+            max_concurrency=args.concurrency,
+            extraction_mode=args.extraction_mode,
+            request_filter=request_filter,
+            cdp_endpoint=args.cdp_endpoint,
+            use_browser_worker=args.browser_worker,
+            result_cache=result_cache,
+            artifact_sink=artifact_sink,
+            detail_crawler=detail_crawler,
+            record_stream=record_stream,
+            metrics=metrics,
+            page_concurrency=args.page_concurrency,
+            throttle=throttle,
+            base_url=args.base_url
+        )
+        
+        print(f"Starting GAF contractor scraper for {len(multi_scraper.zip_codes)} ZIP codes with {args.distance} mile radius")
+        results = await multi_scraper.scrape()
+        if record_stream:
+            record_stream.close()
+        metrics.stop()
+        
+        for zip_code in multi_scraper.zip_codes:
+            result = results.get(zip_code)
+            if result:
+                print(f"  {zip_code}: {result['status']:<10} {result['total_results']:>4} contractors, "
+                      f"{result['pages_scraped']} pages, {result['duration_seconds']}s")
+        
+        total = sum(r["total_results"] for r in results.values())
+        print(f"Scraping complete. Extracted information for {total} contractors")
+        print(f"Raw data saved to {multi_scraper.raw_data_path}")
+        return
+    
     # Run the scraper
     scraper = GAFScraper(
         zip_code=args.zip_code,
         distance=args.distance,
         headless=args.headless,
         requests_per_minute=args.rate_limit,
+        burst=args.burst,
         proxies=proxies,
-        timeout=args.timeout
+        timeout=args.timeout,
+        extraction_mode=args.extraction_mode,
+        block_resources=request_filter is not None,
+        request_filter=request_filter,
+        cdp_endpoint=args.cdp_endpoint,
+        use_browser_worker=args.browser_worker,
+        result_cache=result_cache,
+        artifact_sink=artifact_sink,
+        detail_crawler=detail_crawler,
+        record_stream=record_stream,
+        metrics=metrics,
+        page_concurrency=args.page_concurrency,
+        throttle=throttle,
+        base_url=args.base_url
     )
     
     print(f"Starting GAF contractor scraper for ZIP code {args.zip_code} with {args.distance} mile radius")
     contractors = await scraper.scrape()
+    if record_stream:
+        record_stream.close()
+    metrics.stop()
     print(f"Scraping complete. Extracted information for {len(contractors)} contractors")
     print(f"Raw data saved to {scraper.raw_data_path}")
 
@@ -0,0 +1,347 @@
+"""
+Content-addressed store of raw scrape snapshots.
+Each saved run is recorded in a manifest (run time, ZIP codes, counts,
+statistics) and its records are stored once per distinct content as a
+gzipped NDJSON object, replacing the timestamped .bak copies of
+raw_contractors.json. A retention policy keeps disk use bounded.
+"""
+import os
+import re
+import gzip
+import json
+import hashlib
+import logging
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger("gaf_scraper.snapshot_store")
+
+DEFAULT_SNAPSHOT_DIR = os.path.join("data", "snapshots")
+
+# Timestamped backups written by earlier versions of write_raw_data
+BACKUP_PATTERN = re.compile(r"^(?P<name>.+\.json)\.(?P<timestamp>\d{8}_\d{6})\.bak$")
+
+class SnapshotStore:
+    """
+    Stores raw scrape outputs deduplicated by the hash of their records.
+    Identical results (e.g. repeated empty searches) share a single object;
+    only their manifest entries differ.
+    """
+    
+    def __init__(
+        self,
+        directory: str = DEFAULT_SNAPSHOT_DIR,
+        keep_last: int = 24,
+        keep_daily: int = 30,
+        max_size_mb: float = 200
+    ):
+        """
+        Initialize the snapshot store.
+        
+        Args:
+            directory: Directory holding the manifest and objects (default: data/snapshots)
+            keep_last: Number of most recent snapshots always kept (default: 24)
+            keep_daily: Number of days for which the last snapshot of the day is kept (default: 30)
+            max_size_mb: Maximum size of the stored objects, oldest snapshots are dropped beyond it (default: 200 MB)
+        """
+        self.directory = directory
+        self.objects_dir = os.path.join(directory, "objects")
+        self.manifest_path = os.path.join(directory, "manifest.json")
+        self.keep_last = max(1, keep_last)
+        self.keep_daily = max(0, keep_daily)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.entries: List[Dict[str, Any]] = self._load_manifest()
+        self.by_id = {entry["id"]: entry for entry in self.entries}
+    
+    def _load_manifest(self) -> List[Dict[str, Any]]:
+        """Load the manifest, oldest snapshot first."""
+        if not os.path.exists(self.manifest_path):
+            return []
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("snapshots", [])
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not read snapshot manifest {self.manifest_path}: {str(e)}")
+            return []
+    
+    def _save_manifest(self) -> None:
+        """Write the manifest atomically."""
+        temp_path = f"{self.manifest_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"snapshots": self.entries}, f, indent=2)
+        os.replace(temp_path, self.manifest_path)
+    
+    def object_path(self, content_hash: str) -> str:
+        """
+        Get the path of a stored object.
+        
+        Args:
+            content_hash: SHA-256 of the object's records
+        
+        Returns:
+            Path of the gzipped NDJSON object
+        """
+        return os.path.join(self.objects_dir, content_hash[:2], f"{content_hash}.ndjson.gz")
+    
+    def save(
+        self,
+        records: Iterable[Dict[str, Any]],
+        metadata: Optional[Dict[str, Any]] = None,
+        statistics: Optional[Dict[str, Any]] = None,
+        created: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Store a snapshot. Records are streamed into a compressed object while
+        being hashed; if an object with the same content exists, it is reused.
+        
+        Args:
+            records: Contractor records (any iterable, consumed once)
+            metadata: Metadata of the scrape
+            statistics: Statistics of the scrape
+            created: Time of the run (default: now)
+        
+        Returns:
+            Manifest entry of the snapshot
+        """
+        metadata = metadata or {}
+        created = created or datetime.now()
+        digest = hashlib.sha256()
+        count = 0
+        
+        fd, temp_path = tempfile.mkstemp(dir=self.objects_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+                for record in records:
+                    line = (json.dumps(record, sort_keys=True) + "\n").encode("utf-8")
+                    digest.update(line)
+                    f.write(line)
+                    count += 1
+            
+            content_hash = digest.hexdigest()
+            path = self.object_path(content_hash)
+            if os.path.exists(path):
+                os.remove(temp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        
+        entry = {
+            "id": created.strftime("%Y%m%dT%H%M%S%f"),
+            "created": created.isoformat(),
+            "content_hash": content_hash,
+            "record_count": count,
+            "size_bytes": os.path.getsize(path),
+            "zip_codes": metadata.get("zip_codes") or ([metadata["zip_code"]] if metadata.get("zip_code") else []),
+            "distance": metadata.get("distance"),
+            "metadata": metadata,
+            "statistics": statistics or {},
+        }
+        while entry["id"] in self.by_id:
+            entry["id"] += "_"
+        
+        self.entries.append(entry)
+        self.by_id[entry["id"]] = entry
+        self.prune()
+        logger.info(f"Saved snapshot {entry['id']} ({count} records, object {content_hash[:12]})")
+        return entry
+    
+    def list(self, zip_code: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        List snapshots, oldest first.
+        
+        Args:
+            zip_code: Only list snapshots that searched this ZIP code
+        
+        Returns:
+            Manifest entries
+        """
+        if zip_code is None:
+            return list(self.entries)
+        return [entry for entry in self.entries if zip_code in entry["zip_codes"]]
+    
+    def latest(self, zip_code: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get the most recent snapshot.
+        
+        Args:
+            zip_code: Only consider snapshots that searched this ZIP code
+        
+        Returns:
+            Manifest entry or None if there are no snapshots
+        """
+        entries = self.list(zip_code)
+        return entries[-1] if entries else None
+    
+    def iter_records(self, snapshot_id: str) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the records of a snapshot without loading them all.
+        
+        Args:
+            snapshot_id: Snapshot id from the manifest
+        
+        Yields:
+            Contractor records
+        """
+        entry = self.by_id.get(snapshot_id)
+        if entry is None:
+            raise KeyError(f"Unknown snapshot: {snapshot_id}")
+        
+        with gzip.open(self.object_path(entry["content_hash"]), "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    
+    def load(self, snapshot_id: str) -> Dict[str, Any]:
+        """
+        Load a snapshot in the raw data file format.
+        
+        Args:
+            snapshot_id: Snapshot id from the manifest
+        
+        Returns:
+            Dictionary with data, metadata and statistics
+        """
+        entry = self.by_id.get(snapshot_id)
+        if entry is None:
+            raise KeyError(f"Unknown snapshot: {snapshot_id}")
+        
+        data = list(self.iter_records(snapshot_id))
+        return {
+            "data": data,
+            "metadata": entry["metadata"],
+            "statistics": {"total_contractors": len(data), **entry["statistics"]},
+        }
+    
+    def prune(self) -> int:
+        """
+        Apply the retention policy and delete objects no snapshot refers to.
+        Keeps the `keep_last` newest snapshots and the newest snapshot of each
+        of the last `keep_daily` days, then drops the oldest snapshots while the
+        objects exceed the size budget (the newest snapshot is never dropped).
+        
+        Returns:
+            Number of snapshots removed
+        """
+        keep = {entry["id"] for entry in self.entries[-self.keep_last:]}
+        
+        days_seen = set()
+        for entry in reversed(self.entries):
+            day = entry["created"][:10]
+            if day not in days_seen:
+                days_seen.add(day)
+                if len(days_seen) > self.keep_daily:
+                    break
+                keep.add(entry["id"])
+        
+        kept = [entry for entry in self.entries if entry["id"] in keep]
+        
+        def referenced_size(entries: List[Dict[str, Any]]) -> int:
+            return sum({e["content_hash"]: e["size_bytes"] for e in entries}.values())
+        
+        while len(kept) > 1 and referenced_size(kept) > self.max_size_bytes:
+            kept.pop(0)
+        
+        removed = len(self.entries) - len(kept)
+        if removed:
+            self.entries = kept
+            self.by_id = {entry["id"]: entry for entry in kept}
+        self._save_manifest()
+        
+        # Garbage collect unreferenced objects
+        referenced = {entry["content_hash"] for entry in self.entries}
+        for root, _, files in os.walk(self.objects_dir):
+            for name in files:
+                content_hash = name.split(".")[0]
+                if name.endswith(".ndjson.gz") and content_hash not in referenced:
+                    os.remove(os.path.join(root, name))
+        
+        if removed:
+            logger.info(f"Removed {removed} snapshots by retention policy")
+        return removed
+    
+    def import_backups(self, directory: str, delete: bool = False) -> int:
+        """
+        Import the timestamped .bak files written by earlier versions.
+        
+        Args:
+            directory: Directory containing the backups
+            delete: Delete each backup once it is imported (default: False)
+        
+        Returns:
+            Number of backups imported
+        """
+        imported = 0
+        for name in sorted(os.listdir(directory)):
+            match = BACKUP_PATTERN.match(name)
+            if not match:
+                continue
+            
+            path = os.path.join(directory, name)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    content = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable backup {path}: {str(e)}")
+                continue
+            
+            created = datetime.strptime(match.group("timestamp"), "%Y%m%d_%H%M%S")
+            self.save(content.get("data", []), content.get("metadata"), content.get("statistics"), created=created)
+            imported += 1
+            if delete:
+                os.remove(path)
+        
+        return imported
+
+def main():
+    """Main function to inspect and manage the snapshot store."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Manage raw scrape snapshots")
+    parser.add_argument("--directory", type=str, default=DEFAULT_SNAPSHOT_DIR, help=f"Snapshot directory (default: {DEFAULT_SNAPSHOT_DIR})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    list_parser = subparsers.add_parser("list", help="List snapshots")
+    list_parser.add_argument("--zip-code", type=str, help="Only list snapshots of this ZIP code")
+    
+    restore_parser = subparsers.add_parser("restore", help="Write a snapshot back to a raw data file")
+    restore_parser.add_argument("snapshot_id", help="Snapshot id")
+    restore_parser.add_argument("output", help="Output raw data file")
+    
+    subparsers.add_parser("prune", help="Apply the retention policy")
+    
+    import_parser = subparsers.add_parser("import-backups", help="Import timestamped .bak raw data files")
+    import_parser.add_argument("backup_dir", nargs="?", default="data", help="Directory with .bak files (default: data)")
+    import_parser.add_argument("--delete", action="store_true", help="Delete backups after importing them")
+    
+    args = parser.parse_args()
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    store = SnapshotStore(args.directory)
+    
+    if args.command == "list":
+        for entry in store.list(args.zip_code):
+            print(f"  {entry['id']}  {entry['record_count']:>6} records  "
+                  f"{entry['content_hash'][:12]}  {','.join(entry['zip_codes'])}")
+        print(f"{len(store.entries)} snapshots")
+    elif args.command == "restore":
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(store.load(args.snapshot_id), f, indent=2)
+        print(f"Restored snapshot {args.snapshot_id} to {args.output}")
+    elif args.command == "prune":
+        print(f"Removed {store.prune()} snapshots")
+    elif args.command == "import-backups":
+        print(f"Imported {store.import_backups(args.backup_dir, delete=args.delete)} backups")
+
+if __name__ == "__main__":
+    main()
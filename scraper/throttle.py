@@ -0,0 +1,217 @@
+"""
+Adaptive throttling for the GAF scraper.
+Classifies every loaded page with a single in-page check (CAPTCHA, block
+page, empty results) and combines that with HTTP statuses and timeouts to
+drive additive-increase/multiplicative-decrease control of the request
+rate and the number of concurrent searches.
+"""
+import math
+import time
+import asyncio
+import logging
+import contextlib
+from typing import Any, AsyncIterator, Dict, Optional
+
+from . import page_selectors
+
+logger = logging.getLogger("gaf_scraper.throttle")
+
+# Signals that the site is pushing back; each one halves rate and concurrency
+HARD_SIGNALS = ("captcha", "blocked")
+
+# Signals that may be load related, answered with a smaller decrease
+SOFT_SIGNALS = ("empty", "timeout", "error")
+
+# Response statuses reported as "blocked"
+BLOCK_STATUSES = (403, 429)
+
+# Inspects the loaded page once for every block indicator
+DETECT_BLOCK_JS = """
+(cfg) => {
+    const text = document.body ? document.body.innerText.slice(0, 20000) : "";
+    return {
+        captcha: !!document.querySelector(cfg.captchaSelectors.join(", ")),
+        blocked: new RegExp(cfg.blockPattern, "i").test(document.title + "\\n" + text),
+        cards: cfg.cardSelectors.some((selector) => document.querySelector(selector)),
+        noResults: new RegExp(cfg.noResultsPattern, "i").test(text),
+    };
+}
+"""
+
+async def detect_block(page) -> str:
+    """
+    Classify a loaded search page.
+    
+    Args:
+        page: Playwright page object
+    
+    Returns:
+        "captcha", "blocked", "empty" (no cards and no "no results" message) or "ok"
+    """
+    try:
+        state = await page.evaluate(DETECT_BLOCK_JS, page_selectors.as_dict())
+    except Exception as e:
+        logger.debug(f"Could not inspect page for blocks: {str(e)}")
+        return "error"
+    
+    if state["captcha"]:
+        return "captcha"
+    if state["blocked"]:
+        return "blocked"
+    if not state["cards"] and not state["noResults"]:
+        return "empty"
+    return "ok"
+
+class AdaptiveThrottle:
+    """
+    AIMD controller of the request rate and the number of concurrent searches.
+    Every `increase_every` consecutive good pages add `increase_rpm` to the
+    rate and one concurrency slot; a hard signal multiplies both by
+    `decrease_factor`, a soft signal by `soft_decrease_factor`. After a
+    decrease, further signals are ignored for `cooldown` seconds so requests
+    already in flight don't compound the backoff.
+    """
+    
+    def __init__(
+        self,
+        min_rpm: float = 1,
+        max_rpm: float = 60,
+        increase_rpm: float = 2,
+        increase_every: int = 5,
+        decrease_factor: float = 0.5,
+        soft_decrease_factor: float = 0.8,
+        cooldown: float = 30
+    ):
+        """
+        Initialize the throttle.
+        
+        Args:
+            min_rpm: Lowest request rate in requests per minute (default: 1)
+            max_rpm: Highest request rate in requests per minute (default: 60)
+            increase_rpm: Rate added after each run of good pages (default: 2)
+            increase_every: Consecutive good pages needed for an increase (default: 5)
+            decrease_factor: Multiplier applied on a CAPTCHA or block (default: 0.5)
+            soft_decrease_factor: Multiplier applied on an empty page, timeout or error (default: 0.8)
+            cooldown: Seconds after a decrease during which signals don't change the limits (default: 30)
+        """
+        self.min_rpm = min_rpm
+        self.max_rpm = max(max_rpm, min_rpm)
+        self.increase_rpm = increase_rpm
+        self.increase_every = max(1, increase_every)
+        self.decrease_factor = decrease_factor
+        self.soft_decrease_factor = soft_decrease_factor
+        self.cooldown = cooldown
+        
+        self.rate_limiter = None
+        self.max_concurrency = 1
+        self.concurrency = 1
+        self.active = 0
+        self._changed = asyncio.Event()
+        self._good_streak = 0
+        self._cooldown_until = 0.0
+        
+        # Statistics
+        self.signals: Dict[str, int] = {}
+        self.increases = 0
+        self.decreases = 0
+    
+    def attach(self, rate_limiter, max_concurrency: int = 1) -> None:
+        """
+        Take control of a rate limiter and a number of concurrency slots.
+        
+        Args:
+            rate_limiter: RateLimiter or KeyedRateLimiter whose rate is adjusted
+            max_concurrency: Most searches allowed at once; also the starting concurrency (default: 1)
+        """
+        self.rate_limiter = rate_limiter
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency = self.max_concurrency
+        self._set_rate(rate_limiter.requests_per_minute)
+    
+    @property
+    def requests_per_minute(self) -> Optional[float]:
+        """Current request rate, or None if no rate limiter is attached."""
+        return self.rate_limiter.requests_per_minute if self.rate_limiter else None
+    
+    def _set_rate(self, requests_per_minute: float) -> None:
+        """Apply a rate within the configured bounds."""
+        if self.rate_limiter:
+            self.rate_limiter.set_rate(min(max(requests_per_minute, self.min_rpm), self.max_rpm))
+    
+    def record(self, signal: str) -> None:
+        """
+        Feed the outcome of a page load into the controller.
+        
+        Args:
+            signal: "ok" or one of HARD_SIGNALS and SOFT_SIGNALS
+        """
+        self.signals[signal] = self.signals.get(signal, 0) + 1
+        if self.rate_limiter is None:
+            return
+        
+        now = time.monotonic()
+        if now < self._cooldown_until:
+            return
+        
+        if signal == "ok":
+            self._good_streak += 1
+            if self._good_streak >= self.increase_every:
+                self._good_streak = 0
+                self._increase()
+            return
+        
+        self._good_streak = 0
+        factor = self.decrease_factor if signal in HARD_SIGNALS else self.soft_decrease_factor
+        self._decrease(factor, signal)
+        self._cooldown_until = now + self.cooldown
+    
+    def _increase(self) -> None:
+        """Additive increase of the rate and the concurrency."""
+        rpm = self.requests_per_minute
+        if rpm >= self.max_rpm and self.concurrency >= self.max_concurrency:
+            return
+        
+        self._set_rate(rpm + self.increase_rpm)
+        if self.concurrency < self.max_concurrency:
+            self.concurrency += 1
+            self._changed.set()
+        self.increases += 1
+        logger.debug(f"Throttle increased to {self.requests_per_minute:.1f} rpm, concurrency {self.concurrency}")
+    
+    def _decrease(self, factor: float, signal: str) -> None:
+        """Multiplicative decrease of the rate and the concurrency."""
+        self._set_rate(self.requests_per_minute * factor)
+        self.concurrency = max(1, math.floor(self.concurrency * factor))
+        self.decreases += 1
+        logger.warning(f"Backing off after {signal}: {self.requests_per_minute:.1f} rpm, "
+                       f"concurrency {self.concurrency}")
+    
+    @contextlib.asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one of the current concurrency slots, waiting for one to free up."""
+        while self.active >= self.concurrency:
+            self._changed.clear()
+            await self._changed.wait()
+        
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._changed.set()
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get throttle statistics.
+        
+        Returns:
+            Dictionary with the current limits, adjustment counts and signal counts
+        """
+        rpm = self.requests_per_minute
+        return {
+            "throttle_rpm": round(rpm, 2) if rpm is not None else None,
+            "throttle_concurrency": self.concurrency,
+            "throttle_increases": self.increases,
+            "throttle_decreases": self.decreases,
+            "throttle_signals": dict(self.signals),
+        }
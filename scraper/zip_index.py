@@ -0,0 +1,462 @@
+"""
+ZIP code centroid index and search coverage planner.
+Holds the bundled ZIP centroids in flat numpy arrays for vectorized
+haversine distances, and plans the smallest set of (zip, distance)
+searches whose radii cover every ZIP code of a region.
+"""
+import os
+import csv
+import logging
+import functools
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("gaf_scraper.zip_index")
+
+EARTH_RADIUS_MILES = 3958.8
+
+# Miles along a meridian per degree of latitude, bounding the latitudes a radius reaches
+MILES_PER_DEGREE_LATITUDE = EARTH_RADIUS_MILES * np.pi / 180
+
+# Candidate search centers compared with the region at a time when planning coverage
+COVERAGE_BLOCK_SIZE = 256
+
+# ZIP code centroids bundled with the project, packed as sorted numpy arrays (see pack_zip_centroids).
+# Every active non-military US ZIP code; coordinates from GeoNames (geonames.org), licensed CC BY 4.0
+ZIP_CENTROIDS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "zip_centroids.npz"
+)
+
+def haversine_miles(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """
+    Great-circle distance in miles between points given in degrees.
+    Arguments broadcast against each other like numpy arrays.
+    
+    Args:
+        lat1: Latitude(s) of the first points
+        lon1: Longitude(s) of the first points
+        lat2: Latitude(s) of the second points
+        lon2: Longitude(s) of the second points
+    
+    Returns:
+        Array of distances in miles
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def load_zip_centroids(path: str) -> Dict[str, Dict[str, float]]:
+    """
+    Load ZIP code centroids from a CSV file with zip_code, latitude and longitude columns.
+    
+    Args:
+        path: Path to the centroids CSV file
+        
+    Returns:
+        Dictionary mapping ZIP codes to {"latitude", "longitude"}
+    """
+    centroids = {}
+    
+    if not os.path.exists(path):
+        logger.warning(f"ZIP centroid file not found: {path}")
+        return centroids
+    
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            try:
+                centroids[row["zip_code"].strip()] = {
+                    "latitude": float(row["latitude"]),
+                    "longitude": float(row["longitude"]),
+                }
+            except (KeyError, ValueError) as e:
+                logger.warning(f"Skipping invalid ZIP centroid row {row}: {str(e)}")
+    
+    return centroids
+
+class ZipCentroidIndex:
+    """ZIP code centroids stored as parallel arrays, with a ZIP code to row lookup."""
+    
+    def __init__(self, zip_codes: Iterable[str], latitudes: Iterable[float], longitudes: Iterable[float]):
+        """
+        Initialize the index.
+        
+        Args:
+            zip_codes: ZIP codes, one per centroid
+            latitudes: Centroid latitudes in degrees
+            longitudes: Centroid longitudes in degrees
+        """
+        self.zip_codes = np.asarray(list(zip_codes), dtype=str)
+        self.latitudes = np.asarray(list(latitudes), dtype=np.float64)
+        self.longitudes = np.asarray(list(longitudes), dtype=np.float64)
+        self.positions = {zip_code: i for i, zip_code in enumerate(self.zip_codes.tolist())}
+    
+    @classmethod
+    def from_centroids(cls, centroids: Dict[str, Dict[str, float]]) -> "ZipCentroidIndex":
+        """
+        Build an index from a {zip_code: {"latitude", "longitude"}} dictionary.
+        
+        Args:
+            centroids: Centroids keyed by ZIP code
+        
+        Returns:
+            ZipCentroidIndex
+        """
+        zip_codes = sorted(centroids)
+        return cls(
+            zip_codes,
+            [centroids[z]["latitude"] for z in zip_codes],
+            [centroids[z]["longitude"] for z in zip_codes]
+        )
+    
+    @classmethod
+    def from_file(cls, path: str) -> "ZipCentroidIndex":
+        """
+        Load an index from a packed .npz file (see pack_zip_centroids) or a CSV file
+        with zip_code, latitude and longitude columns.
+        
+        Args:
+            path: Path to the centroids file
+        
+        Returns:
+            ZipCentroidIndex, empty if the file does not exist
+        """
+        if not path.endswith(".npz"):
+            return cls.from_centroids(load_zip_centroids(path))
+        
+        if not os.path.exists(path):
+            logger.warning(f"ZIP centroid file not found: {path}")
+            return cls([], [], [])
+        
+        # Rounding to about a meter drops the float32 noise from the stored coordinates
+        with np.load(path) as packed:
+            return cls(
+                np.char.zfill(packed["zip_codes"].astype(str), 5),
+                packed["latitudes"].astype(np.float64).round(5),
+                packed["longitudes"].astype(np.float64).round(5)
+            )
+    
+    def __len__(self) -> int:
+        return len(self.zip_codes)
+    
+    def __contains__(self, zip_code: str) -> bool:
+        return zip_code in self.positions
+    
+    def rows(self, zip_codes: Iterable[str]) -> np.ndarray:
+        """
+        Get the rows of known ZIP codes, skipping unknown ones.
+        
+        Args:
+            zip_codes: ZIP codes to look up
+        
+        Returns:
+            Array of row indexes
+        """
+        return np.asarray([self.positions[z] for z in zip_codes if z in self.positions], dtype=np.intp)
+    
+    def centroid(self, zip_code: str) -> Optional[Dict[str, float]]:
+        """
+        Centroid of a ZIP code.
+        
+        Args:
+            zip_code: ZIP code to look up
+        
+        Returns:
+            Dictionary with latitude and longitude, or None if the ZIP code is unknown
+        """
+        i = self.positions.get(zip_code)
+        if i is None:
+            return None
+        return {"latitude": float(self.latitudes[i]), "longitude": float(self.longitudes[i])}
+    
+    def distance(self, zip1: str, zip2: str) -> Optional[float]:
+        """
+        Distance between the centroids of two ZIP codes.
+        
+        Args:
+            zip1: First ZIP code
+            zip2: Second ZIP code
+        
+        Returns:
+            Distance in miles, or None if either ZIP code is unknown
+        """
+        i, j = self.positions.get(zip1), self.positions.get(zip2)
+        if i is None or j is None:
+            return None
+        return float(haversine_miles(self.latitudes[i], self.longitudes[i], self.latitudes[j], self.longitudes[j]))
+    
+    def distances_from(self, latitude: float, longitude: float) -> np.ndarray:
+        """
+        Distance from a point to every centroid in the index.
+        
+        Args:
+            latitude: Latitude of the point in degrees
+            longitude: Longitude of the point in degrees
+        
+        Returns:
+            Array of distances in miles, in index order
+        """
+        return haversine_miles(latitude, longitude, self.latitudes, self.longitudes)
+    
+    def within_radius(self, zip_code: str, radius: float) -> List[str]:
+        """
+        ZIP codes whose centroids lie within a radius of a ZIP code, nearest first.
+        
+        Args:
+            zip_code: Center ZIP code
+            radius: Radius in miles
+        
+        Returns:
+            List of ZIP codes (empty if the center is unknown)
+        """
+        i = self.positions.get(zip_code)
+        if i is None:
+            return []
+        
+        distances = self.distances_from(self.latitudes[i], self.longitudes[i])
+        rows = np.flatnonzero(distances <= radius)
+        rows = rows[np.argsort(distances[rows], kind="stable")]
+        return self.zip_codes[rows].tolist()
+    
+    def distance_matrix(self, rows: np.ndarray, columns: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Pairwise distances between two sets of rows.
+        
+        Args:
+            rows: Row indexes of the first set
+            columns: Row indexes of the second set (default: same as rows)
+        
+        Returns:
+            Array of shape (len(rows), len(columns)) with distances in miles
+        """
+        columns = rows if columns is None else columns
+        return haversine_miles(
+            self.latitudes[rows, None], self.longitudes[rows, None],
+            self.latitudes[None, columns], self.longitudes[None, columns]
+        )
+    
+    def coverage(self, centers: np.ndarray, region: np.ndarray, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Region rows within a radius of each center, as a sparse (CSR) adjacency.
+        Centers are compared with the region in latitude-sorted blocks, and each
+        block only with the band of region rows whose latitude it can reach, so
+        memory stays bounded by the block size and the number of pairs found.
+        
+        Args:
+            centers: Row indexes of the candidate centers
+            region: Row indexes of the region
+            radius: Radius in miles
+        
+        Returns:
+            (offsets, covered): the positions in `region` covered by center i are
+            covered[offsets[i]:offsets[i + 1]], in ascending order
+        """
+        band = radius / MILES_PER_DEGREE_LATITUDE + 1e-9
+        region_order = np.argsort(self.latitudes[region], kind="stable")
+        region_latitudes = self.latitudes[region][region_order]
+        center_order = np.argsort(self.latitudes[centers], kind="stable")
+        
+        pair_centers, pair_region = [], []
+        for start in range(0, len(centers), COVERAGE_BLOCK_SIZE):
+            block = center_order[start:start + COVERAGE_BLOCK_SIZE]
+            latitudes = self.latitudes[centers[block]]
+            low = np.searchsorted(region_latitudes, latitudes.min() - band, side="left")
+            high = np.searchsorted(region_latitudes, latitudes.max() + band, side="right")
+            if low == high:
+                continue
+            
+            candidates = region_order[low:high]
+            block_rows, candidate_columns = np.nonzero(self.distance_matrix(centers[block], region[candidates]) <= radius)
+            pair_centers.append(block[block_rows])
+            pair_region.append(candidates[candidate_columns])
+        
+        pair_centers = np.concatenate(pair_centers) if pair_centers else np.zeros(0, dtype=np.intp)
+        pair_region = np.concatenate(pair_region) if pair_region else np.zeros(0, dtype=np.intp)
+        order = np.lexsort((pair_region, pair_centers))
+        offsets = np.zeros(len(centers) + 1, dtype=np.intp)
+        np.cumsum(np.bincount(pair_centers, minlength=len(centers)), out=offsets[1:])
+        return offsets, pair_region[order]
+    
+    def plan_coverage(
+        self,
+        zip_codes: Iterable[str],
+        distance: float,
+        coverage_radius: Optional[float] = None,
+        candidates: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Plan a small set of searches whose radii cover every ZIP code of a region.
+        Uses the greedy set cover heuristic: repeatedly pick the search center
+        covering the most still uncovered ZIP codes. Coverage is kept sparse
+        (see coverage), so state- or nation-sized regions fit in memory.
+        
+        Args:
+            zip_codes: ZIP codes of the region to cover
+            distance: Search radius in miles used for every planned search
+            coverage_radius: Radius counted as covered (default: distance). A smaller
+                value leaves a margin for ZIP areas extending past their centroid.
+            candidates: ZIP codes that may be used as search centers (default: the region)
+        
+        Returns:
+            List of planned searches as {"zip_code", "distance", "covers"}, in pick order.
+            Region ZIP codes missing from the index are planned as searches of their own.
+        """
+        zip_codes = list(dict.fromkeys(zip_codes))
+        coverage_radius = distance if coverage_radius is None else coverage_radius
+        
+        unknown = [z for z in zip_codes if z not in self.positions]
+        if unknown:
+            logger.warning(f"No centroid known for {len(unknown)} ZIP codes, searching them individually")
+        
+        region = self.rows(zip_codes)
+        centers = self.rows(zip_codes if candidates is None else candidates)
+        
+        plan = []
+        if len(region) and len(centers):
+            # Region ZIPs covered by each center, and the transpose: centers covering each region ZIP
+            offsets, covered = self.coverage(centers, region, coverage_radius)
+            owners = np.repeat(np.arange(len(centers)), np.diff(offsets))
+            by_region = np.argsort(covered, kind="stable")
+            region_offsets = np.zeros(len(region) + 1, dtype=np.intp)
+            np.cumsum(np.bincount(covered, minlength=len(region)), out=region_offsets[1:])
+            covering_centers = owners[by_region]
+            
+            # Number of still uncovered region ZIPs each center would cover
+            gains = np.diff(offsets)
+            uncovered = np.ones(len(region), dtype=bool)
+            
+            while uncovered.any():
+                best = int(np.argmax(gains))
+                if gains[best] == 0:
+                    break
+                
+                reachable = covered[offsets[best]:offsets[best + 1]]
+                newly_covered = reachable[uncovered[reachable]]
+                uncovered[newly_covered] = False
+                for r in newly_covered:
+                    np.subtract.at(gains, covering_centers[region_offsets[r]:region_offsets[r + 1]], 1)
+                plan.append({
+                    "zip_code": str(self.zip_codes[centers[best]]),
+                    "distance": distance,
+                    "covers": self.zip_codes[region[newly_covered]].tolist(),
+                })
+            
+            # Region ZIP codes no candidate reaches are searched from their own centroid
+            for row in region[uncovered]:
+                zip_code = str(self.zip_codes[row])
+                plan.append({"zip_code": zip_code, "distance": distance, "covers": [zip_code]})
+        
+        for zip_code in unknown:
+            plan.append({"zip_code": zip_code, "distance": distance, "covers": [zip_code]})
+        
+        return plan
+
+@functools.lru_cache(maxsize=1)
+def load_zip_index(path: str = ZIP_CENTROIDS_PATH) -> ZipCentroidIndex:
+    """
+    Load the ZIP centroid index from a centroids file, see ZipCentroidIndex.from_file.
+    
+    Args:
+        path: Path to the packed .npz or CSV centroids file
+    
+    Returns:
+        ZipCentroidIndex
+    """
+    return ZipCentroidIndex.from_file(path)
+
+def pack_zip_centroids(csv_path: str, output_path: str = ZIP_CENTROIDS_PATH) -> int:
+    """
+    Pack a centroids CSV file (zip_code, latitude, longitude) into the compact
+    .npz format: ZIP codes as sorted integers and coordinates as float32,
+    which is well under a meter of precision.
+    
+    Args:
+        csv_path: Path to the centroids CSV file
+        output_path: Path of the .npz file to write (default: the bundled centroids)
+    
+    Returns:
+        Number of ZIP codes packed
+    """
+    centroids = {
+        zip_code: centroid for zip_code, centroid in load_zip_centroids(csv_path).items()
+        if len(zip_code) == 5 and zip_code.isdigit()
+    }
+    zip_codes = sorted(centroids)
+    
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    np.savez_compressed(
+        output_path,
+        zip_codes=np.asarray([int(z) for z in zip_codes], dtype=np.uint32),
+        latitudes=np.asarray([centroids[z]["latitude"] for z in zip_codes], dtype=np.float32),
+        longitudes=np.asarray([centroids[z]["longitude"] for z in zip_codes], dtype=np.float32)
+    )
+    logger.info(f"Packed {len(zip_codes)} ZIP centroids from {csv_path} into {output_path}")
+    return len(zip_codes)
+
+def plan_coverage(
+    zip_codes: Iterable[str],
+    distance: float,
+    coverage_radius: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """
+    Plan the searches covering a list of ZIP codes using the bundled centroids.
+    See ZipCentroidIndex.plan_coverage.
+    
+    Args:
+        zip_codes: ZIP codes of the region to cover
+        distance: Search radius in miles
+        coverage_radius: Radius counted as covered (default: distance)
+    
+    Returns:
+        List of planned searches
+    """
+    return load_zip_index().plan_coverage(zip_codes, distance, coverage_radius)
+
+def main():
+    """Main function to print a coverage plan."""
+    import argparse
+    import json
+    
+    parser = argparse.ArgumentParser(description="Plan GAF searches covering a set of ZIP codes")
+    parser.add_argument("--zip-codes", type=str, help="Comma-separated ZIP codes of the region")
+    parser.add_argument("--zip-file", type=str, help="Path to file containing ZIP codes, one per line")
+    parser.add_argument("--prefix", type=str, help="Cover every bundled ZIP code starting with this prefix")
+    parser.add_argument("--distance", type=int, default=25, help="Search radius in miles (default: 25)")
+    parser.add_argument("--coverage-radius", type=float, help="Radius counted as covered (default: distance)")
+    parser.add_argument("--json", action="store_true", help="Print the plan as JSON")
+    parser.add_argument("--pack-centroids", type=str, metavar="CSV",
+                        help=f"Pack a zip_code,latitude,longitude CSV file into {ZIP_CENTROIDS_PATH} and exit")
+    
+    args = parser.parse_args()
+    
+    if args.pack_centroids:
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        count = pack_zip_centroids(args.pack_centroids)
+        print(f"Packed {count} ZIP centroids into {ZIP_CENTROIDS_PATH}")
+        return
+    
+    index = load_zip_index()
+    zip_codes = []
+    if args.zip_codes:
+        zip_codes.extend(z.strip() for z in args.zip_codes.split(",") if z.strip())
+    if args.zip_file and os.path.exists(args.zip_file):
+        with open(args.zip_file, 'r') as f:
+            zip_codes.extend(line.strip() for line in f if line.strip())
+    if args.prefix:
+        zip_codes.extend(z for z in index.zip_codes.tolist() if z.startswith(args.prefix))
+    
+    if not zip_codes:
+        parser.error("No ZIP codes given")
+    
+    plan = index.plan_coverage(zip_codes, args.distance, args.coverage_radius)
+    
+    if args.json:
+        print(json.dumps(plan, indent=2))
+        return
+    
+    for search in plan:
+        print(f"  {search['zip_code']} ({search['distance']} mi): covers {len(search['covers'])} ZIP codes")
+    print(f"{len(plan)} searches cover {len(dict.fromkeys(zip_codes))} ZIP codes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Tests for the columnar engine of the ETL processor.
+"""
+
+import os
+import sys
+import json
+import random
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl.processor import ContractorDataProcessor
+
+def _raw_contractors(count):
+    rng = random.Random(7)
+    addresses = [
+        "1 Main St, Austin, TX 78701",
+        "22 Oak Ave, Dallas, TX",
+        "Houston, TX 77001",
+        "no commas here",
+        "N/A",
+        "",
+        None,
+    ]
+    descriptions = ["Metal roof repair and gutters", "Emergency roof repairs", "N/A", "", None, "TPO flat roofs"]
+    contractors = []
+    for i in range(count):
+        contractor = {
+            "name": rng.choice([f"Roofer {i % 40}", "Unknown", "", None]),
+            "address": rng.choice(addresses),
+            "rating": rng.choice([4.8, "4.1", 3.0, "N/A", None]),
+            "phone": rng.choice(["(512) 555-0100", "N/A", None]),
+            "certifications": rng.choice([["Master Elite"], ["A", "B", "C"], [], "not a list", None]),
+            "description": rng.choice(descriptions),
+            "website": rng.choice(["https://example.com", "Unknown", None]),
+            "zip_code": "78701",
+        }
+        # Some records leave fields out entirely
+        for field in rng.sample(list(contractor), rng.randint(0, 2)):
+            del contractor[field]
+        contractors.append(contractor)
+    
+    contractors.insert(5, "not a record")
+    return contractors
+
+def _without_dates(records):
+    return [{key: value for key, value in record.items() if key != "processed_date"} for record in records]
+
+def test_columnar_output_matches_dict_path(tmp_path):
+    raw_path = tmp_path / "raw_contractors.json"
+    raw_path.write_text(json.dumps({"data": _raw_contractors(500)}), encoding="utf-8")
+    
+    expected = ContractorDataProcessor(str(raw_path), str(tmp_path / "dict.json")).process()
+    columnar = ContractorDataProcessor(str(raw_path), str(tmp_path / "columnar.json")).process_columnar()
+    
+    assert len(expected) > 0
+    assert _without_dates(columnar) == _without_dates(expected)
+    assert [list(record) for record in columnar] == [list(record) for record in expected]
+    
+    # Values keep the Python types of the dict path, e.g. no numpy scalars
+    for record, expected_record in zip(columnar, expected):
+        for key, value in record.items():
+            assert type(value) is type(expected_record[key]), key
+
+def test_columnar_output_matches_dict_path_with_entity_resolution(tmp_path):
+    raw_path = tmp_path / "raw_contractors.json"
+    raw_path.write_text(json.dumps(_raw_contractors(200)), encoding="utf-8")
+    
+    expected = ContractorDataProcessor(str(raw_path), str(tmp_path / "dict.json"), resolve_entities=True).process()
+    columnar = ContractorDataProcessor(str(raw_path), str(tmp_path / "columnar.json"), resolve_entities=True).process_columnar()
+    
+    assert _without_dates(columnar) == _without_dates(expected)
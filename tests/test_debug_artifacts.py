@@ -0,0 +1,22 @@
+"""
+Tests for the debug artifact sink.
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper.debug_artifacts import DebugArtifactSink
+
+def test_existing_artifacts_are_indexed_on_first_write(tmp_path):
+    old = tmp_path / "old_run" / "10001" / "page_content_10001_p1.jpg"
+    old.parent.mkdir(parents=True)
+    old.write_bytes(b"x" * 600)
+    
+    sink = DebugArtifactSink(str(tmp_path), max_size_mb=1000 / (1024 * 1024), run_id="new_run")
+    assert sink.get_statistics()["artifact_bytes"] == 0
+    
+    # The new artifact pushes the directory over budget, so the older one is evicted
+    sink._write_files([(sink.artifact_path("10002", 1, "page_content", "jpg"), b"y" * 600, False)])
+    assert not old.exists()
+    assert sink.get_statistics() == {"artifacts_captured": 0, "artifacts_evicted": 1, "artifact_bytes": 600}
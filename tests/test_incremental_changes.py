@@ -0,0 +1,69 @@
+"""
+Tests for applying the changes of an incremental ETL run to the database.
+"""
+
+import os
+import sys
+import json
+import shutil
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl.processor import ContractorDataProcessor
+from db.db_manager import DBManager
+
+def test_apply_changes_with_missing_certifications(tmp_path):
+    raw_path = tmp_path / "raw_contractors.json"
+    output_path = tmp_path / "processed_contractors.json"
+    raw_path.write_text(json.dumps([
+        {"name": "Summit Roofing", "address": "1 Main St, Austin, TX 78701", "rating": 4.5,
+         "certifications": ["Master Elite"], "description": "Metal roof repair"},
+        {"name": "Ridge Line Roofers", "address": "2 Oak Ave, Dallas, TX 75001", "rating": 4.0},
+    ]), encoding="utf-8")
+    
+    summary = ContractorDataProcessor(str(raw_path), str(output_path)).process_incremental()
+    assert summary["changed"] == 2
+    
+    changes_path = str(output_path).replace(".json", ".changes.json")
+    with open(changes_path, 'r', encoding='utf-8') as f:
+        upserts = json.load(f)["upserts"]
+    assert any(contractor["certifications"] is None for contractor in upserts)
+    
+    # The schema is read from the directory of the database
+    shutil.copy(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "db", "schema.sql"), tmp_path)
+    db = DBManager(str(tmp_path / "contractors.db"))
+    db.initialize_db()
+    try:
+        assert db.apply_changes_from_json(changes_path) == (2, 0)
+        contractors = {contractor["name"]: contractor for contractor in db.get_contractors()}
+        assert contractors["Ridge Line Roofers"]["certifications"] == []
+        assert contractors["Summit Roofing"]["certifications"] == ["Master Elite"]
+    finally:
+        db.close()
+
+def test_taxonomy_change_reprocesses_unchanged_input(tmp_path, monkeypatch):
+    import etl.processor
+    
+    raw_path = tmp_path / "raw_contractors.json"
+    output_path = tmp_path / "processed_contractors.json"
+    raw_path.write_text(json.dumps([
+        {"name": "Summit Roofing", "address": "1 Main St, Austin, TX 78701", "description": "Solar shingles"},
+        {"name": "Ridge Line Roofers", "address": "2 Oak Ave, Dallas, TX 75001", "description": "Gutters"},
+    ]), encoding="utf-8")
+    processor = ContractorDataProcessor(str(raw_path), str(output_path))
+    
+    assert processor.process_incremental()["changed"] == 2
+    assert processor.process_incremental()["up_to_date"]
+    
+    # Same input, but a taxonomy that knows about solar roofing
+    taxonomy_path = tmp_path / "taxonomy.json"
+    taxonomy_path.write_text(json.dumps({"solar roofing": ["solar shingle"], "gutter installation": ["gutter"]}), encoding="utf-8")
+    monkeypatch.setattr(etl.processor, "SERVICE_TAXONOMY_PATH", str(taxonomy_path))
+    
+    summary = processor.process_incremental()
+    assert not summary["up_to_date"]
+    assert summary["changed"] == 2
+    with open(output_path, 'r', encoding='utf-8') as f:
+        services = {record["name"]: record["services"] for record in json.load(f)["data"]}
+    assert services["Summit Roofing"] == ["solar roofing"]
+    
+    assert processor.process_incremental()["up_to_date"]
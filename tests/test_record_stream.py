@@ -0,0 +1,39 @@
+"""
+Tests for the streaming scraper output and its checkpoint.
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper.record_stream import RecordStream
+
+def test_interrupted_sweep_resumes(tmp_path):
+    path = str(tmp_path / "raw_contractors.ndjson")
+    stream = RecordStream(path, distance=25)
+    stream.write_page("10013", 1, [{"name": "A", "zip_code": "10013"}])
+    stream.complete_zip("10013")
+    stream.write_page("10014", 1, [{"name": "B", "zip_code": "10014"}])
+    stream.close()
+    
+    resumed = RecordStream(path, distance=25)
+    assert resumed.is_complete("10013")
+    assert resumed.pages_done("10014") == 1
+    assert resumed.record_count == 2
+    resumed.close()
+
+def test_completed_sweep_is_not_resumed(tmp_path):
+    path = str(tmp_path / "raw_contractors.ndjson")
+    stream = RecordStream(path, distance=25)
+    stream.write_page("10013", 1, [{"name": "A", "zip_code": "10013"}])
+    stream.complete_zip("10013")
+    stream.retire()
+    stream.close()
+    assert not os.path.exists(stream.checkpoint_path)
+    
+    # The next run searches again and starts a new stream
+    rerun = RecordStream(path, distance=25)
+    assert not rerun.is_complete("10013")
+    assert rerun.record_count == 0
+    assert list(rerun.read_records()) == []
+    rerun.close()
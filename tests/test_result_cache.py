@@ -0,0 +1,19 @@
+"""
+Tests for the search result cache.
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper.result_cache import ResultCache
+
+def test_extraction_configurations_are_cached_apart(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.db"))
+    cache.put("10001", 25, [{"name": "Acme Roofing"}], pages_scraped=1, variant="dom|search")
+    
+    # A run that expects profile details must not be served search-only records
+    assert cache.get_fresh("10001", 25, "dom|details") is None
+    assert cache.get_fresh("10001", 25, "network|search") is None
+    assert cache.get_fresh("10001", 25, "dom|search")["records"] == [{"name": "Acme Roofing"}]
+    cache.close()
@@ -0,0 +1,28 @@
+"""
+Tests for the service taxonomy extractor.
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl.service_taxonomy import ServiceExtractor
+
+def test_overlapping_phrases_are_all_found():
+    extractor = ServiceExtractor()
+    
+    # "metal roof" and "roof repair" share the word "roof"
+    assert extractor.extract("metal roof repair") == ["roof repair", "metal roofing"]
+    assert extractor.extract("Tile roof inspection") == ["roof inspection", "tile roofing"]
+    assert extractor.extract("commercial roof maintenance") == ["commercial roofing", "roof maintenance"]
+
+def test_contained_phrase_reports_both_services():
+    extractor = ServiceExtractor()
+    
+    assert extractor.extract("24/7 emergency roof repairs") == ["roof repair", "emergency roof repair"]
+
+def test_matches_need_word_edges():
+    extractor = ServiceExtractor()
+    
+    assert extractor.extract("pretpo guttering") == []
+    assert extractor.extract("TPO and seamless gutters") == ["flat roofing", "gutter installation"]